@@ -23,6 +23,7 @@ if VALFTEST_PATH not in sys.path:
     sys.path.append(VALFTEST_PATH)
 
 from framework.bpl.batch_playlist import BatchPlaylist
+from framework.io.sim_index import sim_file_index
 from framework.util import logger
 from framework.util.defines import *
 from framework.valf import valf
@@ -183,9 +184,8 @@ def bsig_root_folder_struct(root_path, bsig_base_name=None):
         if bsig_base_name is None:
             continue
 
-        dir_contents_base = [os.path.splitext(_f)[0].lower() for _f in os.listdir(os.path.join(root_path, sf))]
-
-        if not bsig_base_name.lower() in dir_contents_base:
+        # listed once per folder, not for each recording
+        if bsig_base_name not in sim_file_index(os.path.join(root_path, sf)):
             return False
 
     return True
@@ -14,20 +14,9 @@ Generate Plots and reload images from database
 # pylint: disable=R0902,R0912,R0913,R0914,E1103
 
 # - import Python modules ---------------------------------------------------------------------------------------------
-from PIL import Image as Img
-from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
-from matplotlib.backends.backend_ps import papersize
-from matplotlib.figure import Figure
-from matplotlib.font_manager import FontProperties
-from matplotlib.lines import Line2D
-from matplotlib.ticker import MaxNLocator
-from matplotlib import mlab
 from numpy.ma import MaskedArray
 from os import path as opath, unlink, makedirs
-from reportlab.graphics.shapes import Image, Drawing
 from math import fabs, ceil, exp, sqrt, pi
-import matplotlib
-import matplotlib.pyplot as pltt
 import numpy
 from tempfile import gettempdir, NamedTemporaryFile
 from uuid import uuid4
@@ -36,6 +25,19 @@ import imghdr
 
 # - import framework modules ------------------------------------------------------------------------------------------------
 from framework.util import Logger
+from framework.util.helper import LazyModule
+
+# matplotlib, reportlab and PIL are imported when the first plot is created
+Img = LazyModule("PIL.Image")
+pltt = LazyModule("matplotlib.pyplot")
+mlab = LazyModule("matplotlib.mlab")
+_backend_agg = LazyModule("matplotlib.backends.backend_agg")
+_backend_ps = LazyModule("matplotlib.backends.backend_ps")
+_figure = LazyModule("matplotlib.figure")
+_font_manager = LazyModule("matplotlib.font_manager")
+_lines = LazyModule("matplotlib.lines")
+_ticker = LazyModule("matplotlib.ticker")
+_shapes = LazyModule("reportlab.graphics.shapes")
 
 # - defines -----------------------------------------------------------------------------------------------------------
 DRAWING_W = 450
@@ -198,11 +200,11 @@ class BasePlot(object):
         self.__figure = figure
 
         if not self.__figure:
-            self.__figure = Figure(figsize=figsize, facecolor='#ddddee')
+            self.__figure = _figure.Figure(figsize=figsize, facecolor='#ddddee')
 
         self.__show_grid = show_grid
 
-        self._canvas = FigureCanvas(self.__figure)
+        self._canvas = _backend_agg.FigureCanvasAgg(self.__figure)
 
         if position and self.__figure:
             self.__axes = self.__figure.add_axes(position)
@@ -362,7 +364,7 @@ class BasePlot(object):
                         else:
                             orientation = 'portrait'
 
-                    paper_weight, paper_height = papersize[papertype.lower()]
+                    paper_weight, paper_height = _backend_ps.papersize[papertype.lower()]
                     if orientation == 'landscape':
                         dscale = min(paper_height / fig_weight, paper_weight / fig_height)
                     else:
@@ -484,7 +486,7 @@ class BasePlot(object):
         # rects = []
         lines = []
         for color in colors:
-            line = matplotlib.lines.Line2D([0], [0], marker='o', color=color)
+            line = _lines.Line2D([0], [0], marker='o', color=color)
             lines.append(line)
 
         legend = self.__axes.legend(lines, labels, **kwargs)
@@ -589,7 +591,7 @@ class BasePlot(object):
         if not size:
             return
 
-        self.__axes.yaxis.set_major_locator(MaxNLocator(size))
+        self.__axes.yaxis.set_major_locator(_ticker.MaxNLocator(size))
 
     def draw(self):
         """ Draw canvas """
@@ -1209,22 +1211,22 @@ class ValidationPlot(object):
                 axes.plot(bins, yvals, gauss_color)
             if draw_lines is True:
                 # Draw a vertical line at the mu position
-                line = Line2D([mu, mu], [0, numpy.max(yvals)], color=line_colors[1], label=r'$\mu$', alpha=0.5, lw=1.5)
+                line = _lines.Line2D([mu, mu], [0, numpy.max(yvals)], color=line_colors[1], label=r'$\mu$', alpha=0.5, lw=1.5)
                 axes.add_line(line)
                 if abs(sigma) > 0.0:
                     # Draw a vertical line at the (mu - sigma) position
-                    line = Line2D([mu - sigma, mu - sigma], [0, self._calc_gauss([mu - sigma], mu, sigma)[0]],
+                    line = _lines.Line2D([mu - sigma, mu - sigma], [0, self._calc_gauss([mu - sigma], mu, sigma)[0]],
                                   color=line_colors[0], label=r'$\mu$' + ' - ' + r'$\sigma$', alpha=0.5, lw=1.5)
                     axes.add_line(line)
                     # Draw a vertical line at the (mu + sigma) position
-                    line = Line2D([mu + sigma, mu + sigma], [0, self._calc_gauss([mu + sigma], mu, sigma)[0]],
+                    line = _lines.Line2D([mu + sigma, mu + sigma], [0, self._calc_gauss([mu + sigma], mu, sigma)[0]],
                                   color=line_colors[2], label=r'$\mu$' + ' + ' + r'$\sigma$', alpha=0.5, lw=1.5)
                     axes.add_line(line)
         # otherwise just draw a line at the mean value
         else:
             if draw_lines is True:
                 # Draw a vertical line at the mu position
-                line = Line2D([mu, mu], [0, 1], color=line_colors[1], label=r'$\mu$', alpha=0.5, lw=1.5)
+                line = _lines.Line2D([mu, mu], [0, 1], color=line_colors[1], label=r'$\mu$', alpha=0.5, lw=1.5)
                 axes.add_line(line)
 
         if write_text is not None:
@@ -1441,7 +1443,7 @@ class ValidationPlot(object):
             axes.set_title(title, fontsize=8)
 
         if bool_legend and 'label' in keyw:
-            font_prop = FontProperties(size=8)
+            font_prop = _font_manager.FontProperties(size=8)
             leg = axes.legend(ncol=min(len(data_names), 4), prop=font_prop, loc='best')
             leg.get_frame().set_alpha(0.5)  # set transparency
 
@@ -1687,9 +1689,9 @@ class ValidationPlot(object):
             ofile.write(draw_data)
             ofile.close()
             # image from file
-            drw = Drawing(width, height)
+            drw = _shapes.Drawing(width, height)
             inpath = str(filename)
-            img = Image(0, 0, width, height, inpath)
+            img = _shapes.Image(0, 0, width, height, inpath)
             drw.add(img)
             return drw
         return None
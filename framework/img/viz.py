@@ -7,9 +7,18 @@ import logging
 import os
 import uuid
 import types as types
+from functools import wraps
+from threading import RLock
 import numpy as np
-import pandas as pd
-from matplotlib import gridspec, pylab as plt, path as mpath, patches as mpatches
+
+from framework.util.helper import LazyModule
+
+# imported with the first plot, not when loading the testcases
+pd = LazyModule("pandas")
+plt = LazyModule("matplotlib.pylab")
+gridspec = LazyModule("matplotlib.gridspec")
+mpath = LazyModule("matplotlib.path")
+mpatches = LazyModule("matplotlib.patches")
 
 
 __author__ = "Leidenberger, Ralf"
@@ -24,6 +33,20 @@ ZOOM_LIMITS = [100, 105]
 
 TIME_SPAN = "time_span"
 
+# pyplot keeps a global state, plots are created one after the other
+PLOT_LOCK = RLock()
+
+
+def serialized(func):
+    """ Decorator running the plot function under the PLOT_LOCK, so
+        test cases executed in parallel threads can create plots.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with PLOT_LOCK:
+            return func(*args, **kwargs)
+    return wrapper
+
 
 class ObjectPlotter(object):
     """ Factory for object info plot creation. """
@@ -43,6 +66,7 @@ class ObjectPlotter(object):
         """
         self._output_directory = path
 
+    @serialized
     def create_obj_info_plot(self, ecu_obj, sil_obj):
         """ Generates the object info plot for the two matched objects.
         :param ecu_obj: ECU object
@@ -229,6 +253,7 @@ class PlotFactory(object):
             return (signal.index.values - zero_index) * 1.e-6
         return (signal.series.index.values - zero_index) * 1.e-6
 
+    @serialized
     def fct_plot(self, signal_ref, signal, delta):
         # Align all signals to a common normalized time
         first_common_ts = max(signal.index.values[0], signal_ref.index.values[0], delta.index.values[0])
@@ -297,6 +322,7 @@ class PlotFactory(object):
 
         return filename
 
+    @serialized
     def difference_plot(self, signal_ref, signal, additional=None,
                         tolerance=None, title=""):
         """
@@ -425,25 +451,16 @@ class PlotFactory(object):
         :param timestamp:
         :return:
         """
-        timestamp_1 = sorted(set(timestamp))
+        from framework.io.alignment import dedup_indices  # loads pandas, keep importing viz light
+
+        timestamp_1 = np.unique(timestamp)
 
         if len(timestamp_1) == len(timestamp):
             return values, timestamp
-        else:
-            timestamp_2 = np.diff(timestamp)
-            timestamp_3 = np.where(timestamp_2 != 0)
-            values_1 = [values[0:timestamp_3[0][0]+1]]
-            for ij in range(len(timestamp_3[0])-1):
-                values_1.append(values[timestamp_3[0][ij]+1: timestamp_3[0][ij+1]+1])
-            values_1.append(values[timestamp_3[0][-1]+1:])
-            values_2 = []
-            for ij in range(len(values_1)):
-                values_2.append(values_1[ij][-1])                           # TEMPORARY SOLUTION FOR MULTIPLY TIMESTAMPS
-            # diff_norm_ts2 = timestamp[timestamp_3[0]]
-            # diff_norm_ts2 = np.append(diff_norm_ts2,timestamp[-1])
-
-            return values_2, timestamp_1
+        # TEMPORARY SOLUTION FOR MULTIPLY TIMESTAMPS
+        return list(np.asarray(values)[dedup_indices(timestamp)]), list(timestamp_1)
 
+    @serialized
     def histogram_plot(self, signal_ref, signal, signal_diff=None, additional=None, tolerance=None):
         """
         Produces a plot and a histogram plot for the given signals.
@@ -0,0 +1,304 @@
+"""
+framework/io/alignment
+-------------------
+
+Alignment of the timestamps of two signal files (e.g. ECU and SIL export of a recording)
+
+**User-API Interfaces**
+
+  - `alignment` (alignment of two readers, computed once per recording and shared by all test cases)
+  - `TimestampAlignment` (timestamps of both files and the alignments computed on them)
+  - `align` (index of the reference sample aligned to each target sample)
+  - `reindex` (target timestamps replaced by the reference timestamps they belong to)
+  - `sync_offsets` (first common timestamp of both files)
+  - `unwrap` (timestamps continued after counter jumps)
+  - `dedup_indices` (one sample of repeated timestamps)
+
+All functions work on sorted arrays (``numpy.searchsorted``), no python loop over the samples is needed.
+`align` follows the semantics of ``pandas.merge_asof``: for each target sample the previous, next or nearest
+reference sample is taken, optionally only inside a tolerance window.
+
+usage (example)
+
+.. code-block:: python
+
+    from framework.io.alignment import alignment, NEAREST
+
+    sync = alignment(ecu_reader, sil_reader)  # same object for all test cases of the recording
+    sil_index = sync.reindexed
+    ecu_rows = sync.indices(NEAREST, tolerance=30000)  # -1 where no ECU sample is within 30ms
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from threading import Lock
+
+import numpy as np
+
+# - import framework modules -------------------------------------------------------------------------------------------
+from framework.io.signalreader import SIG_TIMESTAMP
+
+__all__ = ['alignment', 'TimestampAlignment', 'align', 'reindex', 'sync_offsets', 'unwrap', 'dedup_indices',
+           'PREVIOUS', 'NEXT', 'NEAREST', 'FIRST', 'LAST']
+
+
+# - defines ------------------------------------------------------------------------------------------------------------
+PREVIOUS = "previous"
+NEXT = "next"
+NEAREST = "nearest"
+FIRST = "first"
+LAST = "last"
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def unwrap(timestamps, period=None):
+    """timestamps continued after counter jumps, e.g. the overflow of a 32bit timestamp
+
+    :param timestamps: timestamps, sorted between the jumps
+    :param period: value added at each jump, default: last timestamp before the jump
+    :return: increasing timestamps
+    :rtype: numpy.ndarray
+    """
+    timestamps = np.asarray(timestamps, np.int64)
+    jumps = np.flatnonzero(np.diff(timestamps) < 0)
+    if not len(jumps):
+        return timestamps.copy()
+
+    shift = np.zeros(len(timestamps), np.int64)
+    shift[jumps + 1] = timestamps[jumps] if period is None else period
+    return timestamps + np.cumsum(shift)
+
+
+def dedup_indices(timestamps, keep=LAST):
+    """indices of the samples to keep of repeated timestamps: one of each run of equal consecutive timestamps
+
+    :param timestamps: timestamps
+    :param keep: keep the `FIRST` or `LAST` sample of each run
+    :return: sorted indices of the kept samples
+    :rtype: numpy.ndarray
+    """
+    timestamps = np.asarray(timestamps)
+    changes = np.flatnonzero(timestamps[1:] != timestamps[:-1])
+    if keep == LAST:
+        return np.append(changes, len(timestamps) - 1) if len(timestamps) else changes
+    if keep == FIRST:
+        return np.insert(changes + 1, 0, 0) if len(timestamps) else changes
+    raise ValueError("unknown keep policy '%s'" % keep)
+
+
+def align(ref, target, method=NEAREST, tolerance=None):
+    """index of the reference sample aligned to each target sample
+
+    :param ref: sorted reference timestamps
+    :param target: timestamps to align
+    :param method: take the `PREVIOUS` (ref <= target), `NEXT` (ref >= target) or `NEAREST` reference sample,
+                   the previous one if both are equally near; of equal reference timestamps `PREVIOUS` takes
+                   the last, `NEXT` the first one
+    :param tolerance: max. distance of aligned timestamps, None for any
+    :return: indices into ref, -1 where no reference sample is aligned
+    :rtype: numpy.ndarray
+    """
+    ref = np.asarray(ref)
+    target = np.asarray(target)
+    if not len(ref):
+        return np.full(len(target), -1, np.int64)
+
+    if method == PREVIOUS:
+        idx = np.searchsorted(ref, target, "right") - 1
+    elif method == NEXT:
+        idx = np.searchsorted(ref, target, "left")
+        idx[idx == len(ref)] = -1
+    elif method == NEAREST:
+        prv = np.maximum(np.searchsorted(ref, target, "right") - 1, 0)
+        nxt = np.minimum(np.searchsorted(ref, target, "left"), len(ref) - 1)
+        idx = np.where(np.abs(target - ref[prv]) <= np.abs(ref[nxt] - target), prv, nxt)
+    else:
+        raise ValueError("unknown alignment method '%s'" % method)
+
+    idx = idx.astype(np.int64)
+    if tolerance is not None:
+        valid = idx >= 0
+        valid[valid] = np.abs(ref[idx[valid]] - target[valid]) <= tolerance
+        idx[~valid] = -1
+    return idx
+
+
+def reindex(ref, target):
+    """target timestamps replaced by the reference timestamps they belong to
+
+    a target timestamp found in ref is kept, a missing one is replaced by the next reference timestamp,
+    as long as no other target timestamp comes before it (NaN otherwise), the last one is always kept
+
+    :param ref: reference timestamps
+    :param target: timestamps to replace
+    :return: target itself if both contain the same timestamps, floats including NaN otherwise
+    :rtype: numpy.ndarray
+    """
+    target = np.asarray(target)
+    ref_sorted = np.unique(ref)
+    tgt_sorted = np.unique(target)
+    if np.array_equal(ref_sorted, tgt_sorted):
+        return target
+    if not len(target):
+        return target.astype(np.float64)
+
+    pos = np.searchsorted(ref_sorted, target, "left")
+    found = pos < len(ref_sorted)
+    found[found] = ref_sorted[pos[found]] == target[found]
+
+    # next timestamp of both, following target timestamps have to come after the next reference one
+    nxt = np.searchsorted(ref_sorted, target, "right")
+    has_next = nxt < len(ref_sorted)
+    next_ref = ref_sorted[np.minimum(nxt, len(ref_sorted) - 1)] if len(ref_sorted) else np.zeros(len(target))
+    nxt_tgt = np.searchsorted(tgt_sorted, target, "right")
+    next_tgt = np.where(nxt_tgt < len(tgt_sorted), tgt_sorted[np.minimum(nxt_tgt, len(tgt_sorted) - 1)], np.inf)
+
+    result = np.where(found, target, np.where(has_next & (next_ref <= next_tgt), next_ref, np.nan))
+    result[-1] = target[-1]
+    return result
+
+
+def _merge_walk(ref, target):
+    """first common timestamp met walking through both timestamps, always stepping on the smaller one
+
+    :return: index in ref and target, (len, len) of both if there is none
+    """
+    i = k = 0
+    while i < len(ref) and k < len(target):
+        if ref[i] < target[k]:
+            i += 1
+        elif ref[i] > target[k]:
+            k += 1
+        else:
+            break
+    return i, k
+
+
+def sync_offsets(ref, target):
+    """first common timestamp of reference and target timestamps, found like walking through both and
+    always stepping on the smaller one
+
+    sorted timestamps are searched with ``numpy.searchsorted``, timestamps with counter jumps (e.g. the
+    overflow of a 32bit timestamp) are walked through sample by sample
+
+    :param ref: reference timestamps
+    :param target: target timestamps
+    :return: common timestamp found, index of it in ref and target, number of samples following in both
+    :rtype: tuple
+    """
+    if ref is None or target is None:
+        return False, 0, 0, 0
+
+    ref = np.asarray(ref)
+    target = np.asarray(target)
+    if (np.diff(ref) < 0).any() or (np.diff(target) < 0).any():
+        ref_idx, tgt_idx = _merge_walk(ref, target)
+        found = ref_idx < len(ref) and tgt_idx < len(target)
+        return found, ref_idx, tgt_idx, min(len(ref) - ref_idx, len(target) - tgt_idx)
+
+    common = np.intersect1d(ref, target)
+    if len(common):
+        ref_idx = int(np.searchsorted(ref, common[0], "left"))
+        tgt_idx = int(np.searchsorted(target, common[0], "left"))
+    elif not len(ref) or not len(target):
+        ref_idx = tgt_idx = 0
+    elif ref[-1] < target[-1]:
+        ref_idx, tgt_idx = len(ref), int(np.searchsorted(target, ref[-1], "right"))
+    else:
+        ref_idx, tgt_idx = int(np.searchsorted(ref, target[-1], "right")), len(target)
+
+    return bool(len(common)), ref_idx, tgt_idx, min(len(ref) - ref_idx, len(target) - tgt_idx)
+
+
+def alignment(ref_reader, target_reader, signal=SIG_TIMESTAMP):
+    """alignment of the timestamps of two readers
+
+    using `CachedSignalReader` readers the alignment is computed once per recording (and pair of files),
+    all test cases get the same `TimestampAlignment` including its computed results
+
+    :param ref_reader: reader of reference file (ECU)
+    :param target_reader: reader of file to align (SIL)
+    :param signal: name of timestamp signal
+    :return: alignment of both
+    :rtype: TimestampAlignment
+    """
+    def create():
+        """read both timestamps"""
+        return TimestampAlignment(ref_reader[signal], target_reader[signal])
+
+    if hasattr(ref_reader, "derived") and hasattr(target_reader, "file_key"):
+        return ref_reader.derived(("alignment", signal, target_reader.file_key), create)
+    return create()
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class TimestampAlignment(object):
+    """timestamps of a reference and a target file and the alignments of them, each computed once
+
+    results are shared between the users (test cases), they must not be changed
+    """
+    def __init__(self, ref, target):
+        """keep timestamps
+
+        :param ref: reference timestamps
+        :param target: timestamps to align
+        """
+        self.ref = np.asarray(ref, np.int64)
+        self.target = np.asarray(target, np.int64)
+        self._results = {}
+        self._lock = Lock()
+
+    @property
+    def nbytes(self):
+        """memory size of the timestamps"""
+        return self.ref.nbytes + self.target.nbytes
+
+    def _result(self, key, func, *args):
+        """result computed once"""
+        with self._lock:
+            if key not in self._results:
+                self._results[key] = func(*args)
+            return self._results[key]
+
+    @property
+    def complete(self):
+        """True if both contain the same timestamps"""
+        return self.reindexed is self.target
+
+    @property
+    def reindexed(self):
+        """target timestamps replaced by the reference ones they belong to, see `reindex`"""
+        return self._result("reindex", reindex, self.ref, self.target)
+
+    @property
+    def offsets(self):
+        """first common timestamp, see `sync_offsets`"""
+        return self._result("offsets", sync_offsets, self.ref, self.target)
+
+    @property
+    def ref_unwrapped(self):
+        """reference timestamps continued after counter jumps, see `unwrap`"""
+        return self._result("ref_unwrapped", unwrap, self.ref)
+
+    @property
+    def target_unwrapped(self):
+        """target timestamps continued after counter jumps, see `unwrap`"""
+        return self._result("target_unwrapped", unwrap, self.target)
+
+    def indices(self, method=NEAREST, tolerance=None):
+        """index of the reference sample aligned to each target sample, both unwrapped, see `align`
+
+        :param method: `PREVIOUS`, `NEXT` or `NEAREST`
+        :param tolerance: max. distance of aligned timestamps, None for any
+        :return: indices into ref, -1 where no reference sample is aligned
+        """
+        return self._result(("indices", method, tolerance), align, self.ref_unwrapped, self.target_unwrapped,
+                            method, tolerance)
+
+
+"""
+CHANGE LOG:
+-----------
+"""
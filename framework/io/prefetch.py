@@ -0,0 +1,219 @@
+"""
+framework/io/prefetch
+-------------------
+
+Background prefetch of signal files
+
+**User-API Interfaces**
+
+  - `open_signal_reader` (get prefetched or newly opened reader)
+  - `SignalPrefetcher` (background opening of signal files)
+
+While the observers are working on the signal files of one recording the files of the next recording
+can already be opened, header-parsed and warmed up in a background thread:
+
+  - bsig files are read through once so following reads are served from the OS file cache,
+  - csv files are parsed completely, the columns are kept by the reader.
+
+Warming is limited by a memory budget, files not fitting into it are just opened.
+The prefetched readers are shared by all components using `open_signal_reader` with the same options,
+their ``close()`` is ignored until the prefetcher releases them (e.g. when `CollectionReader` loads
+the following recording).
+
+usage (example)
+
+.. code-block:: python
+
+    from framework.io.prefetch import PREFETCHER, open_signal_reader
+
+    PREFETCHER.prefetch(['next_rec_ecu.csv', 'next_rec_sil.csv'], delim=',')
+    ...
+    with open_signal_reader('next_rec_ecu.csv', delim=',') as sr:
+        values = sr['MTS.Package.TimeStamp']
+    ...
+    PREFETCHER.release(['next_rec_ecu.csv', 'next_rec_sil.csv'])
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from os import path as opath
+from Queue import Queue
+from threading import Thread, Event, Lock
+
+# - import framework modules -------------------------------------------------------------------------------------------
+from framework.io.signalreader import SignalReader
+
+__all__ = ['SignalPrefetcher', 'PREFETCHER', 'open_signal_reader']
+
+
+# - defines ------------------------------------------------------------------------------------------------------------
+PREFETCH_BUDGET = 1 << 30  # default memory budget for warmed files: 1GB
+WARM_CHUNK = 1 << 22  # chunk size to read through bsig files
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class PooledSignalReader(SignalReader):
+    """signal reader owned by `SignalPrefetcher`,
+
+    ``close()`` of the components using it is ignored, it's closed when the prefetcher releases it
+    """
+    def close(self):
+        """ignored, reader stays open until released by prefetcher"""
+        pass
+
+    def release(self):
+        """finally close the file"""
+        SignalReader.close(self)
+
+
+class _Entry(object):
+    """prefetch request of one file: options, opened reader or error and size accounted to the budget"""
+    def __init__(self, filename, kwargs):
+        self.filename = filename
+        self.kwargs = kwargs
+        self.reader = None
+        self.error = None
+        self.size = 0
+        self.cancelled = False
+        self.done = Event()
+
+
+class SignalPrefetcher(object):
+    """opens and warms signal files in a background thread
+
+    one worker thread handles the requests in order, `reader` waits for a pending request
+    """
+    def __init__(self, budget=PREFETCH_BUDGET):
+        """set default values
+
+        :param budget: memory budget in bytes for warmed files
+        :type budget: int
+        """
+        self.budget = budget
+        self._used = 0
+        self._entries = {}
+        self._lock = Lock()
+        self._queue = Queue()
+        self._thread = None
+
+    @staticmethod
+    def _key(filename, kwargs):
+        """key of a file and the reader options"""
+        return opath.normcase(opath.abspath(filename)), tuple(sorted(kwargs.items()))
+
+    def prefetch(self, filenames, warm=True, **kwargs):
+        """open (and warm) given files in background
+
+        :param filenames: path/to/file or list of them
+        :type filenames: str | list
+        :param warm: read through bsig files / parse csv files as far as the budget allows
+        :type warm: bool
+        :param kwargs: options for `SignalReader`
+        """
+        for filename in [filenames] if isinstance(filenames, basestring) else filenames:
+            key = self._key(filename, kwargs)
+            with self._lock:
+                if key in self._entries:
+                    continue
+                self._entries[key] = entry = _Entry(filename, kwargs)
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = Thread(target=self._worker, name="SignalPrefetcher")
+                    self._thread.daemon = True
+                    self._thread.start()
+            self._queue.put((entry, warm))
+
+    def reader(self, filename, **kwargs):
+        """prefetched reader of a file, waits if the file is just being opened
+
+        :param filename: path/to/file
+        :param kwargs: options for `SignalReader`, must match the ones used to prefetch
+        :return: shared reader or None if file was not prefetched with same options
+        :rtype: PooledSignalReader | None
+        """
+        with self._lock:
+            entry = self._entries.get(self._key(filename, kwargs))
+        if entry is None:
+            return None
+
+        entry.done.wait()
+        if entry.error is not None:
+            raise entry.error
+        return entry.reader
+
+    def release(self, filenames=None):
+        """close readers of given files (all if None) and free their budget
+
+        :param filenames: path/to/file or list of them
+        :type filenames: str | list | None
+        """
+        if filenames is not None:
+            filenames = set(self._key(fn, {})[0] for fn in
+                            ([filenames] if isinstance(filenames, basestring) else filenames))
+        with self._lock:
+            entries = [(key, ent) for key, ent in self._entries.items() if filenames is None or key[0] in filenames]
+            for key, ent in entries:
+                ent.cancelled = True
+                del self._entries[key]
+
+        for _, entry in entries:
+            entry.done.wait()
+            if entry.reader is not None:
+                entry.reader.release()
+            with self._lock:
+                self._used -= entry.size
+
+    def _worker(self):
+        """background thread: open and warm requested files"""
+        while True:
+            entry, warm = self._queue.get()
+            if entry.cancelled:
+                entry.done.set()
+                continue
+            try:
+                entry.reader = PooledSignalReader(entry.filename, **entry.kwargs)
+                if warm:
+                    self._warm(entry)
+            except Exception as ex:
+                entry.error = ex
+            finally:
+                entry.done.set()
+
+    def _warm(self, entry):
+        """read through a bsig file or parse a csv file if the file fits into the budget"""
+        size = opath.getsize(entry.filename)
+        with self._lock:
+            if self._used + size > self.budget:
+                return
+            self._used += size
+            entry.size = size
+
+        if entry.reader._type == "bsig":  # pylint: disable=W0212
+            with open(entry.filename, "rb") as fpt:
+                while fpt.read(WARM_CHUNK):
+                    pass
+        else:
+            entry.reader.signal_length()
+
+
+PREFETCHER = SignalPrefetcher()
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def open_signal_reader(filename, **kwargs):
+    """provide reader of a signal file: the prefetched one if available, otherwise it's opened now
+
+    :param filename: path/to/file
+    :param kwargs: options for `SignalReader`
+    :return: signal reader
+    :rtype: SignalReader
+    """
+    reader = PREFETCHER.reader(filename, **kwargs) if isinstance(filename, basestring) else None
+    return SignalReader(filename, **kwargs) if reader is None else reader
+
+
+"""
+CHANGE LOG:
+-----------
+"""
@@ -0,0 +1,320 @@
+"""
+framework/io/signalcache
+-------------------
+
+Memory bounded cache of signals read from several signal files
+
+**User-API Interfaces**
+
+  - `SignalCache` (LRU cache of signals limited by bytes)
+  - `CachedSignalReader` (lazily opened reader using the cache)
+
+Test cases working on the same recording often read the same signals again, e.g. ``MTS.Package.TimeStamp``
+is read by all of them. A `SignalCache` keeps the read signals of all readers of one recording
+(least recently used are dropped when exceeding the budget) and counts hits and misses.
+
+A `CachedSignalReader` opens its file only when it's accessed first (using
+`framework.io.prefetch.open_signal_reader`), so files of busses no test case is using are not opened at all.
+Values are returned as copies, callers are free to change them.
+Signals of readers keeping all values in memory anyway (csv files, see `SignalReader.resident`) are not
+cached, they would be kept twice otherwise.
+
+usage (example)
+
+.. code-block:: python
+
+    from framework.io.signalcache import SignalCache, CachedSignalReader
+
+    cache = SignalCache(256 << 20)
+    ecu = CachedSignalReader(cache, 'rec_ecu.csv', delim=',')
+    sil = CachedSignalReader(cache, 'rec_sil.csv', delim=',')
+    ...
+    ts = ecu['MTS.Package.TimeStamp']  # read from file
+    ts = ecu['MTS.Package.TimeStamp']  # taken from cache
+    ...
+    ecu.close()
+    sil.close()
+    print(cache.stats)
+    cache.clear()  # next recording
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from collections import OrderedDict
+from os import path as opath
+from threading import Lock
+
+from numpy import ndarray
+
+# - import framework modules -------------------------------------------------------------------------------------------
+from framework.io.prefetch import open_signal_reader
+from framework.io.signalreader import SIG_TIMESTAMP
+
+__all__ = ['SignalCache', 'CachedSignalReader']
+
+
+# - defines ------------------------------------------------------------------------------------------------------------
+SIGNAL_CACHE_BUDGET = 512 << 20  # default memory budget of cached signals: 512MB
+ITEM_SIZE = 8  # estimated bytes per item of python lists
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def _nbytes(value):
+    """(estimated) memory size of signal values"""
+    if hasattr(value, "nbytes"):  # numpy arrays and derived objects providing their size
+        return value.nbytes
+    if type(value) in (list, tuple):
+        return sum(_nbytes(val) for val in value) if value and type(value[0]) in (ndarray, list) \
+            else len(value) * ITEM_SIZE
+    return ITEM_SIZE
+
+
+def _copy(value):
+    """copy of signal values to be returned"""
+    if isinstance(value, ndarray):
+        return value.copy()
+    if type(value) in (list, tuple):
+        return [_copy(val) for val in value] if value and type(value[0]) in (ndarray, list) else list(value)
+    return value
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class SignalCache(object):
+    """least recently used signals of several readers, limited by memory budget"""
+    def __init__(self, budget=SIGNAL_CACHE_BUDGET):
+        """set default values
+
+        :param budget: memory budget in bytes, 0 to disable caching
+        :type budget: int
+        """
+        self.budget = budget
+        self._items = OrderedDict()
+        self._used = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """cached values of a signal
+
+        :param key: reader and signal key
+        :return: values or None if not cached
+        """
+        with self._lock:
+            value = self._items.pop(key, None)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items[key] = value
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """store values of a signal, drop least recently used ones if needed
+
+        :param key: reader and signal key
+        :param value: signal values
+        """
+        size = _nbytes(value)
+        if size > self.budget:
+            return
+
+        with self._lock:
+            if key in self._items:
+                return
+            while self._items and self._used + size > self.budget:
+                self._used -= _nbytes(self._items.popitem(last=False)[1])
+                self.evictions += 1
+            self._items[key] = value
+            self._used += size
+
+    def clear(self):
+        """drop all signals, e.g. when next recording is loaded"""
+        with self._lock:
+            self._items.clear()
+            self._used = 0
+
+    def reset_stats(self):
+        """restart counting hits and misses"""
+        self.hits = self.misses = self.evictions = 0
+
+    @property
+    def stats(self):
+        """hits, misses, evictions, number of cached signals and their size in bytes
+
+        :rtype: dict
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "signals": len(self._items), "bytes": self._used}
+
+
+class CachedSignalReader(object):
+    """signal reader opened on first access and reading through a `SignalCache`
+
+    supports reading like `SignalReader` (``[]``, `signals`, `window`), other attributes are
+    taken from the opened reader
+    """
+    def __init__(self, cache, filename, **kwargs):
+        """keep file and options to open it later on
+
+        :param cache: cache to use
+        :type cache: SignalCache
+        :param filename: path/to/file, None if not available
+        :param kwargs: options for `SignalReader`
+        """
+        self._cache = cache
+        self._filename = filename
+        self._kwargs = kwargs
+        self._reader = None
+        self._lock = Lock()
+        self._file_key = None if filename is None else \
+            (opath.normcase(opath.abspath(filename)), tuple(sorted(kwargs.items())))
+
+    def __nonzero__(self):
+        """available if a file is given, without opening it"""
+        return self._filename is not None
+
+    @property
+    def is_open(self):
+        """True if the file was opened already"""
+        return self._reader is not None
+
+    @property
+    def file_key(self):
+        """key of the file and its options, equal for readers of the same file"""
+        return self._file_key
+
+    @property
+    def reader(self):
+        """the underlying reader, opened now if not done yet
+
+        :rtype: SignalReader
+        """
+        if self._reader is None:
+            with self._lock:
+                if self._reader is None:
+                    self._reader = open_signal_reader(self._filename, **self._kwargs)
+        return self._reader
+
+    def __getattr__(self, name):
+        """public attributes of the reader"""
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.reader, name)
+
+    def __contains__(self, name):
+        return name in self.reader
+
+    def __len__(self):
+        return len(self.reader)
+
+    def __iter__(self):
+        for name in self.reader.signal_names:
+            yield name, self[name]
+
+    def __str__(self):
+        return str(self._filename) if self._reader is None else str(self._reader)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """close reader if opened"""
+        with self._lock:
+            if self._reader is not None:
+                self._reader.close()
+                self._reader = None
+
+    def _key(self, signal):
+        """cache key of a signal request"""
+        if type(signal) == slice:
+            signal = (signal.start, signal.stop, signal.step)
+        elif type(signal) == list:
+            signal = tuple(signal)
+        return self._file_key, signal
+
+    def __getitem__(self, signal):
+        """signal by name or index as `SignalReader`, taken from cache if available
+
+        :param signal: signal name or index or sliced index
+        :return: copy of signal values
+        """
+        if self.reader.resident:
+            return self.reader[signal]
+
+        key = self._key(signal)
+        value = self._cache.get(key)
+        if value is None:
+            value = self.reader[signal]
+            self._cache.put(key, value)
+        return _copy(value)
+
+    def signals(self, signals, offset=None, count=None):
+        """several signals as `SignalReader.signals`, only the ones not in cache are read from file
+
+        :param signals: list of signal names or indices
+        :param offset: data offset of signals
+        :param count: number of samples to return
+        :return: copies of signal values by signal name / index
+        :rtype: dict
+        """
+        if self.reader.resident:
+            return self.reader.signals(signals, offset, count)
+
+        keys = dict((sig, self._key(sig if offset is None and count is None else (sig, offset, count)))
+                    for sig in self.reader._signal_expand(signals))  # pylint: disable=W0212
+        values = dict((sig, self._cache.get(key)) for sig, key in keys.items())
+
+        missing = [sig for sig, value in values.items() if value is None]
+        if missing:
+            for sig, value in self.reader.signals(missing, offset, count).items():
+                self._cache.put(keys[sig], value)
+                values[sig] = value
+
+        return dict((sig, _copy(value)) for sig, value in values.items())
+
+    def derived(self, key, func):
+        """values computed from signals of this file (and others), kept in the cache like the signals
+
+        the object is shared, not copied: all users of the cache get the same one
+
+        :param key: hashable key of the values, has to include the keys of other files used
+        :param func: function computing the values if not cached
+        :return: cached or computed values
+        """
+        key = self._file_key, "derived", key
+        value = self._cache.get(key)
+        if value is None:
+            value = func()
+            self._cache.put(key, value)
+        return value
+
+    def window(self, signal, start=None, stop=None, timestamp=SIG_TIMESTAMP):
+        """signal(s) inside a time window as `SignalReader.window`
+
+        :param signal: signal name or index or list of them
+        :param start: first timestamp of window, None to start at first sample
+        :param stop: last timestamp of window (included), None to stop at last sample
+        :param timestamp: name of timestamp signal
+        :return: copy of signal values or dict of them if a list was given
+        """
+        offset, count = self.reader.time_range(start, stop, timestamp)
+        # pylint: disable=W0212
+        signals = self.reader._signal_expand(signal if type(signal) in (tuple, list) else [signal])
+        length = min([self.reader.signal_length(sig) for sig in signals] or [0])
+        offset = min(offset, length)
+        sigs = self.signals(signals, offset, min(count, length - offset))
+
+        return sigs if type(signal) in (tuple, list) else sigs[signal]
+
+
+"""
+CHANGE LOG:
+-----------
+"""
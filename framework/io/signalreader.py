@@ -18,13 +18,19 @@ Binary Signal Read Class
 """
 
 # - import Python modules ----------------------------------------------------------------------------------------------
-from csv import Error, reader
-from os import path as opath, SEEK_END, SEEK_CUR
+from csv import reader
+from hashlib import md5
+from json import dumps, loads
+from os import path as opath, SEEK_END, SEEK_CUR, stat, rename, remove, makedirs
 from re import match, escape, IGNORECASE
-from struct import unpack
+from struct import unpack, unpack_from
+from threading import Lock
 from zlib import decompress
 
-from numpy import inf, array
+from numpy import inf, array, empty, frombuffer, dtype, memmap, asarray, concatenate, diff, int64, float64, \
+    load as npload, savez, searchsorted, flatnonzero, isfinite, char
+from pandas import read_csv
+from pandas.errors import EmptyDataError
 # - import framework modules ------------------------------------------------------------------------------------------------
 from framework.util.error import StkError
 
@@ -37,6 +43,15 @@ SIG_TYPE = 'SignalType'
 SIG_ARRAYLEN = 'ArrayLength'
 SIG_OFFSET = 'Offsets'
 SIG_SAMPLES = 'SampleCount'
+SIG_OFFSET_POS = 'OffsetPosition'
+SIG_OFFSET_COUNT = 'OffsetCount'
+SIG_TIMESTAMP = 'MTS.Package.TimeStamp'
+
+BATCH_READ_GAP = 1 << 16  # max. gap between blocks still read in one go by batch reads
+BATCH_READ_SIZE = 1 << 24  # max. size of one sequential batch read
+
+CSV_CACHE_EXT = '.sig.npz'
+CSV_CACHE_META = '__meta__'
 
 
 # - classes ------------------------------------------------------------------------------------------------------------
@@ -52,7 +67,10 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
     """
     **Delimited reader class**
 
-    internal class used by SignalReader in case of reading csv type files
+    internal class used by SignalReader in case of reading csv type files,
+    all columns are parsed in one pass by pandas' C parser on first request and kept in memory,
+    optionally the parsed columns are stored in a binary sidecar (numpy .npz) which is used on later opens
+    as long as size, modification time or content hash of the csv file still match
 
     use class `SignalReader` to read csv files
     """
@@ -60,8 +78,9 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
         """open / init cvs file
         """
         self._signal_names = []
-        self._signal_values = {}
-        self._signal_type = {}
+        self._signal_idx = {}
+        self._signal_values = None
+        self._lock = Lock()
 
         self._all_types = {long: 0, float: 1, str: 2}
 
@@ -75,6 +94,7 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
         if self._scan_type not in ('prefetch', 'no_prefetch'):
             self._scan_type = 'prefetch'
         self._scan_opt = kwargs.pop('scan_opt', 'scan_auto').lower()
+        self._cache = kwargs.pop('cache', None)
         if self._scan_opt not in ('scan_auto', 'scan_raw'):
             # self._scan_opt = self._match_type(self._scan_opt)
             if self._scan_opt == 'long':
@@ -109,7 +129,7 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
                 self._signal_names.remove('')
             for idx in xrange(len(self._signal_names)):
                 self._signal_names[idx] = self._signal_names[idx].strip()
-                self._signal_values[idx] = []
+                self._signal_idx.setdefault(self._signal_names[idx], idx)
 
             if self._scan_type == 'prefetch':
                 self._read_signals_values()
@@ -126,6 +146,7 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
             self._fp = None
 
             self._signal_names = None
+            self._signal_idx = None
             self._signal_values = None
 
     def __len__(self):
@@ -146,8 +167,7 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
         :return: length of signal in file
         :rtype:  int
         """
-        if len(self._signal_values[0]) == 0:
-            self._read_signals_values(self._signal_names[0])
+        self._read_signals_values()
         return len(self._signal_values[0])
 
     @property
@@ -172,104 +192,193 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
         if type(signal) in (tuple, list):
             return [self.signal(s) for s in signal]
 
-        self._read_signals_values(self._signal_names[signal] if type(signal) == int else signal)
+        self._read_signals_values()
 
         if type(signal) == str:
-            signal = self._signal_names.index(signal)
+            signal = self._signal_idx[signal]
 
-        try:
-            values = array(self._signal_values[signal], dtype=[tt for tt, it in self._all_types.items()
-                                                               if it == self._signal_type[signal]][0])
-        except KeyError:
-            values = array(self._signal_values[signal], dtype=float)
+        # copy as caller might change values, columns are kept for the lifetime of the reader
+        values = self._signal_values[signal].copy()
 
         if offset + count == 0:
             return values
         else:
             return values[offset:offset + count]
 
-    def _read_signals_values(self, signals_list=None):  # pylint: disable=R0912,R0915
-        """
-        Reads signal values from a simulation file - csv format.
-        This function reads a list of signal given as input.
-        When signals_list is 'None' all signal will be read
+    def signals(self, signals, offset=None, count=None):
+        """returns the values of several signals, as all columns are read together it's just a loop
 
-        :param signals_list:   the list of the signals
-        :return: dictionary with extracted signals, empty {} in case of errors
+        :param signals: list of names or indices of signals
+        :param offset: signal offset to start
+        :param count: number of signal items to return
+        :return: list of signal values
         """
-        if signals_list is None:
-            signals_list = self._signal_names
-
-        if type(signals_list) == str:
-            signals_list = [signals_list]
-
-        # prevent loading already loaded ones
-        removes = [sig for sig in signals_list if len(self._signal_values[self._signal_names.index(sig)]) > 0]
-        for rem in removes:
-            signals_list.remove(rem)
+        offset = 0 if offset is None else offset
+        return [self.signal(sig)[offset:None if count is None else offset + count] for sig in signals]
 
-        if len(signals_list) == 0:
+    def _read_signals_values(self):
+        """
+        Reads signal values from a simulation file - csv format, see `_parse_signals_values`.
+        Nothing is done if values are already read, reading is guarded by a lock so the reader can be shared by threads.
+        """
+        if self._signal_values is not None:
             return
 
-        for signal in signals_list:
-            if signal not in self._signal_type:
-                if self._scan_opt == 'scan_raw':
-                    self._signal_type[self._signal_names.index(signal)] = 2
-                else:
-                    self._signal_type[self._signal_names.index(signal)] = 0
-
-        self._fp.seek(0)
-        # if skip_lines constructor parameter is not specified
-        for _ in xrange(self._skip_lines + 1 + self._skip_data_lines):
-            self._csv.next()
+        with self._lock:
+            if self._signal_values is None and not self._load_cache():
+                self._parse_signals_values()
 
+    def _parse_signals_values(self):
+        """
+        Reads signal values from a simulation file - csv format.
+        All columns are parsed in one pass using pandas' C parser, the type of each column is determined once
+        with the rules of the former row by row parsing: with 'scan_auto' integer columns become long (float if a
+        value has a sign like -5 or +5), float columns float and all others are converted value by value as being
+        mixed or special (e.g. 1.#INF). Texts of integer and non-finite float columns are checked in a second pass.
+        With 'scan_opt' set to 'long' or 'float' the values are of that type.
+        """
+        kwargs = {'sep': self._delimiter, 'header': None, 'skiprows': self._skip_lines + 1 + self._skip_data_lines,
+                  'usecols': range(len(self._signal_names)), 'na_filter': False, 'engine': 'c'}
         if self._scan_opt == 'scan_raw':
-            try:
-                for row in self._csv:
-                    for signal in signals_list:
-                        try:
-                            idx = self._signal_names.index(signal)
-                            self._signal_values[idx].append(str(row[idx]))
-                        except IndexError:
-                            pass
-                    # del row
-            except Error as ex:
-                raise SignalReaderException('file %s, line %d: %s' % (self._file_path, self._csv.line_num, ex))
-
+            kwargs['dtype'] = str
         elif self._scan_opt == 'scan_auto':
-            try:
-                for row in self._csv:
-                    for signal in signals_list:
-                        idx = self._signal_names.index(signal)
-                        try:
-                            if match(r"^(\d+)$", row[idx].lstrip()) is not None:
-                                val = long(row[idx])
-                            elif(match(r"[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*\Z",
-                                       row[idx].lstrip()) is not None):
-                                val = float(row[idx])
-                            else:
-                                val = str(row[idx])
-
-                            if type(val) == str:
-                                if match(r"[+]?1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
-                                    val = inf
-                                elif match(r"-1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
-                                    val = -inf
-                            self._signal_values[idx].append(val)
-                            self._signal_type[idx] = max(self._all_types[type(val)], self._signal_type[idx])
-                        except IndexError:
-                            self._signal_type[idx] = type(float)
-                    # del row
-            except Error as ex:
-                raise SignalReaderException('file %s, line %d: %s' % (self._file_path, self._csv.line_num, ex))
+            kwargs['float_precision'] = 'round_trip'
         else:
-            try:
-                for row in self._csv:
-                    for signal in signals_list:
-                        idx = self._signal_names.index(signal)
-                        self._signal_values[idx].append(self._scan_opt(row[idx]))
-            except Error as ex:
-                raise SignalReaderException('file %s, line %d: %s' % (self._file_path, self._csv.line_num, ex))
+            kwargs['dtype'] = {long: int64, float: float64}.get(self._scan_opt, self._scan_opt)
+            kwargs['float_precision'] = 'round_trip'
+
+        try:
+            self._fp.seek(0)
+            data = read_csv(self._fp, **kwargs)
+        except EmptyDataError:
+            data = {}
+        except Exception as ex:
+            raise SignalReaderException('file %s: %s' % (self._file_path, ex))
+
+        values = {}
+        texts = []
+        for idx in xrange(len(self._signal_names)):
+            col = data[idx].values if idx in data else array([], dtype=int64)
+            if self._scan_opt == 'scan_raw':
+                values[idx] = array(col, dtype=str)
+            elif self._scan_opt != 'scan_auto':
+                values[idx] = col
+            elif col.dtype == int64 and (col < 0).any():
+                values[idx] = col.astype(float64)
+            elif col.dtype in (int64, float64):
+                values[idx] = col
+                if len(col) and (col.dtype == int64 or not isfinite(col).all()):
+                    texts.append(idx)
+            else:
+                values[idx] = self._convert_auto(col)
+
+        # signs (+5, -0), trailing blanks and texts like nan or inf can't be told from the parsed values
+        if texts:
+            kwargs.update(usecols=texts, dtype=str)
+            kwargs.pop('float_precision')
+            self._fp.seek(0)
+            data = read_csv(self._fp, **kwargs)
+            for idx in texts:
+                col = data[idx].values
+                if values[idx].dtype != int64:
+                    values[idx] = self._convert_auto(col)
+                elif not char.isdigit(char.lstrip(col.astype(str))).all():
+                    values[idx] = values[idx].astype(float64)
+        self._signal_values = values
+        self._save_cache()
+
+    def _cache_path(self):
+        """path of the binary sidecar for this file: next to the csv file if cache option is True,
+        inside the given directory otherwise (name extended by a hash of the full path to stay unique)
+        """
+        if self._cache is True:
+            return self._file_path + CSV_CACHE_EXT
+        fpath = opath.abspath(self._file_path)
+        return opath.join(self._cache, "%s_%s%s" % (opath.basename(fpath), md5(fpath).hexdigest()[:8], CSV_CACHE_EXT))
+
+    def _cache_key(self, content_hash=True):
+        """key to validate a sidecar: size and mtime of csv file, options affecting the parsing
+        and - if requested - md5 hash of the file content
+
+        :param content_hash: calculate md5 hash of file content
+        :return: key as dict
+        """
+        fstat = stat(self._file_path)
+        key = {'size': fstat.st_size, 'mtime': fstat.st_mtime, 'columns': len(self._signal_names),
+               'options': [self._delimiter, self._skip_lines, self._skip_data_lines, str(self._scan_opt)]}
+        if content_hash:
+            hsh = md5()
+            with open(self._file_path, "rb") as fpt:
+                for chunk in iter(lambda: fpt.read(1 << 20), ''):
+                    hsh.update(chunk)
+            key['md5'] = hsh.hexdigest()
+        return key
+
+    def _load_cache(self):
+        """load signal values from binary sidecar if available and still valid,
+        content hash is only calculated if the mtime of the csv file changed
+
+        :return: True if values are loaded
+        """
+        if not self._cache:
+            return False
+        try:
+            cpath = self._cache_path()
+            if not opath.isfile(cpath):
+                return False
+            with npload(cpath) as npz:
+                meta = loads(str(npz[CSV_CACHE_META]))
+                key = self._cache_key(False)
+                if meta['size'] != key['size'] or meta['columns'] != key['columns'] \
+                        or meta['options'] != key['options']:
+                    return False
+                if meta['mtime'] != key['mtime'] and meta['md5'] != self._cache_key()['md5']:
+                    return False
+                self._signal_values = {idx: npz['c%d' % idx] for idx in xrange(len(self._signal_names))}
+        except Exception as ex:
+            print("csv cache of '%s' not usable: %s" % (self._file_path, ex))
+            return False
+        return True
+
+    def _save_cache(self):
+        """store signal values into binary sidecar, written to a temporary file first
+        so that no other reader sees a partly written sidecar
+        """
+        if not self._cache:
+            return
+        try:
+            cpath = self._cache_path()
+            if not opath.isdir(opath.dirname(opath.abspath(cpath))):
+                makedirs(opath.dirname(opath.abspath(cpath)))
+            cols = {'c%d' % idx: val for idx, val in self._signal_values.iteritems()}
+            cols[CSV_CACHE_META] = array(dumps(self._cache_key()))
+            tmp = "%s.%d.tmp" % (cpath, id(self))
+            with open(tmp, "wb") as fpt:
+                savez(fpt, **cols)
+            if opath.exists(cpath):
+                remove(cpath)
+            rename(tmp, cpath)
+        except Exception as ex:
+            print("csv cache of '%s' not written: %s" % (self._file_path, ex))
+
+    def _convert_auto(self, col):
+        """convert column values one by one to long, float or str and return an array of the widest type
+        """
+        vals, styp = [], 0
+        for val in col:
+            val = str(val)
+            if match(r"^(\d+)$", val.lstrip()) is not None:
+                val = long(val)
+            elif match(r"[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*\Z", val.lstrip()) is not None:
+                val = float(val)
+            elif match(r"[+]?1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
+                val = inf
+            elif match(r"-1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
+                val = -inf
+            vals.append(val)
+            styp = max(self._all_types[type(val)], styp)
+
+        return array(vals, dtype=[tt for tt, it in self._all_types.items() if it == styp][0])
 
 
 class BsigReader(object):  # pylint: disable=R0902,R0924
@@ -285,8 +394,9 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
         :param fp: file to use, can be a file pointer to an already open file or a name of file
         :keyword use_numpy: use numpy for signal values, default: True
         """
-        self._arr_frmt = {0x0008: 'B', 0x8008: 'b', 0x0010: 'H', 0x8010: 'h', 0x0020: 'L', 0x8020: 'l', 0x0040: 'Q',
-                          0x8040: 'q', 0x9010: 'f', 0x9020: 'd'}
+        # fixed size, little endian types to decode data blocks as numpy buffer views
+        self._arr_frmt = {0x0008: '<u1', 0x8008: '<i1', 0x0010: '<u2', 0x8010: '<i2', 0x0020: '<u4', 0x8020: '<i4',
+                          0x0040: '<u8', 0x8040: '<i8', 0x9010: '<f4', 0x9020: '<f8'}
         self._sig_frmt = {'c': 1, 'b': 1, 'B': 1, 'h': 2, 'H': 2, 'I': 4, 'l': 4, 'L': 4, 'q': 8, 'Q': 8,
                           'f': 4, 'd': 8}
         file_header = 24
@@ -295,6 +405,7 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
         self._npusage = kw.pop('use_numpy', True)
         self._name_sense = kw.pop('sensitive', True)
         self._selfopen = None
+        self._lock = Lock()  # guards file position for positional reads
 
         try:
             if hasattr(self._fp, 'read'):
@@ -327,19 +438,25 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
             if self._read_sig('c' * 4) != ('B', 'I', 'N', '\x00'):  # bin signature
                 raise SignalReaderException("BSIG signature wrong!")
 
-            # read signal description
+            # read signal description in one go and index signal names
             self._fp.seek(self._file_size - file_header - self._hdr_size)  # = self._hdr_offset
-            for _ in xrange(signal_count):
-                sig_name_len = self._read_sig('H')[0]
-                signal_name = "".join(self._read_sig('c' * sig_name_len))
-                array_len, stype = self._read_sig('II')
+            hdr, pos = self._fp.read(self._hdr_size), 0
+            self._sig_index = {}
+            for idx in xrange(signal_count):
+                sig_name_len = unpack_from('H', hdr, pos)[0]
+                signal_name = hdr[pos + 2:pos + 2 + sig_name_len]
+                array_len, stype = unpack_from('II', hdr, pos + 2 + sig_name_len)
+                pos += 10 + sig_name_len
                 self._signal_data.append({SIG_NAME: signal_name, SIG_TYPE: stype, SIG_ARRAYLEN: array_len})
+                self._sig_index.setdefault(signal_name if self._name_sense else signal_name.lower(), idx)
 
-            # read offsets data
+            # read offsets data, just remember where to find them, they're decoded on first signal request
             self._fp.seek(self._file_size - file_header - self._hdr_size - offset_size)
+            offs_len = self._sig_frmt[self._offstype]
             for sig in self._signal_data:
-                offset_count, sig[SIG_SAMPLES] = self._read_sig('II')
-                sig[SIG_OFFSET] = self._read_sig(self._offstype * offset_count) if offset_count else []
+                sig[SIG_OFFSET_COUNT], sig[SIG_SAMPLES] = self._read_sig('II')
+                sig[SIG_OFFSET_POS] = self._fp.tell()
+                self._fp.seek(sig[SIG_OFFSET_COUNT] * offs_len, SEEK_CUR)
         except SignalReaderException:
             self.close()
             raise
@@ -357,6 +474,7 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
                 self._fp = None
 
                 self._signal_data = None
+                self._sig_index = None
             except:
                 raise SignalReaderException("An error occurred while closing the file.")
 
@@ -374,17 +492,16 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
     def siglen(self, signal):
         """provides length of a signal, as csv's are of same length we do it the easy way
 
-        :param signal: name of signal
+        :param signal: name or index of signal
         :return: length of signal
         :rtype:  int
         """
         if signal is None:
             return self._signal_data[0][SIG_SAMPLES]
+        elif type(signal) == int and 0 <= signal < len(self._signal_data):
+            return self._signal_data[signal][SIG_SAMPLES]
 
-        if self._name_sense:
-            sigdet = next((s for s in self._signal_data if s[SIG_NAME] == signal), None)
-        else:
-            sigdet = next((s for s in self._signal_data if s[SIG_NAME].lower() == signal.lower()), None)
+        sigdet = self._sigdet(signal)
         if sigdet is None:
             raise SignalReaderException("no signal by that name found: %s" % str(signal))
 
@@ -401,14 +518,38 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
         """
         # check for input argument validity
         if type(signal) in (tuple, list):
-            return [self.signal(s) for s in signal]
-        elif type(signal) == int and 0 <= signal < len(self._signal_data):
+            return self.signals(signal)
+
+        sigoffs, frmt, offset, count, alen = self._plan(signal, offset, count)
+        return self._extract(self._read_blocks(sigoffs, frmt), offset, count, alen)
+
+    def signals(self, signals, offset=None, count=None):
+        """Function returns the data of several signals read together:
+        the data blocks of all signals are sorted by file offset and read in large sequential chunks.
+
+        :param signals: list of indices / names of signals
+        :param offset: data offset of signals
+        :param count: length of data
+        :return: list of signal data as arrays (default) or lists as defined during reader initialisation
+        :rtype: list
+        """
+        plans = [self._plan(sig, offset, count) for sig in signals]
+        data = self._read_blocks_batch([(sigoffs, frmt) for sigoffs, frmt, _, _, _ in plans])
+        return [self._extract(sig, offset, count, alen) for sig, (_, _, offset, count, alen) in zip(data, plans)]
+
+    def _plan(self, signal, offset, count):
+        """find data blocks needed to read a signal part
+
+        :param signal: index / name of signal
+        :param offset: data offset of signal
+        :param count: length of data
+        :return: file offsets of blocks, data format, start and stop inside read blocks and array length
+        :rtype: tuple
+        """
+        if type(signal) == int and 0 <= signal < len(self._signal_data):
             sigdet = self._signal_data[signal]
         else:
-            if self._name_sense:
-                sigdet = next((s for s in self._signal_data if s[SIG_NAME] == signal), None)
-            else:
-                sigdet = next((s for s in self._signal_data if s[SIG_NAME].lower() == signal.lower()), None)
+            sigdet = self._sigdet(signal)
             if sigdet is None:
                 raise SignalReaderException("signal not found: %s" % signal)
 
@@ -425,51 +566,131 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
         else:
             count += offset
 
-        frmt = self._arr_frmt[sigdet[SIG_TYPE]]  # data format
-        dlen = self._sig_frmt[frmt]  # length of one data point
+        frmt = dtype(self._arr_frmt[sigdet[SIG_TYPE]])  # data format
+        dlen = frmt.itemsize  # length of one data point
         blkl = self._block_size / dlen  # real block length
         alen = sigdet[SIG_ARRAYLEN]  # array length of signal
-        sig = []  # extracted signal
 
         # increment with array length
         offset *= alen
         count *= alen
 
-        # precalc reduced offsets
-        sigoffs = list(sigdet[SIG_OFFSET])
-        while count < (len(sigoffs) - 1) * blkl:  # cut last offsets
-            sigoffs.pop(len(sigoffs) - 1)
+        # precalc reduced offsets: cut last offsets not needed for stop point and first ones before start point
+        first = max(offset, 0) / blkl
+        sigoffs = self._offsets(sigdet)[first:max(count / blkl + 1, 0)]
+        offset -= first * blkl  # reduce starting point
+        count -= first * blkl  # reduce stop point
 
-        while offset >= blkl:  # cut first offsets
-            sigoffs.pop(0)
-            offset -= blkl  # reduce starting point
-            count -= blkl  # reduce stop point
+        return sigoffs, frmt, offset, count, alen
 
-        # without compression we could even cut down more reading,
-        # but I'll leave it for now as it makes more if then else
+    def _extract(self, sig, offset, count, alen):
+        """cut signal out of read blocks and shape it
 
-        # read data blocks
+        :param sig: data of read blocks
+        :param offset: start inside blocks
+        :param count: stop inside blocks
+        :param alen: array length of signal
+        :return: signal data as an array (default) or list as defined during reader initialisation
+        :rtype: array or list
+        """
+        sig = sig[offset:count]  # extracted signal
+        if alen > 1:
+            sig = sig.reshape((sig.size / alen, alen))
+
+        return sig if self._npusage else sig.tolist()
+
+    def _sigdet(self, signal):
+        """details of signal with given name, using hashed name index
+
+        :param signal: name of signal
+        :return: signal details or None if not found
+        :rtype: dict
+        """
+        idx = self._sig_index.get(signal if self._name_sense else signal.lower())
+        return None if idx is None else self._signal_data[idx]
+
+    def _offsets(self, sigdet):
+        """offsets of all data blocks of a signal, decoded from file on first request
+
+        :param sigdet: signal details
+        :return: file offsets of signal's data blocks
+        :rtype: tuple
+        """
+        if SIG_OFFSET not in sigdet:
+            count = sigdet[SIG_OFFSET_COUNT]
+            data = self._pread(sigdet[SIG_OFFSET_POS], self._sig_frmt[self._offstype] * count)
+            sigdet[SIG_OFFSET] = unpack(self._offstype * count, data) if count else ()
+        return sigdet[SIG_OFFSET]
+
+    def _read_blocks(self, sigoffs, frmt):
+        """read data blocks at given offsets directly into a preallocated signal array
+
+        :param sigoffs: file offsets of the blocks to read
+        :param frmt: numpy data type of signal
+        :return: concatenated data of all blocks
+        :rtype: array
+        """
+        sig = empty(len(sigoffs) * (self._block_size / frmt.itemsize), dtype=frmt)
+        pos = 0
         for offs in sigoffs:
-            self._fp.seek(offs)
+            data = self._read_block(offs)
             if self._compression:
-                data = self._fp.read(self._read_sig('I')[0])
                 data = decompress(data)
-            else:
-                data = self._fp.read(self._block_size)
 
-            data = unpack(frmt * (len(data) / dlen), data)
-            sig.extend(data)
+            data = frombuffer(data, dtype=frmt, count=len(data) / frmt.itemsize)
+            sig[pos:pos + data.size] = data
+            pos += data.size
 
-        if self._npusage:
-            if alen == 0:
-                return array(sig[offset:count], dtype=frmt)
-            elif alen == 1:
-                return array(sig[offset:count], dtype=frmt)
-            return array(sig[offset:count], dtype=frmt).reshape(((count - offset) / alen, alen))
-        else:
-            if alen == 1:
-                return sig[offset:count]
-            return [sig[i:i + alen] for i in xrange(offset, count, alen)]
+        return sig[:pos]
+
+    def _read_blocks_batch(self, requests):
+        """read data blocks of several signals in one sweep through the file,
+
+        all blocks are sorted by file offset, neighboured blocks (gap below BATCH_READ_GAP) are read
+        with one call of up to BATCH_READ_SIZE bytes and every block is decompressed once
+
+        :param requests: list of file offsets of the blocks and numpy data type per signal
+        :return: concatenated data of all blocks per signal
+        :rtype: list
+        """
+        # upper limit of a stored block: zlib's worst case expansion and length prefix
+        blk_max = self._block_size + (self._block_size >> 10) + 64 if self._compression else self._block_size
+        blocks = sorted((offs, ridx, bidx) for ridx, (sigoffs, _) in enumerate(requests)
+                        for bidx, offs in enumerate(sigoffs))
+        decoded = [[None] * len(sigoffs) for sigoffs, _ in requests]
+
+        idx = 0
+        while idx < len(blocks):
+            start, end = blocks[idx][0], idx + 1
+            while end < len(blocks) and blocks[end][0] - blocks[end - 1][0] <= BATCH_READ_GAP \
+                    and blocks[end][0] + blk_max - start <= BATCH_READ_SIZE:
+                end += 1
+            buf = self._pread(start, blocks[end - 1][0] + blk_max - start)
+
+            for offs, ridx, bidx in blocks[idx:end]:
+                frmt, pos = requests[ridx][1], offs - start
+                if self._compression:
+                    size = unpack_from('I', buf, pos)[0]
+                    data = buf[pos + 4:pos + 4 + size]
+                    if len(data) < size:  # block is larger than expected, read it on its own
+                        data = self._pread(offs + 4, size)
+                    data = decompress(data)
+                    data = frombuffer(data, dtype=frmt, count=len(data) / frmt.itemsize)
+                else:
+                    data = frombuffer(buf, dtype=frmt, offset=pos,
+                                      count=min(self._block_size, len(buf) - pos) / frmt.itemsize)
+                decoded[ridx][bidx] = data
+            idx = end
+
+        sigs = []
+        for (sigoffs, frmt), blks in zip(requests, decoded):
+            sig, pos = empty(len(sigoffs) * (self._block_size / frmt.itemsize), dtype=frmt), 0
+            for data in blks:
+                sig[pos:pos + data.size] = data
+                pos += data.size
+            sigs.append(sig[:pos])
+
+        return sigs
 
     @property
     def signal_names(self):
@@ -480,6 +701,30 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
         """
         return [sig[SIG_NAME] for sig in self._signal_data]
 
+    def _pread(self, offs, size):
+        """positional read, seek and read are done under lock as the file object is shared,
+        so one reader can be used by several threads, decompression is done outside by the callers
+
+        :param offs: file offset to read from
+        :param size: number of bytes to read
+        :return: data read
+        :rtype: str
+        """
+        with self._lock:
+            self._fp.seek(offs)
+            return self._fp.read(size)
+
+    def _read_block(self, offs):
+        """read one data block at given offset under lock, for compressed files the length is stored in front
+
+        :param offs: file offset of block
+        :return: (compressed) data of block
+        :rtype: str
+        """
+        with self._lock:
+            self._fp.seek(offs)
+            return self._fp.read(self._read_sig('I')[0] if self._compression else self._block_size)
+
     def _read_sig(self, stype):
         """read signal of given type
         """
@@ -489,6 +734,80 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
             raise SignalReaderException("An error occured while reading binary data.")
 
 
+class BsigMmapReader(BsigReader):  # pylint: disable=R0902,R0924
+    """memory mapped bsig reader class
+
+    internal class used by SignalReader to read uncompressed binary signal files (type bsig2 and bsig3)
+    without copying data: signals are returned as read-only numpy views into the mapped file,
+    only if the blocks of a signal are not stored one after the other they are concatenated into one copy.
+
+    compressed files can't be mapped, they are read as `BsigReader` does.
+
+    use class `SignalReader` with option ``mmap=True`` to read files
+    """
+    def __init__(self, fp, **kw):
+        """map the file into memory
+
+        :param fp: file to use, can be a file pointer to an already open file or a name of file
+        :keyword use_numpy: use numpy for signal values, default: True
+        """
+        self._mmap = None
+        BsigReader.__init__(self, fp, **kw)
+
+        if not self._compression:
+            try:
+                self._mmap = memmap(self._fp, dtype='u1', mode='r')
+            except:
+                self.close()
+                raise SignalReaderException("unable to map signal file into memory!")
+
+    def close(self):
+        """release mapping and close signal file,
+
+        views already returned stay valid as they keep their own reference to the mapping
+        """
+        self._mmap = None
+        BsigReader.close(self)
+
+    def _read_blocks(self, sigoffs, frmt):
+        """provide data blocks at given offsets from mapped file
+
+        :param sigoffs: file offsets of the blocks to read
+        :param frmt: numpy data type of signal
+        :return: concatenated data of all blocks, a view if blocks are contiguous, otherwise a copy
+        :rtype: array
+        """
+        if self._mmap is None:
+            return BsigReader._read_blocks(self, sigoffs, frmt)
+
+        if len(sigoffs) == 0:
+            return empty(0, dtype=frmt)
+
+        if len(sigoffs) == 1 or (diff(sigoffs) == self._block_size).all():
+            return self._view(sigoffs[0], sigoffs[-1] + self._block_size, frmt)
+
+        return concatenate([self._view(offs, offs + self._block_size, frmt) for offs in sigoffs])
+
+    def _read_blocks_batch(self, requests):
+        """provide data blocks of several signals from mapped file, no sweep needed as nothing is read
+
+        :param requests: list of file offsets of the blocks and numpy data type per signal
+        :return: concatenated data of all blocks per signal
+        :rtype: list
+        """
+        if self._mmap is None:
+            return BsigReader._read_blocks_batch(self, requests)
+
+        return [self._read_blocks(sigoffs, frmt) for sigoffs, frmt in requests]
+
+    def _view(self, start, stop, frmt):
+        """view on mapped file between start and stop (limited by file size) in given data format
+        """
+        stop = min(stop, self._file_size)
+        stop -= (stop - start) % frmt.itemsize
+        return asarray(self._mmap[start:stop]).view(frmt)
+
+
 class SignalReader(object):
     """
     **MAIN Class for Signal File Read.** (\\*.bsig (aka \\*.bin), \\*.csv)
@@ -525,9 +844,12 @@ class SignalReader(object):
                               'scan_type'=<'prefetch','no_prefetch'>,
                               'scan_opt'=<'scan_auto','scan_raw','float',...>,
                               'skip_lines'=<number_of_header_lines_to_skip>,
-                              'skip_data_lines'=<number_of_data_lines_to_skip>)
+                              'skip_data_lines'=<number_of_data_lines_to_skip>,
+                              'cache'=<True,'path/to/cache_dir'>)
         # read bsig files (version 2 or 3)
         reader = SignalReader(<file.bsig>)
+        # map uncompressed bsig files into memory, signals are read-only views into the file
+        reader = SignalReader(<file.bsig>, mmap=True)
 
         # check if signal with name is stored in file:
         if "MTS.Package.TimeStamp" not in reader:
@@ -557,6 +879,8 @@ class SignalReader(object):
         with SignalReader('file_hla_xyz.bsig') as sr:
             signals = sr[['Time stamp','Cycle counter']] # retrieves a list of both signals --> [[<sig1>], [<sig2>]]
             signals = sr[['sig_obj_dist*']]  # matching: sig_obj_dist_x, sig_obj_dist_y, sig_obj_distrel_x, ...
+            # read all object signals in one sweep through the file --> {<name>: <sig>, ...}
+            signals = sr.signals(['SIM VFB.ObjList[%d].fDistX' % i for i in xrange(100)])
 
         # EXAMPLE 4
         with SignalReader('file_hla_xyz.bsig') as sr:
@@ -567,6 +891,10 @@ class SignalReader(object):
             for n, v in sr:  # iterate over names and signals
                 print("%s: %d" % (n, v.size))
 
+        with SignalReader('file_fct.bsig') as sr:
+            # samples between two MTS.Package.TimeStamp values (both included), e.g. of a bpl section
+            signal = sr.window('Cycle counter', 1480000000, 1480002000)
+
         with SignalReader('file_hla_xyz.bsig') as sr:
             signals = sr['Time stamp':50:250] # retrieves 200 samples of time stamp signal from offset 50 onwards
 
@@ -627,20 +955,26 @@ class SignalReader(object):
                             default: True
         :keyword sensitive: (bsig files)boolean value that indicates whether to treat signal names case sensitive,
                             default: True
+        :keyword mmap: (bsig files) boolean value that indicates whether to map uncompressed files into memory,
+                       signals are returned as read-only views into the mapped file then, default: False
         :keyword delim: (csv files) delimiter char for columns
         :keyword scan_type: (csv files) can be 'no_prefetch' or 'prefetch' to read in data at init
         :keyword scan_opt: (csv files) 'can be 'scan_auto', 'scan_raw' or e.g. 'float', 'long' or 'str'
         :keyword scip_lines: (csv files) how many lines should be scripped / ignored reading in at start of file
         :keyword scip_data_lines: (csv files) how many lines of data should be scripped reading in at start
+        :keyword cache: (csv files) True to store parsed columns in a binary sidecar (<file.csv>.sig.npz) next to
+                        the csv file or path of a directory to store it there, later opens of the unchanged file
+                        load the values from it instead of parsing the text, default: None (no cache)
         """
         self._fp = filename
         self._name_sense = True
         self.delim = None
+        mmap = kw.pop('mmap', False)
 
         if opath.splitext(self._fp.name if hasattr(self._fp, 'read')
                           else filename)[1].lower() in ('.bsig', '.bin', '.tstp') or kw.pop('type', None) == 'bsig':
             self._name_sense = kw.get('sensitive', True)
-            self._reader = BsigReader(self._fp, **kw)
+            self._reader = (BsigMmapReader if mmap else BsigReader)(self._fp, **kw)
             self._type = "bsig"
         else:
             self._reader = CsvReader(self._fp, **kw)
@@ -649,6 +983,8 @@ class SignalReader(object):
             #print ("csv reader is in use")
 
         self._signal_names = self._reader.signal_names
+        self._signal_set = frozenset(self._signal_names)
+        self._timestamps = {}
         self._iter_idx = 0
 
     def __enter__(self):
@@ -661,6 +997,7 @@ class SignalReader(object):
 
     def close(self):
         """close file"""
+        self._timestamps = {}
         self._reader.close()
 
     def __str__(self):
@@ -699,7 +1036,7 @@ class SignalReader(object):
         :param name: signal name to check
         :return: bool
         """
-        return name in self._signal_names
+        return name in self._signal_set
 
     def __getitem__(self, signal):
         """provide signal by name or index,
@@ -718,7 +1055,7 @@ class SignalReader(object):
                 return self._reader.signal(signal)
             elif type(signal) in (tuple, list):
                 signal = self._signal_expand(signal)
-                if set(signal).issubset(self._signal_names):
+                if self._signal_set.issuperset(signal):
                     return self._reader.signal(signal)
                 else:
                     return self._reader.signal(signal[0], signal[1], signal[2])
@@ -732,12 +1069,97 @@ class SignalReader(object):
             raise SignalReaderException("Data corruption inside signal file, unable to read signal '{}'!"
                                         .format(signal))
 
+    def signals(self, signals, offset=None, count=None):
+        """provide several signals read together in one sweep through the file,
+
+        the data blocks of all signals are sorted by their position in the file, read in large
+        sequential chunks and decompressed once, so this is much faster than requesting the
+        signals one by one, especially for interleaved signals like object lists
+
+        :param signals: list of signal names or indices, a signal name can be extended with '*' as wildcard
+        :type  signals: tuple/list
+        :param offset: data offset of signals
+        :type  offset: int
+        :param count: number of samples to return
+        :type  count: int
+        :return: signals with type as defined in reader initiation by signal name / index
+        :rtype:  dict
+        """
+        signals = self._signal_expand(signals)
+        try:
+            return dict(zip(signals, self._reader.signals(signals, offset, count)))
+        except (IndexError, SignalReaderException):
+            raise
+        except:
+            raise SignalReaderException("Data corruption inside signal file, unable to read signals '{}'!"
+                                        .format(signals))
+
+    def time_range(self, start=None, stop=None, timestamp=SIG_TIMESTAMP):
+        """find samples inside a time window [start, stop],
+
+        the timestamp signal is read once and searched binary as long as it's monotonic,
+        otherwise the window spans from first to last sample inside the time range
+
+        :param start: first timestamp of window, None to start at first sample
+        :type  start: int
+        :param stop: last timestamp of window (included), None to stop at last sample
+        :type  stop: int
+        :param timestamp: name of timestamp signal
+        :type  timestamp: str
+        :return: offset and count of samples inside window, e.g. to be used as ``sr[name:offset:count]``
+        :rtype:  tuple
+        """
+        if timestamp not in self._timestamps:
+            tstamp = asarray(self[timestamp])
+            self._timestamps[timestamp] = tstamp, bool((diff(tstamp) >= 0).all())
+        tstamp, monotonic = self._timestamps[timestamp]
+
+        if monotonic:
+            first = 0 if start is None else searchsorted(tstamp, start, 'left')
+            last = tstamp.size if stop is None else searchsorted(tstamp, stop, 'right')
+        else:
+            inside = flatnonzero((tstamp >= (tstamp.min() if start is None else start)) &
+                                 (tstamp <= (tstamp.max() if stop is None else stop)))
+            first, last = (inside[0], inside[-1] + 1) if inside.size else (0, 0)
+
+        return int(first), int(max(last - first, 0))
+
+    def window(self, signal, start=None, stop=None, timestamp=SIG_TIMESTAMP):
+        """provide signal(s) inside a time window [start, stop],
+
+        only the data blocks overlapping the window are read and decompressed,
+        e.g. to get a section from port ``CurrentSections``: ``sr.window(name, sec.start_ts, sec.end_ts)``
+
+        :param signal: signal name or index or list of them, a signal name can be extended with '*' as wildcard
+        :type  signal: str, int, tuple/list
+        :param start: first timestamp of window, None to start at first sample
+        :type  start: int
+        :param stop: last timestamp of window (included), None to stop at last sample
+        :type  stop: int
+        :param timestamp: name of timestamp signal
+        :type  timestamp: str
+        :return: signal with type as defined in reader initiation or dict of signals if a list was given
+        :rtype:  array, list or dict
+        """
+        offset, count = self.time_range(start, stop, timestamp)
+        if type(signal) in (tuple, list):
+            signals = self._signal_expand(signal)
+        else:
+            signals = [signal]
+
+        # timestamp and signals are of same length normally, if not: stay inside the signals
+        length = min([self._reader.siglen(sig) for sig in signals] or [0])
+        offset = min(offset, length)
+        sigs = self.signals(signals, offset, min(count, length - offset))
+
+        return sigs if type(signal) in (tuple, list) else sigs[signal]
+
     def _signal_expand(self, signals):
         """expand signals when asterix wildcard is in use
         """
         sigs = []
         for i in signals:
-            if '*' in i:
+            if type(i) == str and '*' in i:
                 k = '^' + escape(i).replace('\\*', '.*') + '$'
                 for l in self.signal_names:
                     if match(k, l, IGNORECASE if self._name_sense else 0):
@@ -756,6 +1178,14 @@ class SignalReader(object):
         """
         return self._signal_names
 
+    @property
+    def resident(self):
+        """True if the values of all signals are kept in memory by the reader (csv files)
+
+        :rtype: bool
+        """
+        return self._type == "dlm"
+
 
 """
 CHANGE LOG:
@@ -14,9 +14,13 @@ Signal Writer Class
 
 # - import Python modules ---------------------------------------------------------------------------------------------
 from csv import DictWriter
+from multiprocessing import cpu_count
+from multiprocessing.pool import ThreadPool
 from os import path as opath
 from struct import pack
-from zlib import compress
+from zlib import compressobj, Z_DEFAULT_COMPRESSION
+
+from numpy import ascontiguousarray
 
 # - import STK modules ------------------------------------------------------------------------------------------------
 from framework.util.error import StkError
@@ -31,6 +35,18 @@ SIG_OFFSET = 'Offsets'
 SIG_SAMPLES = 'SampleCount'
 
 
+# - functions ---------------------------------------------------------------------------------------------------------
+def _compress_block(args):
+    """compress one data block, a compress object is used as it releases the GIL while deflating
+
+    :param args: tuple of data and compression level
+    :return: compressed data
+    """
+    data, level = args
+    cobj = compressobj(level)
+    return cobj.compress(data) + cobj.flush()
+
+
 # - classes -----------------------------------------------------------------------------------------------------------
 class SignalWriterException(StkError):
     """general exception for SignalReader class"""
@@ -120,6 +136,10 @@ class BsigWriter(object):
         :type v2format: bool
         :keyword block_size: block size to write bsig with
         :type block_size: int
+        :keyword level: zlib compression level of blocks (0...9), default: zlib's default (6)
+        :type level: int
+        :keyword threads: number of threads compressing blocks in parallel, default: number of cpus
+        :type threads: int
         :keyword sigdict: dictionary of signals to write
         """
         self._fp = fp
@@ -131,6 +151,10 @@ class BsigWriter(object):
         assert self._block_size in (2 ** i for i in xrange(8, 17)), "block_size wrong!"
         self._v2 = kwargs.pop('v2format', False)
         assert type(self._v2) == bool, "type of v2format wrong!"
+        self._level = kwargs.pop('level', Z_DEFAULT_COMPRESSION)
+        assert self._level in xrange(-1, 10), "compression level wrong!"
+        self._threads = kwargs.pop('threads', cpu_count())
+        self._pool = None
         self._signal_data = []
 
         if not hasattr(self._fp, 'write'):
@@ -162,15 +186,26 @@ class BsigWriter(object):
         if array_len > 1:
             signal = signal.flatten()
 
+        # whole signal as little endian buffer, split into blocks of block_size bytes
+        data = ascontiguousarray(signal, dtype=signal.dtype.newbyteorder('<')).tostring()
+        blocks = [(data[i:i + self._block_size], self._level)
+                  for i in xrange(0, len(data), self._block_size - self._block_size % signal.dtype.itemsize)]
+        if len(blocks) > 1 and self._threads > 1:
+            if self._pool is None:
+                self._pool = ThreadPool(self._threads)
+            blocks = self._pool.map(_compress_block, blocks)
+        else:
+            blocks = [_compress_block(blk) for blk in blocks]
+
         offsets = []
-        i = 0
-        block_sz = self._block_size / signal.dtype.itemsize  # self._sigfrmt[signal.dtype.char][1]
-        while i < len(signal):
-            data = compress("".join([pack(signal.dtype.char, d) for d in signal[i:i + block_sz]]))
-            offsets.append(self._fp.tell())
-            self._write_sig('I', len(data))
-            self._fp.write(data)
-            i += block_sz
+        pos = self._fp.tell()
+        for blk in blocks:
+            offsets.append(pos)
+            pos += len(blk) + 4
+        try:
+            self._fp.write("".join([pack('I', len(blk)) + blk for blk in blocks]))
+        except:
+            raise SignalWriterException("An error occured while writing binary data.")
 
         self._signal_data.append({SIG_NAME: name, SIG_SAMPLES: signal_len, SIG_ARRAYLEN: array_len,
                                   SIG_OFFSET: offsets, SIG_TYPE: signal.dtype.char})
@@ -178,6 +213,10 @@ class BsigWriter(object):
     def close(self):
         """finishes up file write operation
         """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
         # write offsets
         offset = self._fp.tell()
         for signal in self._signal_data:
@@ -221,8 +260,7 @@ class BsigWriter(object):
         """
         try:
             if type(data) in (list, tuple, str):
-                for d in data:
-                    self._fp.write(pack(stype, d))
+                self._fp.write(pack(stype * len(data), *data))
             else:
                 self._fp.write(pack(stype, data))
         except:
@@ -244,6 +282,8 @@ class SignalWriter(object):
     parameters:
       ``v2format``:     set to True to let BsigWriter use older v2 format instead of v3 (bool)
       ``block_size``:   set buffer block size of bsigs, default: 4096 (4kb)
+      ``level``:        zlib compression level of bsig blocks, default: 6
+      ``threads``:      number of threads compressing bsig blocks in parallel, default: number of cpus
       ``type``:         type of signal format, supported: bsig, csv (str)
 
 
@@ -280,6 +320,8 @@ class SignalWriter(object):
         parameters:
           ``v2format``: set to True to let BsigWriter use older v2 format instead of v3 (bool)
           ``block_size``: set buffer block size of bsigs, default: 4096 (4kb)
+          ``level``: zlib compression level of bsig blocks, default: 6
+          ``threads``: number of threads compressing bsig blocks in parallel, default: number of cpus
           ``type``: type of signal format, supported: bsig, csv (str)
 
         :param filename: path/to/file.name
@@ -0,0 +1,158 @@
+"""
+framework/io/sim_index
+-------------------
+
+Index of simulation output folders to find the sim files of recordings
+
+**User-API Interfaces**
+
+  - `sim_file_index` (index of a folder, listed once per process)
+  - `SimFileIndex` (files of a folder and matching them to recordings)
+
+A folder is listed once (``scandir.walk`` if installed, ``os.walk`` otherwise), following requests for the
+same folder get the same index as long as the folder's modification time is unchanged. So the collection
+readers of all busses and the checks of the exported files share one listing per folder. Indexes including
+sub folders are listed each time, files added to a sub folder don't change the modification time of the folder.
+
+Recordings are matched to the files by their (lower case) base name: each file name is probed for all
+recording names using a dictionary, instead of searching every file name for every recording.
+
+usage (example)
+
+.. code-block:: python
+
+    from framework.io.sim_index import sim_file_index
+
+    index = sim_file_index('d:/sim/bin_data_60_sil')
+    if 'rec01' in index:
+        ...
+    sim_files = index.match(['d:/rec/rec01.rec', 'd:/rec/rec02.rec'], ['bsig', 'csv'])
+    # {'d:/rec/rec01.rec': ['d:/sim/bin_data_60_sil/rec01.bsig'], 'd:/rec/rec02.rec': []}
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from os import path as opath
+from re import compile as recompile
+
+try:
+    from scandir import walk
+except ImportError:
+    from os import walk
+
+__all__ = ['SimFileIndex', 'sim_file_index']
+
+
+# - defines ------------------------------------------------------------------------------------------------------------
+TSTP_SUFFIX = "_tstp"  # sync timestamp files of sil are no sim files
+_INDEX_CACHE = {}
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def sim_file_index(folder, recurse=False):
+    """index of a folder, listed only once as long as its modification time doesn't change
+
+    :param folder: path/to/folder
+    :type folder: str
+    :param recurse: index files of sub folders as well, they are listed each time
+    :type recurse: bool
+    :return: index of folder
+    :rtype: SimFileIndex
+    """
+    if recurse:
+        return SimFileIndex(folder, recurse)
+
+    key = opath.normcase(opath.abspath(folder))
+    mtime = opath.getmtime(folder)
+    cached = _INDEX_CACHE.get(key)
+    if cached is None or cached[0] != mtime:
+        cached = _INDEX_CACHE[key] = mtime, SimFileIndex(folder)
+    return cached[1]
+
+
+def _recording_key(recording):
+    """lower case base name of a recording without extension"""
+    return opath.splitext(opath.basename(recording))[0].lower()
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class SimFileIndex(object):
+    """files of a folder, listed once"""
+    def __init__(self, folder, recurse=False):
+        """list the folder
+
+        :param folder: path/to/folder
+        :param recurse: list files of sub folders as well
+        """
+        if recurse:
+            self._files = [(opath.abspath(opath.join(dirname, fname)), fname.lower())
+                           for dirname, _, filenames in walk(folder) for fname in filenames]
+        else:
+            self._files = [(opath.join(folder, fname), fname.lower())
+                           for fname in next(walk(folder), (folder, [], []))[2]]
+        self.stems = set(opath.splitext(name)[0] for _, name in self._files)
+
+    def __len__(self):
+        return len(self._files)
+
+    def __contains__(self, stem):
+        """True if a file with that name (without extension, case insensitive) is inside"""
+        return stem.lower() in self.stems
+
+    def match(self, recordings, extensions, base_name="", exact_match=False):
+        """sim files of the recordings
+
+        a file belongs to a recording if it has one of the extensions and its name contains the
+        recording's name followed by the base name (``exact_match``: the name ends with them),
+        sync timestamp files (\\*_tstp.\\*) are left out
+
+        :param recordings: list of recording names (path/to/file.rec)
+        :param extensions: list of file extensions without '.'
+        :param base_name: additional part of the file name after the recording name
+        :param exact_match: file name has to end with recording and base name
+        :return: lower case path/to/files sorted in reverse order by recording
+        :rtype: dict
+        """
+        keys = {}
+        for rec in set(recordings):
+            keys.setdefault(_recording_key(rec), []).append(rec)
+        lengths = sorted(set(len(key) for key in keys))
+        extensions = set("." + str(ext).strip(". ").lower() for ext in extensions)
+        base_name = base_name.lower()
+        patterns = {}
+
+        found = dict((rec, []) for rec in recordings)
+        for path, name in self._files:
+            stem, ext = opath.splitext(name)
+            if ext not in extensions or not stem.endswith(base_name) or stem.endswith(TSTP_SUFFIX):
+                continue
+
+            body = stem[:len(stem) - len(base_name)]
+            if exact_match:
+                probes = set(body[-length:] for length in lengths if length <= len(body))
+            else:
+                probes = set(body[idx:idx + length] for length in lengths for idx in xrange(len(body) - length + 1))
+
+            for key in probes.intersection(keys):
+                # final check with the pattern used so far, e.g. to allow only some characters around the name
+                pattern = patterns.get(key)
+                if pattern is None:
+                    pattern = patterns[key] = recompile(
+                        (r"(?i)%s%s(?<!_tstp)\.(%s)$" if exact_match
+                         else r"(?i)[\.\w\_\-\+]*%s[\.\w\_\-\+]*%s(?<!_tstp)\.(%s)$") %
+                        (key, base_name, "|".join(ext[1:] for ext in extensions)))
+                if pattern.search(path) is not None:
+                    for rec in keys[key]:
+                        found[rec].append(path.lower())
+
+        for files in found.values():
+            files.sort(reverse=True)
+        return found
+
+
+"""
+CHANGE LOG:
+-----------
+"""
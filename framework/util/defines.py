@@ -136,6 +136,13 @@ SIMSELECTION_PORT_NAME = "SimSelection"
 SIMFILEEXT_PORT_NAME = "SimFileExt"
 EXACTMATCH_PORT_NAME = "ExactMatch"
 SIMCHECK_PORT_NAME = "SimCheck"
+SIMPREFETCH_PORT_NAME = "SimFilePrefetch"
+RECORDING_SELECTION_PORT_NAME = "RecordingSelection"
+PARALLEL_RECORDINGS_PORT_NAME = "ParallelRecordings"
+CHECKPOINT_PORT_NAME = "Checkpoint"
+PROFILE_PORT_NAME = "Profile"
+PROFILER_PORT_NAME = "Profiler"
+RECORDING_DURATION_PORT_NAME = "RecordingDuration"
 RECURSE_PORT_NAME = "Recurse"
 OUTPUTDIRPATH_PORT_NAME = "OutputDirPath"
 SIMFILEBASE_PORT_NAME = "SimFileBaseName"
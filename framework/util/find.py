@@ -14,11 +14,16 @@ Stand alone utility functions for class searches based on subclassing.
 """
 
 # - import Python modules ---------------------------------------------------------------------------------------------
-from os import path as opath, listdir
+from os import path as opath, listdir, stat, getpid, rename, remove
 from sys import path as spath
 from inspect import ismodule
+from json import load, dump
+from tempfile import gettempdir
 import traceback
 
+# - defines -----------------------------------------------------------------------------------------------------------
+PLUGIN_INDEX_FILE = "valf_plugin_index.json"
+
 
 # - functions ---------------------------------------------------------------------------------------------------------
 def instantiate_class(base_class, search, *args, **kwargs):
@@ -80,7 +85,6 @@ def find_class(base_class, search, remove_duplicates=True, with_error_list=False
     if ismodule(search):
         return (find_entry(base_class, search), []) if with_error_list else find_entry(base_class, search)
 
-    mod_list = []
     err_list = []
 
     folder = search
@@ -99,6 +103,43 @@ def find_class(base_class, search, remove_duplicates=True, with_error_list=False
             print("ERROR: '%s' (path not existing: %s)" % (str(ex), folder))
             return ([], ["ERROR on %s: '%s'" % (search, str(ex))]) if with_error_list else []
 
+    mod_list = _module_list(folder, files)
+
+    # try to import and check internals
+    plug_list = []
+    for mod_name in mod_list:
+        try:
+            module = _import_module(mod_name)
+        except ImportError:
+            err_list.append((mod_name, traceback.format_exc()))
+            continue
+
+        plug_list.extend(find_entry(base_class, module))
+        try:
+            del module
+        except ImportError:
+            pass
+
+    if remove_duplicates and len(plug_list) > 1:
+        dups = []
+        for idx0 in range(0, len(plug_list)):
+            for idx1 in range(idx0 + 1, len(plug_list)):
+                if plug_list[idx0]["name"] == plug_list[idx1]["name"]:
+                    dups.append(idx1)
+
+        for idx in sorted(set(dups), reverse=True):
+            plug_list.pop(idx)
+
+    return plug_list if not with_error_list else (plug_list, err_list)
+
+
+def _module_list(folder, files):
+    """names to import the python files of a folder
+
+    :param folder: path/to/folder
+    :param files: file names inside folder
+    :return: list of module names, [module path, module name] for modules inside the framework
+    """
     # For all modules within the framework use absolute module path to
     # avoid problems with duplicate package names
     lst = []
@@ -120,6 +161,7 @@ def find_class(base_class, search, remove_duplicates=True, with_error_list=False
             fpath = head
 
     # now find the files inside
+    mod_list = []
     for file_name in files:
         if (not file_name.startswith("__")) and file_name.endswith(".py"):
             mod_name = file_name.rsplit('.', 1)[0]
@@ -131,36 +173,15 @@ def find_class(base_class, search, remove_duplicates=True, with_error_list=False
                 # add framework path to module name
                 mod_list.append([mod_path + mod_name, mod_name])
 
-    # try to import and check internals
-    plug_list = []
-    for mod_name in mod_list:
-        try:
-            # use relative or absolute (for all framework modules) import method
-            if isinstance(mod_name, (list, tuple)):
-                module = __import__(mod_name[0], globals(), locals(), mod_name[1], 0)
-            else:
-                module = __import__(mod_name)
-        except ImportError:
-            err_list.append((mod_name, traceback.format_exc()))
-            continue
-
-        plug_list.extend(find_entry(base_class, module))
-        try:
-            del module
-        except ImportError:
-            pass
+    return mod_list
 
-    if remove_duplicates and len(plug_list) > 1:
-        dups = []
-        for idx0 in range(0, len(plug_list)):
-            for idx1 in range(idx0 + 1, len(plug_list)):
-                if plug_list[idx0]["name"] == plug_list[idx1]["name"]:
-                    dups.append(idx1)
-
-        for idx in sorted(set(dups), reverse=True):
-            plug_list.pop(idx)
 
-    return plug_list if not with_error_list else (plug_list, err_list)
+def _import_module(mod_name):
+    """import a module named as returned by `_module_list`"""
+    # use relative or absolute (for all framework modules) import method
+    if isinstance(mod_name, (list, tuple)):
+        return __import__(mod_name[0], globals(), locals(), mod_name[1], 0)
+    return __import__(mod_name)
 
 
 def find_entry(base_class, module):
@@ -206,6 +227,121 @@ def find_subclasses(base_class, class_lst=None):
     return class_lst
 
 
+# - classes -----------------------------------------------------------------------------------------------------------
+class PluginIndex(object):
+    """Index of the classes based upon base_class found in folders, persisted in a json file.
+
+    Same search as `find_class`, but only modules changed since the index was saved (modification time or
+    size of the file) are imported to update it, the others are imported when one of their classes is
+    requested by `load`. So only the observers used by a config are imported, not all found in the folders.
+
+    As `find_class` with a list of folders: within a folder the first class of a name is taken,
+    a class of a following folder replaces one with the same name.
+    """
+    def __init__(self, base_class, folders, filename=None):
+        """index the python files inside the folders
+
+        :param base_class: class to search subclasses of
+        :param folders: list of path/to/folder
+        :param filename: path/to/index.json, default: valf_plugin_index.json in the temp folder
+        """
+        self._base_class = base_class
+        self._filename = opath.join(gettempdir(), PLUGIN_INDEX_FILE) if filename is None else filename
+        self._classes = {}  # class name: module name
+        self.errors = []  # (module name, traceback) of modules not importable
+
+        base_name = "%s.%s" % (base_class.__module__, base_class.__name__)
+        index = self._read()
+        entries = index.setdefault(base_name, {})
+        changed = False
+
+        for folder in folders:
+            try:
+                files = listdir(folder)
+            except Exception as ex:
+                self.errors.append((folder, "path not existing: %s" % str(ex)))
+                continue
+
+            classes = {}
+            for mod_name in _module_list(folder, files):
+                file_name = opath.abspath(opath.join(folder, (mod_name if isinstance(mod_name, basestring)
+                                                              else mod_name[1]) + ".py"))
+                fstat = stat(file_name)
+                key = opath.normcase(file_name)
+                entry = entries.get(key)
+                if entry is None or [entry["mtime"], entry["size"], entry["module"]] != \
+                        [fstat.st_mtime, fstat.st_size, mod_name]:
+                    try:
+                        module = _import_module(mod_name)
+                    except ImportError:
+                        self.errors.append((mod_name, traceback.format_exc()))
+                        entries.pop(key, None)
+                        continue
+                    entry = entries[key] = {"mtime": fstat.st_mtime, "size": fstat.st_size, "module": mod_name,
+                                            "classes": [plug["name"] for plug in find_entry(base_class, module)]}
+                    changed = True
+
+                for class_name in entry["classes"]:
+                    classes.setdefault(class_name, mod_name)
+            self._classes.update(classes)
+
+        if changed:
+            self._write(index)
+
+    def __contains__(self, class_name):
+        return class_name in self._classes
+
+    @property
+    def names(self):
+        """names of the classes found"""
+        return sorted(self._classes)
+
+    def load(self, class_name):
+        """class of that name, its module is imported now if not done yet
+
+        :param class_name: name of class
+        :return: class or None if not found or module not importable
+        """
+        mod_name = self._classes.get(class_name)
+        if mod_name is None:
+            return None
+
+        try:
+            module = _import_module(mod_name)
+        except ImportError:
+            self.errors.append((mod_name, traceback.format_exc()))
+            return None
+
+        entry = getattr(module, class_name, None)
+        try:
+            return entry if issubclass(entry, self._base_class) else None
+        except TypeError:
+            return None
+
+    def _read(self):
+        """saved index, empty if not readable"""
+        try:
+            with open(self._filename) as fpt:
+                index = load(fpt)
+            return index if isinstance(index, dict) else {}
+        except (IOError, ValueError):
+            return {}
+
+    def _write(self, index):
+        """save index, replacing the file at once for other processes reading it"""
+        tmp_name = "%s.%d" % (self._filename, getpid())
+        try:
+            with open(tmp_name, "w") as fpt:
+                dump(index, fpt)
+            if opath.exists(self._filename):
+                remove(self._filename)
+            rename(tmp_name, self._filename)
+        except (IOError, OSError):
+            # index is only a cache, next run will try again
+            if opath.exists(tmp_name):
+                remove(tmp_name)
+
+
 """
 CHANGE LOG:
 -----------
@@ -17,6 +17,7 @@
 # - import Python modules ---------------------------------------------------------------------------------------------
 from os import path, walk
 from collections import OrderedDict
+from importlib import import_module
 
 
 def list_folders(head_dir):
@@ -141,6 +142,33 @@ def sec_to_hms_string(seconds):
     return ""
 
 
+class LazyModule(object):
+    """Module imported on first access of one of its attributes.
+
+    Heavy packages (matplotlib, reportlab, pandas) only needed by some methods don't slow down
+    importing the modules using them, e.g. when searching for plugins::
+
+        plt = LazyModule("matplotlib.pylab")
+        ...
+        plt.figure()  # matplotlib is imported here
+
+    :param name: absolute name of the module
+    """
+    def __init__(self, name):
+        self.__name = name
+        self.__module = None
+
+    def __getattr__(self, attr):
+        if attr.startswith("_LazyModule__"):  # not initialized, e.g. while copied
+            raise AttributeError(attr)
+        if self.__module is None:
+            self.__module = import_module(self.__name)
+        return getattr(self.__module, attr)
+
+    def __repr__(self):
+        return "<lazy module '%s'%s>" % (self.__name, " (not imported)" if self.__module is None else "")
+
+
 """
 CHANGE LOG:
 -----------
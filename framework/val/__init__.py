@@ -26,6 +26,7 @@ from . results import ValTestStep
 from . results import ValTestcase
 
 from . testrun import TestRun
+from . result_store import ResultStore
 
 from . result_types import BaseUnit
 from . result_types import BaseValue
@@ -0,0 +1,247 @@
+"""
+framework/val/result_store
+-------------------
+
+Store of testcase results per recording for incremental re-validation
+
+**User-API Interfaces**
+
+  - `ResultStore` (load / save results of a testcase for a recording)
+  - `file_fingerprint` (content fingerprint of input files)
+  - `config_hash` (hash of a testcase configuration and code)
+  - `source_files` (source files of a testcase class)
+
+Results are saved per recording and testcase in a directory, together with the fingerprint of the
+recording's input files and the hash of the testcase configuration and source code. A following run can take
+the stored results as long as both are unchanged, so only new or changed recordings have to be processed again.
+Files created with the results (e.g. plots referenced by the report) are copied into the store and
+restored if missing.
+
+The fingerprint is a hash of the complete content of each file. The digest of a file is kept (by the store
+also between runs) for its path, size and modification time, so unchanged files are read only once.
+
+usage (example)
+
+.. code-block:: python
+
+    from framework.val.result_store import ResultStore, file_fingerprint, config_hash
+
+    store = ResultStore('d:/results/store')
+    key = (store.file_fingerprint(['rec_ecu.csv', 'rec_sil.csv']),
+           config_hash(testcase_config, source_files(type(testcase))))
+    results = store.load('rec.rec', 'tc_timestamps', *key)
+    if results is None:
+        results = ...  # validate
+        store.save('rec.rec', 'tc_timestamps', results, *key)
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from cPickle import dump, load, HIGHEST_PROTOCOL
+from hashlib import sha1
+from inspect import getmro, getsourcefile
+from json import dumps, dump as json_dump, load as json_load
+from os import path as opath, makedirs, rename, remove, stat
+from shutil import copyfile, rmtree
+from threading import Lock
+
+# - import framework modules -------------------------------------------------------------------------------------------
+from framework.util import Logger
+
+__all__ = ['ResultStore', 'file_fingerprint', 'config_hash', 'source_files']
+
+
+# - defines ------------------------------------------------------------------------------------------------------------
+FINGERPRINT_BLOCK = 1 << 20  # bytes hashed per read
+DIGEST_FILE = "file_digests.json"  # digests of the input files by path, size and modification time
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def _file_digest(filename):
+    """hash of the complete content of a file"""
+    hsh = sha1()
+    with open(filename, "rb") as fpt:
+        for block in iter(lambda: fpt.read(FINGERPRINT_BLOCK), ""):
+            hsh.update(block)
+    return hsh.hexdigest()
+
+
+def file_fingerprint(filenames, digests=None):
+    """content fingerprint of files: hash of names, sizes and complete content
+
+    :param filenames: list of path/to/file, None entries are skipped
+    :type filenames: list
+    :param digests: known file digests by path, size and modification time, updated with new ones
+    :type digests: dict
+    :return: hex digest
+    :rtype: str
+    """
+    hsh = sha1()
+    for filename in filenames:
+        if filename is None:
+            continue
+        info = stat(filename)
+        key = opath.normcase(opath.abspath(filename))
+        known = None if digests is None else digests.get(key)
+        if known is not None and known[:2] == [info.st_size, info.st_mtime]:
+            digest = known[2]
+        else:
+            digest = _file_digest(filename)
+            if digests is not None:
+                digests[key] = [info.st_size, info.st_mtime, digest]
+        hsh.update("{0:}:{1:}:{2:}".format(opath.basename(filename).lower(), info.st_size, digest))
+    return hsh.hexdigest()
+
+
+def source_files(cls):
+    """source files of a class and its base classes, e.g. of a testcase
+
+    :param cls: class
+    :return: list of path/to/file.py
+    :rtype: list
+    """
+    files = []
+    for base in getmro(cls):
+        try:
+            filename = getsourcefile(base)
+        except TypeError:  # builtin
+            continue
+        if filename is not None and filename not in files:
+            files.append(filename)
+    return files
+
+
+def config_hash(config, files=()):
+    """hash of a testcase configuration and code
+
+    :param config: configuration as read from the config file
+    :type config: dict
+    :param files: source files of the testcase, their content is part of the hash, see `source_files`
+    :type files: list
+    :return: hex digest
+    :rtype: str
+    """
+    hsh = sha1(dumps(config, sort_keys=True, default=repr))
+    for filename in files:
+        with open(filename, "rb") as fpt:
+            hsh.update(fpt.read())
+    return hsh.hexdigest()
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class ResultStore(object):
+    """results of testcases per recording, saved as pickle files in a directory"""
+    def __init__(self, folder):
+        """set default values
+
+        :param folder: path/to/store, created if not existing
+        :type folder: str
+        """
+        self._folder = folder
+        self._logger = Logger(self.__class__.__name__)
+        if not opath.isdir(folder):
+            makedirs(folder)
+        self._digests = {}
+        self._lock = Lock()
+        # noinspection PyBroadException
+        try:
+            with open(opath.join(folder, DIGEST_FILE)) as fpt:
+                self._digests = json_load(fpt)
+        except Exception:
+            pass
+
+    def file_fingerprint(self, filenames):
+        """content fingerprint of files, see `file_fingerprint`, digests of unchanged files are taken from the store
+
+        :param filenames: list of path/to/file, None entries are skipped
+        :return: hex digest
+        :rtype: str
+        """
+        with self._lock:
+            digests = dict(self._digests)
+        fingerprint = file_fingerprint(filenames, digests)
+        if digests != self._digests:
+            with self._lock:
+                self._digests.update(digests)
+                filename = opath.join(self._folder, DIGEST_FILE)
+                with open(filename + ".tmp", "w") as fpt:
+                    json_dump(self._digests, fpt)
+                if opath.exists(filename):
+                    remove(filename)
+                rename(filename + ".tmp", filename)
+        return fingerprint
+
+    def _filename(self, recording, testcase):
+        """file of the results of a testcase for a recording, without extension"""
+        return opath.join(self._folder, sha1("{0:}|{1:}".format(opath.normcase(recording), testcase)).hexdigest())
+
+    def load(self, recording, testcase, fingerprint, cfg_hash):
+        """stored results of a testcase for a recording
+
+        :param recording: recording name
+        :param testcase: testcase name
+        :param fingerprint: fingerprint of the input files, see `file_fingerprint`
+        :param cfg_hash: hash of the testcase configuration, see `config_hash`
+        :return: results or None if not stored or inputs / configuration have changed
+        """
+        filename = self._filename(recording, testcase) + ".pkl"
+        if not opath.exists(filename):
+            return None
+
+        # noinspection PyBroadException
+        try:
+            with open(filename, "rb") as fpt:
+                entry = load(fpt)
+        except Exception as ex:
+            self._logger.warning("Ignoring unreadable stored results '{0:}': {1:}".format(filename, repr(ex)))
+            return None
+
+        if entry["recording"] != recording or entry["fingerprint"] != fingerprint or entry["config"] != cfg_hash:
+            return None
+
+        # restore files removed since (e.g. new output folder)
+        for idx, path in enumerate(entry["files"]):
+            if not opath.exists(path):
+                stored = opath.join(self._filename(recording, testcase), str(idx))
+                if not opath.exists(stored):
+                    return None
+                if not opath.isdir(opath.dirname(path)):
+                    makedirs(opath.dirname(path))
+                copyfile(stored, path)
+
+        return entry["results"]
+
+    def save(self, recording, testcase, results, fingerprint, cfg_hash, files=()):
+        """store results of a testcase for a recording, replacing older ones
+
+        :param recording: recording name
+        :param testcase: testcase name
+        :param results: picklable results
+        :param fingerprint: fingerprint of the input files, see `file_fingerprint`
+        :param cfg_hash: hash of the testcase configuration, see `config_hash`
+        :param files: path/to/files belonging to the results, e.g. plots
+        :type files: list
+        """
+        filename = self._filename(recording, testcase)
+        if opath.isdir(filename):
+            rmtree(filename)
+        if files:
+            makedirs(filename)
+            for idx, path in enumerate(files):
+                copyfile(path, opath.join(filename, str(idx)))
+
+        # write to temporary file first, an interrupted run must not leave a broken entry
+        with open(filename + ".tmp", "wb") as fpt:
+            dump({"recording": recording, "testcase": testcase, "fingerprint": fingerprint,
+                  "config": cfg_hash, "files": list(files), "results": results}, fpt, HIGHEST_PROTOCOL)
+        if opath.exists(filename + ".pkl"):
+            remove(filename + ".pkl")
+        rename(filename + ".tmp", filename + ".pkl")
+
+
+"""
+CHANGE LOG:
+-----------
+"""
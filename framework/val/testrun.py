@@ -459,6 +459,8 @@ class TestRun(object):  # pylint: disable=R0902,R0904
 class TestRunManager(bci):  # pylint: disable= R0902
     """TestrunManager Plugin using the Testrun Class
     """
+    PARALLEL_RECORDINGS = True
+
     def __init__(self, data_manager, component_name, bus_name="BASE_BUS"):
         """ Contructor """
         # noinspection PyCallByClass,PyTypeChecker
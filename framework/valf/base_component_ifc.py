@@ -49,6 +49,10 @@ class BaseComponentInterface(object):
     RET_VAL_OK = 0
     RET_VAL_ERROR = -1
 
+    # set True if the component supports the recording-parallel mode of the ProcessManager,
+    # see `get_recording_results` and `merge_recording_results`
+    PARALLEL_RECORDINGS = False
+
     def __init__(self, data_manager, component_name, bus_name, version="$Revsion: 0.0 $"):  # intentionally wrong
         """all the std things are going here, helping to reduce common code
 
@@ -146,6 +150,28 @@ class BaseComponentInterface(object):
         """ The validation session is ended. Release resouces and database connection if necessary. """
         return BaseComponentInterface.RET_VAL_OK
 
+    def get_recording_results(self, mark=None):  # pylint: disable=C0103
+        """ Recording-parallel mode: return the results collected over the recordings processed by this
+        (worker process) instance, they are passed to `merge_recording_results` of the main instance.
+        Must be picklable.
+
+        :param mark: opt. mark as returned by `get_recording_mark`, to return only the results since then
+                     (used to journal each recording, see `framework.valf.checkpoint`)
+        """
+        return None
+
+    def get_recording_mark(self):  # pylint: disable=C0103
+        """ Current position in the collected results, passed to `get_recording_results` later on. """
+        return None
+
+    def merge_recording_results(self, results):  # pylint: disable=C0103
+        """ Recording-parallel mode: add results of a worker (see `get_recording_results`).
+        Called for the workers in order of their recordings before pre_terminate.
+
+        :param results: results of a worker process
+        """
+        return BaseComponentInterface.RET_VAL_OK
+
     # def GetComponentInterfaceVersion(self):  # pylint: disable=C0103
     #     """ Return the version of the  component interface"""
     #     return "$Revision: 1.2 $".partition(':')[2].strip('$ ')
@@ -0,0 +1,153 @@
+"""
+framework/valf/checkpoint
+-------------------
+
+Journal of processed recordings to resume an interrupted valf run
+
+**User-API Interfaces**
+
+  - `CheckpointJournal` (SQLite journal of the results per processed recording)
+
+The `ProcessManager` adds the results of all components (see ``get_recording_results``) for each processed
+recording to the journal. A restarted run with the same output folder (and same config files) takes these
+results (``merge_recording_results``) and continues with the first unfinished recording.
+The journal is removed after the run has been finished successfully.
+
+usage (example)
+
+.. code-block:: python
+
+    journal = CheckpointJournal('out/valf_checkpoint.sqlite', config_key(['my_valf.cfg']))
+    for recordings, results, processed_files, processed_time in journal.entries():
+        ...  # merge results
+    journal.add(['rec.rec'], results, 1, 6000000)
+    ...
+    journal.remove()
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+import sqlite3
+from cPickle import dumps, loads, HIGHEST_PROTOCOL
+from hashlib import sha1
+from os import path as opath, remove
+
+__all__ = ['CheckpointJournal', 'config_key']
+
+
+# - defines ------------------------------------------------------------------------------------------------------------
+CHECKPOINT_FILE = "valf_checkpoint.sqlite"
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def config_key(configfiles):
+    """key of the configuration a journal was written for: names and contents of the config files
+
+    :param configfiles: list of path/to/config files
+    :type configfiles: list
+    :return: hex digest
+    :rtype: str
+    """
+    hsh = sha1()
+    for configfile in configfiles:
+        hsh.update(opath.normcase(opath.abspath(configfile)))
+        if opath.isfile(configfile):
+            with open(configfile, "rb") as fpt:
+                hsh.update(fpt.read())
+    return hsh.hexdigest()
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class CheckpointJournal(object):
+    """results of processed recordings in a SQLite database, one transaction per entry"""
+    def __init__(self, filename, key):
+        """open or create the journal, entries of another configuration are dropped
+
+        :param filename: path/to/journal
+        :type filename: str
+        :param key: configuration key, see `config_key`
+        :type key: str
+        """
+        self._filename = filename
+        self._conn = sqlite3.connect(filename)
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS info (key TEXT)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS recordings (idx INTEGER PRIMARY KEY AUTOINCREMENT, "
+                               "names TEXT, results BLOB, processed_files INTEGER, processed_time)")
+            row = self._conn.execute("SELECT key FROM info").fetchone()
+            self.discarded = 0
+            if row is None or row[0] != key:
+                self.discarded = self._conn.execute("SELECT COUNT(*) FROM recordings").fetchone()[0]
+                self._conn.execute("DELETE FROM recordings")
+                self._conn.execute("DELETE FROM info")
+                self._conn.execute("INSERT INTO info (key) VALUES (?)", (key,))
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM recordings").fetchone()[0]
+
+    def entries(self):
+        """journaled entries in order of processing
+
+        :return: list of (recording names, component results, processed files, processed time)
+        :rtype: list
+        """
+        return [(names.split("\n"), loads(str(results)), files, time) for names, results, files, time in
+                self._conn.execute("SELECT names, results, processed_files, processed_time FROM recordings "
+                                   "ORDER BY idx")]
+
+    def recordings(self):
+        """names of the journaled recordings
+
+        :rtype: list
+        """
+        return [name for names, in self._conn.execute("SELECT names FROM recordings ORDER BY idx")
+                for name in names.split("\n")]
+
+    def add(self, recordings, results, processed_files, processed_time):
+        """add results of processed recordings, committed immediately
+
+        :param recordings: names of the recordings
+        :type recordings: list
+        :param results: picklable results of all components
+        :type results: list
+        :param processed_files: number of successfully processed files
+        :param processed_time: processed time of recordings
+        :return: id of the entry, e.g. to discard it again
+        :rtype: int
+        """
+        with self._conn:
+            return self._conn.execute("INSERT INTO recordings (names, results, processed_files, processed_time) "
+                                      "VALUES (?, ?, ?, ?)",
+                                      ("\n".join(recordings), sqlite3.Binary(dumps(results, HIGHEST_PROTOCOL)),
+                                       processed_files,
+                                       processed_time.item() if hasattr(processed_time, "item")
+                                       else processed_time)).lastrowid
+
+    def discard(self, entries):
+        """delete entries again, e.g. when their recordings are processed once more
+
+        :param entries: ids of the entries as returned by `add`
+        :type entries: list
+        """
+        with self._conn:
+            self._conn.executemany("DELETE FROM recordings WHERE idx = ?", [(idx,) for idx in entries])
+
+    def close(self):
+        """close the database"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def remove(self):
+        """close and delete the journal, e.g. after the run is finished"""
+        self.close()
+        if opath.exists(self._filename):
+            remove(self._filename)
+
+
+"""
+CHANGE LOG:
+-----------
+"""
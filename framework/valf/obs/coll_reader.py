@@ -18,20 +18,20 @@ The component for reading mts batch play list from bpl, ini or DB catalogue.
 """
 # pylint: disable=W0702,C0103
 # - import Python modules ---------------------------------------------------------------------------------------------
-from dircache import listdir
-from os import walk
-from os.path import abspath, basename, isdir, isfile, join, splitext
-from re import search as research
+from os.path import abspath, basename, isdir
 
 # - import framework modules ------------------------------------------------------------------------------------------------
 from framework.bpl import Bpl
+from framework.io.prefetch import PREFETCHER
+from framework.io.sim_index import sim_file_index
 from framework.valf import BaseComponentInterface
 from framework.util.defines import GLOBAL_BUS_NAME, COLLECTION_NAME_PORT_NAME, PLAY_LIST_FILE_PORT_NAME, \
     COLLECTION_PORT_NAME, COLLECTION_LABEL_PORT_NAME, COLLECTIONID_PORT_NAME, \
     FILE_COUNT_PORT_NAME, SIM_PATH_PORT_NAME, REMOVED_FILES_PORT_NAME, CURRENT_SIMFILE_PORT_NAME, \
     CURRENT_FILE_PORT_NAME, IS_FINISHED_PORT_NAME, SIMFILEBASE_PORT_NAME, DBCONNECTION_PORT_NAME, \
     IS_DBCOLLECTION_PORT_NAME, SIMCHECK_PORT_NAME, SIMFILEEXT_PORT_NAME, EXACTMATCH_PORT_NAME, SIMSELECTION_PORT_NAME, \
-    RECURSE_PORT_NAME, CURRENT_SECTIONS_PORT_NAME, CURRENT_MEASID_PORT_NAME
+    RECURSE_PORT_NAME, CURRENT_SECTIONS_PORT_NAME, CURRENT_MEASID_PORT_NAME, SIMPREFETCH_PORT_NAME, \
+    RECORDING_SELECTION_PORT_NAME
 
 
 # - classes -----------------------------------------------------------------------------------------------------------
@@ -63,6 +63,10 @@ class CollectionReader(BaseComponentInterface):
       readable, and only want to go through recordings. ``Recurse``, ``ExactMatch``, ``SimFileExt``, ``SimFileBaseName``
       and ``SimOutputPath`` isn't in use then. Only ``SimSelection`` can be used. To be backward compatible,
       ``CurrentSimFile`` will contain same as ``CurrentFile`` instead.
+    - read ``SimFilePrefetch``: opt. dict of `SignalReader` options (e.g. ``{"delim": ","}``) to open the sim files
+      of the next recording in a background thread while the current one is processed, additional keys:
+      ``warm``: read through / parse the files (default: True), ``budget``: memory budget in MB for warmed files.
+      Components get the opened readers through `framework.io.prefetch.open_signal_reader`, default: None (off)
     - set ``CurrentSimFile``: name of current sim output file loaded by BplReader
     - set ``IsDbCollection``: True/False whether it is a collection from DB or file
     - set ``CollectionId``:  CatDb internal measurement id of the current rec file if DB is used, None for bpl files
@@ -71,6 +75,8 @@ class CollectionReader(BaseComponentInterface):
 
     - read ``SimSelection``: opt. list of indices to use only particular recordings (list starts with '0')
       e.g. "[ 1, 3, 5, 7, 9]" or shorter "[(1,10,2)]" (syntax as in range() )
+    - read ``RecordingSelection``: opt. list of recording names to use, applied after ``SimSelection``,
+      set by the `ProcessManager` for its workers in recording-parallel mode
 
     - set ``CurrentFile``: name of current rec file as listed in bpl file
     - set ``IsFinished``: True if last file was provided
@@ -264,6 +270,7 @@ class CollectionReader(BaseComponentInterface):
       #. otherwise: mark as error for you
 
     """
+    PARALLEL_RECORDINGS = True
 
     def __init__(self, data_manager, component_name, bus_name="BUS_BASE", *args, **kwargs):
         """setup default values
@@ -290,6 +297,7 @@ class CollectionReader(BaseComponentInterface):
         self._section_dict = None
         self._sim_dict = None
         self._is_sim_path_list = None
+        self._prefetch = None
 
         # if we go for deprecated BplReader, we need to align default name
         self._coll_name = COLLECTION_PORT_NAME
@@ -383,6 +391,14 @@ class CollectionReader(BaseComponentInterface):
             self._rec_list = rec_list
             self._logger.info("selected only %s / %d recording file(s)." % (len(rec_list), len(self._rec_list)))
 
+        # recordings of a worker in recording-parallel mode
+        rec_selection = self._get_data(RECORDING_SELECTION_PORT_NAME)
+        if rec_selection is not None:
+            rec_selection = set(rec_selection)
+            self._rec_list = [rec for rec in self._rec_list if rec in rec_selection]
+            self._logger.info("'%s' selected %d recording file(s)." % (RECORDING_SELECTION_PORT_NAME,
+                                                                       len(self._rec_list)))
+
         # now sort recordings
         self._rec_list = sorted(self._rec_list, key=lambda fn: basename(fn), reverse=True)
 
@@ -392,6 +408,17 @@ class CollectionReader(BaseComponentInterface):
             self._logger.debug("simulation list has %d files" % sim_cnt)
             return BaseComponentInterface.RET_VAL_OK
 
+        # open sim files of next recording in background ...
+        self._prefetch = self._get_data(SIMPREFETCH_PORT_NAME)
+        if self._prefetch is True:
+            self._prefetch = {}
+        elif type(self._prefetch) == dict:
+            self._prefetch = dict(self._prefetch)
+            if "budget" in self._prefetch:
+                PREFETCHER.budget = int(self._prefetch.pop("budget")) << 20
+        else:
+            self._prefetch = None
+
         # where are sim files ...
         sim_file_path = self._get_data(SIM_PATH_PORT_NAME)
         if sim_file_path is None:
@@ -434,31 +461,14 @@ class CollectionReader(BaseComponentInterface):
         # wether to do a recurse search
         recurse = self._get_data(RECURSE_PORT_NAME, default=False) in (True, "True")
 
-        # start searching for sim files ...
-        bin_files = [[] for _ in sim_file_path]
-        for idx in xrange(len(sim_file_path)):
-            if recurse:
-                for dirname, _, filenames in walk(sim_file_path[idx]):
-                    for fname in filenames:
-                        # noinspection PyTypeChecker
-                        bin_files[idx].append(abspath(join(dirname, [fname])))
-            else:
-                for name in listdir(sim_file_path[idx]):
-                    # noinspection PyTypeChecker
-                    bin_files[idx].append(join(sim_file_path[idx], name))
+        # index each sim path once, the recordings are looked up in it
+        indexes = [sim_file_index(sfp, recurse) for sfp in sim_file_path]
+        found = [index.match(self._rec_list, sim_file_ext_list, sim_file_base_name, exact_match) for index in indexes]
 
         # go and find related sim files now
         removed_recs = []
         for rec in self._rec_list:
-            fname = splitext(basename(rec))[0]
-            pattern = ((r"(?i)%s%s(?<!_tstp)\.(%s)$" if exact_match
-                        else r"(?i)[\.\w\_\-\+]*%s[\.\w\_\-\+]*%s(?<!_tstp)\.(%s)$") %
-                       (fname, sim_file_base_name, "|".join(sim_file_ext_list)))
-            sim_files = []
-            for bfs in bin_files:
-                sim_files.append(sorted([file_.lower() for file_ in bfs
-                                         if research(pattern, file_) is not None and isfile(file_)], reverse=True))
-
+            sim_files = [files[rec] for files in found]
             if any(sim_files):
                 self._sim_dict[rec] = sim_files
                 sim_cnt += sum([len(sfs) for sfs in sim_files])
@@ -492,6 +502,10 @@ class CollectionReader(BaseComponentInterface):
         # file_completed self.__data_manager.GetDataPort('IsFileComplete', self._bus_name)
         # next_section_last = self.__data_manager.GetDataPort('NextSection', self._bus_name)
 
+        # release readers of last simulation files
+        if self._prefetch is not None and self._curr_sim is not None:
+            PREFETCHER.release(self._flat_sims(self._curr_sim))
+
         # Set next measurement and simulation files
         if self._is_sim_path_list:
             self._curr_rec = self._rec_list.pop()
@@ -512,8 +526,63 @@ class CollectionReader(BaseComponentInterface):
         if len(self._rec_list) == 0 and (self._sim_dict and len(self._sim_dict[self._curr_rec][0]) == 0):
             self._set_data(IS_FINISHED_PORT_NAME, True, GLOBAL_BUS_NAME)
 
+        # and start opening the following ones
+        if self._prefetch is not None:
+            PREFETCHER.prefetch(self._flat_sims(self._curr_sim), **self._prefetch)
+            PREFETCHER.prefetch(self._next_sims(), **self._prefetch)
+
+        return BaseComponentInterface.RET_VAL_OK
+
+    def terminate(self):
+        """ close prefetched simulation files
+        """
+        if self._prefetch is not None:
+            PREFETCHER.release(self._flat_sims(self._curr_sim) if self._curr_sim is not None else [])
+
         return BaseComponentInterface.RET_VAL_OK
 
+    @property
+    def pending_recordings(self):
+        """ recordings not loaded yet, in order of processing
+        """
+        return list(reversed(self._rec_list)) if self._rec_list else []
+
+    def skip_recordings(self, recordings):
+        """ leave out recordings not loaded yet, e.g. the ones already processed by an interrupted run
+        (see `framework.valf.checkpoint`), updates ``FileCount`` and ``IsFinished``
+
+        :param recordings: names of recordings to skip
+        :type recordings: list
+        """
+        skip = set(recordings)
+        self._rec_list = [rec for rec in self._rec_list if rec not in skip]
+        for rec in skip:
+            self._sim_dict.pop(rec, None)
+
+        self._set_data(FILE_COUNT_PORT_NAME, sum(len(self._flat_sims(self._sim_dict[rec])) for rec in self._rec_list),
+                       GLOBAL_BUS_NAME)
+        if not self._rec_list:
+            self._set_data(IS_FINISHED_PORT_NAME, True, GLOBAL_BUS_NAME)
+
+    def _next_sims(self):
+        """ simulation files loaded with next call of load_data
+
+        :return: list of file names
+        """
+        if self._is_sim_path_list:
+            return self._flat_sims(self._sim_dict[self._rec_list[-1]]) if self._rec_list else []
+        if self._curr_rec in self._sim_dict and len(self._sim_dict[self._curr_rec][0]) > 0:
+            return [self._sim_dict[self._curr_rec][0][-1]]
+        if self._rec_list and len(self._sim_dict[self._rec_list[-1]][0]) > 0:
+            return [self._sim_dict[self._rec_list[-1]][0][-1]]
+        return []
+
+    @staticmethod
+    def _flat_sims(sims):
+        """ list of file names from a single name or list of lists as provided on ``CurrentSimFile``
+        """
+        return [sims] if isinstance(sims, basestring) else [sim for sfs in sims for sim in sfs]
+
 
 """
 CHANGE LOG:
@@ -4,13 +4,16 @@ crt.ecu_sil.ecu_sil
 Module contains the ECU_SIL observer which is used to performs ECU SIL tests
 """
 
+import re
 from datetime import datetime
+from multiprocessing.pool import ThreadPool
 
-from framework.io.signalreader import SignalReader
+from framework.io.signalcache import SignalCache, CachedSignalReader
 from framework.rep.pdf.algo_test.report import AlgoTestReport
 from framework.rep.pdf.base.pdf import Story
 from framework.rep.pdf.base.template import Style
 from framework.util.defines import *
+from framework.val.result_store import ResultStore, config_hash, source_files
 from framework.val.results import ValTestcase
 from framework.valf import BaseComponentInterface
 from math import floor
@@ -30,6 +33,13 @@ ECU_SIL_CONFIG = "ECU_SIL_CONFIG"
 SIL_BUS = "sil_bus"
 ECU_BUS = "ecu_bus"
 CFG_TC_LST = "Testcases"
+CFG_CSV_CACHE = "csv_cache"
+CFG_TC_THREADS = "testcase_threads"
+CFG_SIGNAL_CACHE = "signal_cache"
+CFG_SIGNAL_PRELOAD = "signal_preload"
+CFG_RESULT_STORE = "result_store"
+
+TIMESTAMP_SIGNAL = "MTS.Package.TimeStamp"
 
 TC_DESCRIPTION = "desc"
 TC_EXPECTED_RESULT = "exp_res"
@@ -55,6 +65,12 @@ class EcuSilObserver(BaseComponentInterface):
         self.config = None
         self.recordings = []
         self.testcase_clazz_map = []
+        self._step_counts = []
+        self._pool = None
+        self._signal_cache = SignalCache()
+        self._manifest = {}
+        self._store = None
+        self._cfg_hashes = []
 
         self.report = AlgoTestReport()
         # self.cat_db = None
@@ -81,6 +97,10 @@ class EcuSilObserver(BaseComponentInterface):
         self.config = self._data_manager.get_data_port(ECU_SIL_CONFIG)
         self._testrun = self._data_manager.get_data_port("trun")
 
+        # memory budget in MB of the signals shared by the testcases of a recording, 0 to switch off
+        if self.config.get(CFG_SIGNAL_CACHE) is not None:
+            self._signal_cache.budget = int(self.config[CFG_SIGNAL_CACHE]) << 20
+
         if self.config[CFG_TC_LST] is None or len(self.config[CFG_TC_LST]) == 0:
             msg = ("Configuration does not contain ANY testcases. " +
                    "Please check the configuration.")
@@ -111,8 +131,43 @@ class EcuSilObserver(BaseComponentInterface):
             except:
                 continue
 
+        # recording-parallel mode only if supported by all testcases
+        self.PARALLEL_RECORDINGS = all(getattr(tc_class, "PARALLEL_RECORDINGS", False)
+                                       for _, tc_class, _, _ in self.testcase_clazz_map)
+        self._step_counts = [len(tc_result.test_steps) for tc_result, _, _, _ in self.testcase_clazz_map]
+        self._manifest = self._plan_signals()
+
+        # folder of stored results, recordings with unchanged input files and testcase configuration are
+        # not processed again by testcases supporting it (see PARALLEL_RECORDINGS)
+        if self.config.get(CFG_RESULT_STORE):
+            self._store = ResultStore(self.config[CFG_RESULT_STORE])
+            # changed testcase code invalidates the stored results as well
+            self._cfg_hashes = [config_hash(tc_cfg, source_files(type(tc_class)))
+                                for _, tc_class, tc_cfg, _ in self.testcase_clazz_map]
+
         return self.RET_VAL_OK
 
+    def _plan_signals(self):
+        """ Collect the signals declared by the testcases (see
+            BaseTest.signal_manifest) per bus, used to preload them once per
+            recording.
+            :return: dict bus -> dict of "required", "signals" and "patterns"
+        """
+        manifest = {}
+        for _, tc_class, tc_cfg, _ in self.testcase_clazz_map:
+            if ECU_BUS not in tc_cfg or SIL_BUS not in tc_cfg or not hasattr(tc_class, "signal_manifest"):
+                continue
+
+            # same bus selection as in process_data
+            buses = {"ecu": BUS_ECU_207 if tc_cfg[ECU_BUS].upper() == BUS_ECU_207.upper() else BUS_ECU_208,
+                     "sil": BUS_SIL_207 if tc_cfg[SIL_BUS].upper() == BUS_SIL_207.upper() else BUS_SIL_208}
+            for side, signals in tc_class.signal_manifest().items():
+                plan = manifest.setdefault(buses[side], {"required": [], "signals": [], "patterns": []})
+                for key, names in signals.items():
+                    plan[key].extend(name for name in names if name not in plan[key])
+
+        return manifest
+
     def _import_testcase_clazz(self, name):
         """ Method to load to classes by name.
             :param name:
@@ -138,15 +193,46 @@ class EcuSilObserver(BaseComponentInterface):
             compartmentalized in different %ses.
         """
         recording = self._data_manager.get_data_port("currentfile")
+
+        # optional binary sidecar cache of the parsed csv exports, True or a cache directory
+        options = {"delim": ","}
+        if self.config.get(CFG_CSV_CACHE):
+            options["cache"] = self.config[CFG_CSV_CACHE]
+        # readers are opened on first access (already in background if prefetching is configured,
+        # see CollectionReader), signals read by several testcases are taken from the cache
+        ecu60_reader = self._cached_reader(BUS_ECU_208, options)
+        sil60_reader = self._cached_reader(BUS_SIL_208, options)
+        ecu20_reader = self._cached_reader(BUS_ECU_207, options)
+        sil20_reader = self._cached_reader(BUS_SIL_207, options)
+        readers = {BUS_ECU_208: ecu60_reader, BUS_SIL_208: sil60_reader,
+                   BUS_ECU_207: ecu20_reader, BUS_SIL_207: sil20_reader}
+
+        # recordings missing an index signal are skipped before any result is taken or testcase is started
+        if self._check_index_signals(readers) != self.RET_VAL_OK:
+            self._release_readers(ecu60_reader, sil60_reader, ecu20_reader, sil20_reader)
+            return self.RET_VAL_ERROR
         self.recordings.append(recording)
 
-        ecu60_reader = SignalReader(self._data_manager.get_data_port("CurrentSimFile", BUS_ECU_208), delim=",")
-        sil60_reader = SignalReader(self._data_manager.get_data_port("CurrentSimFile", BUS_SIL_208), delim=",")
-        ecu20_reader = SignalReader(self._data_manager.get_data_port("CurrentSimFile", BUS_ECU_207), delim=",")
-        sil20_reader = SignalReader(self._data_manager.get_data_port("CurrentSimFile", BUS_SIL_207), delim=",")
+        fingerprint = None
+        if self._store is not None:
+            fingerprint = self._store.file_fingerprint([self._data_manager.get_data_port("CurrentSimFile", bus)
+                                                        for bus in (BUS_ECU_208, BUS_SIL_208, BUS_ECU_207,
+                                                                    BUS_SIL_207)])
 
         # Execute all coonfigured tests
-        for tc_result, tc_class, tc_cfg, story in self.testcase_clazz_map:
+        testcases = []
+        marks = []
+        for index, (tc_result, tc_class, tc_cfg, story) in enumerate(self.testcase_clazz_map):
+            mark = None
+            if fingerprint is not None and getattr(tc_class, "PARALLEL_RECORDINGS", False):
+                results = self._store.load(recording, tc_cfg[TC_NAME], fingerprint, self._cfg_hashes[index])
+                if results is not None:
+                    self._logger.info("Taking stored results of testcase '{0:}' for '{1:}'"
+                                      .format(tc_cfg[TC_NAME], recording))
+                    self._add_testcase_results(self.testcase_clazz_map[index], results)
+                    continue
+                mark = (index, len(tc_result.test_steps), len(story.story), tc_class.result_marks())
+
             # Process distance and time
             # vdy = self._data_manager.get_data_port("VDY", BUS_ECU_207)
             # if vdy is not None:
@@ -179,20 +265,197 @@ class EcuSilObserver(BaseComponentInterface):
 
                 if not ecu_bsig_reader or not sil_bsig_reader:
                     self._logger.error("One of the configured busses is not available. Skipping current testcase.")
+                    self._execute_testcases(testcases)
+                    self._release_readers(ecu60_reader, sil60_reader, ecu20_reader, sil20_reader)
+                    self._save_results(recording, marks, fingerprint)
                     return
 
                 tc_class.set_bsig_reader(ecu_bsig_reader, sil_bsig_reader, ecu_bsig_reader2, sil_bsig_reader2)
 
-            tc_class.execute(story)
+            testcases.append((tc_class, story, tc_cfg[TC_NAME]))
+            if mark is not None:
+                marks.append(mark)
 
-        ecu60_reader.close()
-        sil60_reader.close()
-        ecu20_reader.close()
-        sil20_reader.close()
+        if testcases:
+            self._preload_signals(readers)
+
+        self._execute_testcases(testcases)
+
+        # duration for the statistics of the process manager, timestamps are taken from the cache
+        if sil60_reader.is_open and TIMESTAMP_SIGNAL in sil60_reader:
+            timestamps = sil60_reader[TIMESTAMP_SIGNAL]
+            if len(timestamps):
+                self._set_data(RECORDING_DURATION_PORT_NAME, timestamps[-1] - timestamps[0], GLOBAL_BUS_NAME)
+        self._release_readers(ecu60_reader, sil60_reader, ecu20_reader, sil20_reader)
+        self._save_results(recording, marks, fingerprint)
 
         # search and open bin files
         return self.RET_VAL_OK
 
+    def _save_results(self, recording, marks, fingerprint):
+        """ Store the results the executed testcases added for the recording.
+            :param recording: current recording
+            :param marks: list of testcase index, number of test steps, story length
+                          and result marks taken before the testcase was executed
+            :param fingerprint: fingerprint of the simulation files
+        """
+        for index, step_count, story_len, tc_marks in marks:
+            tc_result, tc_class, tc_cfg, story = self.testcase_clazz_map[index]
+            flowables = story.story[story_len:]
+            # plots of the report are kept with the results
+            images = [flw._image for flw in flowables  # pylint: disable=W0212
+                      if isinstance(getattr(flw, "_image", None), basestring) and os.path.isfile(flw._image)]
+            self._store.save(recording, tc_cfg[TC_NAME],
+                             (tc_result.test_steps[step_count:], flowables, tc_class.get_recording_results(tc_marks)),
+                             fingerprint, self._cfg_hashes[index], images)
+
+    def _cached_reader(self, bus, options):
+        """ Reader of the current simulation file of a bus, opened on first
+            access and reading through the signal cache.
+            :param bus: bus name
+            :param options: SignalReader options
+        """
+        return CachedSignalReader(self._signal_cache,
+                                  self._data_manager.get_data_port("CurrentSimFile", bus), **options)
+
+    def _check_index_signals(self, readers):
+        """ Check the files of the current recording for the index signals
+            the testcases require (see BaseTest.signal_manifest).
+            :param readers: dict bus -> reader
+            :return: RET_VAL_ERROR if an index signal is missing
+        """
+        for bus, plan in self._manifest.items():
+            reader = readers[bus]
+            if not reader:
+                continue
+
+            missing = [name for name in plan["required"] if name not in reader]
+            if missing:
+                self._logger.error("Index signal(s) {0:} missing in '{1:}', skipping recording."
+                                   .format(", ".join(missing), reader))
+                return self.RET_VAL_ERROR
+
+        return self.RET_VAL_OK
+
+    def _preload_signals(self, readers):
+        """ Read the signals needed by the testcases with one request per
+            file into the signal cache, as far as the cache budget allows.
+            Readers keeping all values in memory (csv files) are not preloaded.
+            :param readers: dict bus -> reader
+        """
+        if not self.config.get(CFG_SIGNAL_PRELOAD, True) or self._signal_cache.budget <= 0:
+            return
+
+        for bus, plan in self._manifest.items():
+            reader = readers[bus]
+            if not reader or reader.resident:
+                continue
+
+            names = plan["required"] + [name for name in plan["signals"] if name in reader]
+            absent = len(plan["required"]) + len(plan["signals"]) - len(names)
+            known = set(names)
+            for pattern in plan["patterns"]:
+                regex = re.compile(pattern)
+                matches = [name for name in reader.signal_names if regex.match(name) and name not in known]
+                names.extend(matches)
+                known.update(matches)
+            if absent:
+                self._logger.warning("{0:} signal(s) of the testcases not in '{1:}', e.g. {2:}"
+                                     .format(absent, reader, ", ".join(name for name in plan["signals"]
+                                                                       if name not in reader)[:200]))
+
+            # estimated size of float values, stop at the budget as further signals would evict the first ones
+            size = 0
+            preload = []
+            for name in names:
+                size += reader.signal_length(name) * 8
+                if size > self._signal_cache.budget:
+                    break
+                preload.append(name)
+            if preload:
+                reader.signals(preload)
+                self._logger.debug("Preloaded {0:} of {1:} signals of '{2:}'".format(len(preload), len(names), reader))
+
+    def _release_readers(self, *readers):
+        """ Close the readers of the current recording and clear the signal
+            cache, logging its statistics.
+        """
+        for reader in readers:
+            reader.close()
+
+        self._logger.info("Signal cache: {hits:} hits, {misses:} misses, {evictions:} evictions, "
+                          "{signals:} signals with {bytes:} bytes".format(**self._signal_cache.stats))
+        self._signal_cache.clear()
+        self._signal_cache.reset_stats()
+
+    def _execute_testcases(self, testcases):
+        """ Execute the testcases of the current recording, in parallel
+            threads if configured. The testcases write to own stories only,
+            so the report keeps the order of the configuration.
+            :param testcases: list of (testcase class, story, name)
+        """
+        # measured per testcase if profiling is switched on
+        profiler = self._data_manager.get_data_port(PROFILER_PORT_NAME)
+        tasks = [testcase + (profiler, self.recordings[-1]) for testcase in testcases]
+
+        threads = int(self.config.get(CFG_TC_THREADS) or 1)
+        if threads <= 1 or len(tasks) <= 1:
+            for task in tasks:
+                _execute_testcase(task)
+            return
+
+        if self._pool is None:
+            self._pool = ThreadPool(threads)
+        self._pool.map(_execute_testcase, tasks, chunksize=1)
+
+    def get_recording_mark(self):
+        """ Current number of recordings and for each testcase the number of
+            teststeps, story entries and the marks of its results.
+        """
+        return len(self.recordings), [(len(tc_result.test_steps), len(story.story), tc_class.result_marks())
+                                      for tc_result, tc_class, _, story in self.testcase_clazz_map]
+
+    def get_recording_results(self, mark=None):
+        """ Results of the recordings processed by a worker of the recording-parallel mode:
+            the recordings and for each testcase the new teststeps, the story and the testcase's results.
+            :param mark: opt. mark of get_recording_mark to get the results added since then only
+        """
+        if mark is None:
+            mark = 0, [(count, 0, None) for count in self._step_counts]
+        testcases = [(tc_result.test_steps[count:], story.story[story_len:], tc_class.get_recording_results(tc_marks))
+                     for (tc_result, tc_class, _, story), (count, story_len, tc_marks) in zip(self.testcase_clazz_map,
+                                                                                             mark[1])]
+        return self.recordings[mark[0]:], testcases
+
+    def merge_recording_results(self, results):
+        """ Add results of a worker of the recording-parallel mode.
+            :param results: results as returned by get_recording_results
+        """
+        recordings, testcases = results
+        if not recordings:
+            return self.RET_VAL_OK
+
+        self.recordings.extend(recordings)
+        for testcase, results in zip(self.testcase_clazz_map, testcases):
+            self._add_testcase_results(testcase, results)
+
+        return self.RET_VAL_OK
+
+    @staticmethod
+    def _add_testcase_results(testcase, results):
+        """ Add teststeps, story and results of a testcase created by a
+            worker of the recording-parallel mode or taken from the result
+            store.
+            :param testcase: entry of the testcase_clazz_map
+            :param results: tuple of teststeps, flowables and testcase results
+        """
+        tc_result, tc_class, _, story = testcase
+        steps, flowables, tc_results = results
+        for step in steps:
+            tc_result.add_test_step(step)
+        story.story.extend(flowables)
+        tc_class.merge_recording_results(tc_results)
+
     def _append_recordings_table(self, story):
         name = "Recordings"
         header = ["No.", "Filename", ]
@@ -256,6 +519,28 @@ class EcuSilObserver(BaseComponentInterface):
             self._logger.error("Failed to build report. " + repr(ex))
             raise
 
+    def terminate(self):
+        """ Stop the threads executing the testcases. """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+        return self.RET_VAL_OK
+
+
+def _execute_testcase(args):
+    """ Execute one testcase on the current recording.
+        :param args: testcase class, its story and name, profiler or None
+                     and the recording
+    """
+    tc_class, story, name, profiler, recording = args
+    if profiler is None:
+        tc_class.execute(story)
+        return
+
+    with profiler.measure(name, "execute", recording):
+        tc_class.execute(story)
+
 """
 CHANGE LOG:
 -----------
@@ -24,28 +24,35 @@ The internal core manager for Validation Framework used by Valf class.
 
 # - import Python modules ---------------------------------------------------------------------------------------------
 from os import path as opath
+from cPickle import dumps, HIGHEST_PROTOCOL
+from multiprocessing import Pool, Queue
+from Queue import Empty
 
 # noinspection PyProtectedMember
 from sys import path as spath, _getframe, exit as sexit
 from inspect import currentframe
 from configparser import RawConfigParser, NoOptionError
-from collections import OrderedDict
+from collections import OrderedDict, deque
 from traceback import format_exc
 from re import search
-from framework.io.signalreader import SignalReader
+from framework.io.prefetch import open_signal_reader
 from framework.util.defines import *
 # - import framework modules ------------------------------------------------------------------------------------------------
 
 from framework.util.logger import Logger
 from framework.util.tds import UncRepl
 from framework.util.error import ValfError
-from framework.util.find import find_class
+from framework.util.find import PluginIndex
 from framework.valf.base_component_ifc import BaseComponentInterface as bci
+from framework.valf.checkpoint import CheckpointJournal, config_key, CHECKPOINT_FILE
+from framework.valf.profiler import PhaseProfiler
 from framework.valf.data_manager import DataManager
 from framework.valf.progressbar import ProgressBar
 from framework.util.defines import CFG_FILE_VERSION_PORT_NAME
 
 # - defines -----------------------------------------------------------------------------------------------------------
+_RESULT_QUEUE = None  # results of each recording in worker processes of recording-parallel mode
+
 VALF_DIR = opath.dirname(opath.abspath(currentframe().f_code.co_filename))
 if VALF_DIR not in spath:
     spath.append(VALF_DIR)
@@ -96,6 +103,33 @@ class ProcessManager(object):
             to show progress bar
         - read "IsFinished"
             to continue with next state when all sections of a recording are validated (set by `SignalExtractor`)
+        - read "ParallelRecordings"
+            opt. number of worker processes to run the recordings in parallel, default: sequential run
+
+    **recording-parallel mode**
+
+    With "ParallelRecordings" set (e.g. ``InputData=[("ParallelRecordings", 8), ...]`` in section ``[Global]``)
+    the recordings are distributed round robin to worker processes, each with own instances of all components
+    (same config and ports) and an own data manager. All components have to support it
+    (class attribute ``PARALLEL_RECORDINGS``), otherwise the recordings are processed sequentially.
+    The workers pass the results of each recording (``get_recording_results``) to the main process as soon as
+    it's processed, they are merged into the components of the main process in order of the recordings
+    (``merge_recording_results``) before pre_terminate and terminate are called in the main process as usual.
+
+    **checkpoints**
+
+    With "Checkpoint" set (``True`` to use ``valf_checkpoint.sqlite`` in the output folder or a path/to/journal)
+    the results of each processed recording are added to a journal (`framework.valf.checkpoint`),
+    supported if all components support the recording-parallel mode. A run restarted after a crash with the
+    same output folder (don't let `Valf` clean it) and config merges the journaled results and continues with
+    the first unfinished recording. The journal is removed when the run is finished.
+
+    **profiling**
+
+    With "Profile" set to ``True`` wall time, cpu time and peak memory of each phase method of each component
+    are recorded per recording (`framework.valf.profiler`). The records are saved as ``valf_profile.json`` and
+    ``valf_profile.csv`` in the output folder at the end of the run, a summary is logged.
+    Components can add own records using the profiler provided on port "Profiler".
 
     Also setting ports as defined in ``InputData``  for the named bus.
 
@@ -112,12 +146,17 @@ class ProcessManager(object):
         self._logger = Logger(self.__class__.__name__)
         # self._logger.debug()
 
+        self._plugin_dir = plugin_dir
         self._component_list = []
+        self._config_list = []  # loaded config files, to be loaded as well by workers
 
         self._version = "$Revision: 1.2 $"
 
         self._progressbar = None
         self._file_count = 0
+        self._processed_files = 0
+        self._processed_time = 0
+        self._profiler = None
         self._object_map_list = []
         self._config_file_loaded = False
         self._fail_on_error = fail_on_error
@@ -129,14 +168,14 @@ class ProcessManager(object):
         plugin_dir.extend([self._uncrepl(dir_) for dir_ in OBS_DIRS if dir_ not in plugin_dir])
 
         self._logger.info("Searching for plug-ins. Please wait...")
-        class_map_list, self._plugin_error_list = find_class(bci, plugin_dir, with_error_list=True)
-        if class_map_list is None:
+        # only the modules of the observers used by the config are imported, see load_configuration
+        self._plugins = PluginIndex(bci, plugin_dir)
+        self._plugin_error_list = self._plugins.errors
+        if not self._plugins.names:
             self._logger.error("No plug-ins found.")
             return
 
-        self._logger.info("%d plug-ins found: %s." % (len(class_map_list), ", ".join([i['name']
-                                                                                     for i in class_map_list])))
-        self._plugin_map = {plugin['name']: plugin["type"] for plugin in class_map_list}
+        self._logger.info("%d plug-ins found: %s." % (len(self._plugins.names), ", ".join(self._plugins.names)))
 
         # Create data manager object
         # noinspection PyBroadException
@@ -148,8 +187,28 @@ class ProcessManager(object):
                 raise
             sexit(bci.RET_VAL_ERROR)
 
-    def _initialize(self):
+    def _call(self, component, phase, recording=None, **kwargs):
+        """call a phase method of a component, measured if profiling is switched on
+
+        :param component: component to call
+        :param phase: name of method
+        :param recording: recording or callable returning it, see `PhaseProfiler.measure`
+        :param kwargs: arguments of method
+        :return: return value of method
+        """
+        if self._profiler is None:
+            return getattr(component, phase)(**kwargs)
+        with self._profiler.measure(component.get_component_name(), phase, recording):
+            return getattr(component, phase)(**kwargs)
+
+    def _current_file(self):
+        """:return: name of current recording"""
+        return self.get_data_port(CURRENT_FILE_PORT_NAME)
+
+    def _initialize(self, progress=True):
         """calls initialize and post_initialize of ordered observers
+
+        :param progress: show progress bar while processing
         """
         # self._logger.debug()
 
@@ -157,7 +216,7 @@ class ProcessManager(object):
         for component in self._component_list:
             # noinspection PyBroadException
             try:
-                if component.initialize() != bci.RET_VAL_OK:
+                if self._call(component, "initialize") != bci.RET_VAL_OK:
                     self._logger.error("Class '%s' returned with error from Initialize() method." %
                                        component.__class__.__name__)
                     return bci.RET_VAL_ERROR
@@ -172,7 +231,7 @@ class ProcessManager(object):
         for component in self._component_list:
             # noinspection PyBroadException
             try:
-                if component.post_initialize() != bci.RET_VAL_OK:
+                if self._call(component, "post_initialize") != bci.RET_VAL_OK:
                     self._logger.error("Class '%s' returned with error from PostInitialize() method."
                                        % component.__class__.__name__)
                     return bci.RET_VAL_ERROR
@@ -185,7 +244,7 @@ class ProcessManager(object):
 
         self._file_count = self.get_data_port("FileCount")
         if self._file_count > 0:
-            self._progressbar = ProgressBar(0, self._file_count, multiline=True)
+            self._progressbar = ProgressBar(0, self._file_count, multiline=True) if progress else lambda _: None
         else:
             self._file_count = 0
 
@@ -193,8 +252,11 @@ class ProcessManager(object):
         # self._logger.mem_usage()
         return bci.RET_VAL_OK
 
-    def _process_data(self):
+    def _process_data(self, journal=None):
         """calls load_data, process_data as well as post_process_data of ordered observers
+
+        :param journal: opt. checkpoint journal to add the results of each recording to
+        :type journal: CheckpointJournal
         """
         self._logger.debug()
 
@@ -204,11 +266,11 @@ class ProcessManager(object):
 
         ret = bci.RET_VAL_ERROR
         counter = 0
-        self._processed_files = 0
-        self._processed_time = 0
+        checkpoint = None
         while not self.get_data_port("IsFinished"):
             # update progressbar position
             self._progressbar(counter)
+            self.set_data_port(RECORDING_DURATION_PORT_NAME, None)
 
             counter += 1
 
@@ -216,7 +278,7 @@ class ProcessManager(object):
             for component in self._component_list:
                 # noinspection PyBroadException
                 try:
-                    ret = component.load_data()
+                    ret = self._call(component, "load_data", self._current_file)
                     if ret is bci.RET_VAL_ERROR:
                         self._logger.error("Class '%s' returned with error from LoadData() method, "
                                            "continue with next sim file." % component.__class__.__name__)
@@ -230,6 +292,14 @@ class ProcessManager(object):
                         raise
                     break
 
+            # journal the previous recording when the next one is loaded
+            if journal is not None and (checkpoint is None or
+                                        checkpoint[0] != self.get_data_port(CURRENT_FILE_PORT_NAME)):
+                self._checkpoint(journal, checkpoint)
+                checkpoint = (self.get_data_port(CURRENT_FILE_PORT_NAME),
+                              [component.get_recording_mark() for component in self._component_list],
+                              self._processed_files, self._processed_time)
+
             if ret is bci.RET_VAL_ERROR:
                 continue
 
@@ -237,7 +307,7 @@ class ProcessManager(object):
             for component in self._component_list:
                 # noinspection PyBroadException
                 try:
-                    ret = component.process_data()
+                    ret = self._call(component, "process_data", self._current_file)
                     if ret is bci.RET_VAL_ERROR:
                         self._logger.error("Class '%s' returned with error from ProcessData() method, "
                                            "continue with next sim file." % component.__class__.__name__)
@@ -258,7 +328,7 @@ class ProcessManager(object):
             for component in self._component_list:
                 # noinspection PyBroadException
                 try:
-                    ret = component.post_process_data()
+                    ret = self._call(component, "post_process_data", self._current_file)
                     if ret is bci.RET_VAL_ERROR:
                         self._logger.error("Class '%s' returned with error from PostProcessData() method, "
                                            "continue with next sim file." % component.__class__.__name__)
@@ -280,19 +350,216 @@ class ProcessManager(object):
 
             # self._logger.mem_usage()
             ret = bci.RET_VAL_OK
-            if component is not None:
-                # noinspection PyProtectedMember
-                sil60_reader = SignalReader(component._data_manager.get_data_port("CurrentSimFile", BUS_SIL_208),delim=',')
+            # duration as provided by the components (e.g. from the timestamps they've read anyway),
+            # read from sim file of SIL bus only if not
+            duration = self.get_data_port(RECORDING_DURATION_PORT_NAME)
+            if duration is None and component is not None:
+                sil60_reader = open_signal_reader(self.get_data_port(CURRENT_SIMFILE_PORT_NAME, BUS_SIL_208),
+                                                  delim=',')
                 ts_tmp = sil60_reader["MTS.Package.TimeStamp"]
-                self._processed_time += ts_tmp[-1] - ts_tmp[0]
-            else:
-                self._processed_time += 0
+                sil60_reader.close()
+                duration = ts_tmp[-1] - ts_tmp[0]
+            self._processed_time += duration or 0
             self._processed_files += 1
         if counter > 0:
             self._progressbar(counter)
+        self._checkpoint(journal, checkpoint)
+
+        return ret
+
+    def _checkpoint(self, journal, checkpoint):
+        """add results of a processed recording to the journal
+
+        :param journal: checkpoint journal or None
+        :param checkpoint: None or recording name, marks of the components and counters when it was loaded
+        :type checkpoint: tuple
+        """
+        if journal is None or checkpoint is None:
+            return
+
+        recording, marks, processed_files, processed_time = checkpoint
+        journal.add([recording], [component.get_recording_results(mark)
+                                  for component, mark in zip(self._component_list, marks)],
+                    self._processed_files - processed_files, self._processed_time - processed_time)
+
+    def _open_journal(self):
+        """open the checkpoint journal if configured, merge the journaled results and skip their recordings
+
+        :return: journal or None if not configured or not supported
+        :rtype: CheckpointJournal | None
+        """
+        checkpoint = self.get_data_port(CHECKPOINT_PORT_NAME)
+        if not checkpoint:
+            return None
+
+        sequential = [c.get_component_name() for c in self._component_list if not c.PARALLEL_RECORDINGS]
+        readers = [c for c in self._component_list if hasattr(c, "skip_recordings")]
+        if sequential or not readers:
+            self._logger.warning("checkpoints not supported by %s, journal switched off."
+                                 % (", ".join(sequential) or "components without collection reader"))
+            return None
+
+        filename = checkpoint if isinstance(checkpoint, basestring) else \
+            opath.join(self.get_data_port(OUTPUTDIRPATH_PORT_NAME) or ".", CHECKPOINT_FILE)
+        journal = CheckpointJournal(filename, config_key(self._config_list))
+        if journal.discarded:
+            self._logger.warning("config changed, dropped %d journaled recordings of '%s'."
+                                 % (journal.discarded, filename))
+
+        recordings = []
+        for names, comp_results, processed_files, processed_time in journal.entries():
+            if self._merge_results(comp_results) is bci.RET_VAL_ERROR:
+                journal.close()
+                return None
+            recordings.extend(names)
+            self._processed_files += processed_files
+            self._processed_time += processed_time
+
+        if recordings:
+            for reader in readers:
+                reader.skip_recordings(recordings)
+            self._file_count = self.get_data_port("FileCount") or 0
+            if self._file_count > 0 and isinstance(self._progressbar, ProgressBar):
+                self._progressbar = ProgressBar(0, self._file_count, multiline=True)
+            self._logger.info("resuming after %d journaled recordings of '%s'." % (len(recordings), filename))
+
+        return journal
+
+    def _merge_results(self, comp_results):
+        """merge results of recordings processed elsewhere (worker process or interrupted run) into the components
+
+        :param comp_results: results of all components as returned by their ``get_recording_results``
+        :type comp_results: list
+        :return: RET_VAL_OK or RET_VAL_ERROR
+        """
+        for component, comp_result in zip(self._component_list, comp_results):
+            # noinspection PyBroadException
+            try:
+                component.merge_recording_results(comp_result)
+            except:
+                self._logger.exception('EXCEPTION during MergeRecordingResults of %s:\n%s'
+                                       % (component.__class__.__name__, format_exc()))
+                if self._fail_on_error:
+                    raise
+                return bci.RET_VAL_ERROR
+        return bci.RET_VAL_OK
+
+    def _process_data_parallel(self, workers, ports, journal=None):
+        """process the recordings in a pool of worker processes and merge their results
+
+        :param workers: number of worker processes
+        :param ports: ports to set in the workers, as list of (bus, port, value)
+        :param journal: opt. checkpoint journal to add the results of each recording to,
+                        in order of the recordings as far as all previous ones are processed
+        :type journal: CheckpointJournal
+        :return: return value as `_process_data` or None if not possible to run in parallel
+        """
+        self._logger.debug()
+
+        sequential = [c.get_component_name() for c in self._component_list if not c.PARALLEL_RECORDINGS]
+        if sequential:
+            self._logger.warning("recording-parallel mode not supported by %s, processing sequentially."
+                                 % ", ".join(sequential))
+            return None
+
+        recordings = next((c.pending_recordings for c in self._component_list
+                           if hasattr(c, "pending_recordings")), [])
+        if self._file_count == 0 or len(recordings) < 2:
+            return None
+
+        try:
+            dumps(ports, HIGHEST_PROTOCOL)
+        except Exception as ex:
+            self._logger.warning("ports can't be passed to worker processes (%s), processing sequentially." % ex)
+            return None
+
+        # recordings distributed round robin, so the results come back about in order of the recordings
+        count = min(workers, len(recordings))
+        blocks = [recordings[i::count] for i in xrange(count)]
+        self._logger.info("processing %d recordings in %d worker processes." % (len(recordings), count))
+
+        self._progressbar(0)
+        queue = Queue()
+        pool = Pool(count, _init_worker, (queue,))
+        position = dict((rec, i) for i, rec in enumerate(recordings))
+        received = [deque() for _ in blocks]
+        finished = [False] * count
+        cursor = 0
+        results = []
+        entries = []
+        processed_files = 0
+        try:
+            tasks = pool.map_async(_process_recordings, [(self._plugin_dir, self._fail_on_error, self._config_list,
+                                                          ports, worker, block) for worker, block in enumerate(blocks)])
+            while cursor < len(recordings):
+                try:
+                    item = queue.get(timeout=0.5)
+                except Empty:
+                    if tasks.ready():
+                        tasks.get()  # raises the exception of a failed worker
+                    continue
+                if item[1] is None:
+                    finished[item[0]] = True
+                else:
+                    received[item[0]].append(item[1:])
+
+                # take the results of the next recordings, as far as their worker has processed them
+                while cursor < len(recordings):
+                    worker = cursor % count
+                    if received[worker]:
+                        result = received[worker][0]
+                        pos = position.get(result[0][0])
+                        if pos > cursor:  # no results of worker for this recording
+                            cursor += 1
+                            continue
+                        received[worker].popleft()
+                        results.append(result)
+                        if journal is not None:
+                            entries.append(journal.add(*result))
+                        processed_files += result[2]
+                        self._progressbar(processed_files)
+                        if pos == cursor:
+                            cursor += 1
+                    elif finished[worker]:
+                        cursor += 1
+                    else:
+                        break
+
+            ret = bci.RET_VAL_ERROR
+            for ret, records in tasks.get():
+                if self._profiler is not None:
+                    self._profiler.extend(records)
+            pool.close()
+        except:
+            pool.terminate()
+            self._logger.exception("EXCEPTION in worker process:\n%s" % format_exc())
+            # recordings of this run are processed again sequentially, don't journal them twice
+            if entries:
+                journal.discard(entries)
+            if self._fail_on_error:
+                raise
+            self._logger.warning("processing sequentially.")
+            return None
+        finally:
+            pool.join()
+        self._progressbar(self._file_count)
+
+        for _, comp_results, processed_files, processed_time in results:
+            if self._merge_results(comp_results) is bci.RET_VAL_ERROR:
+                return bci.RET_VAL_ERROR
+            self._processed_files += processed_files
+            self._processed_time += processed_time
 
         return ret
 
+    def _port_values(self):
+        """values of all ports, used to set up the workers in recording-parallel mode
+
+        :return: list of (bus, port, value)
+        """
+        return [(bus, port, value) for bus, ports in dict.items(self._data_manager)
+                for port, value in dict.items(ports)]
+
     def _terminate(self):
         """calls pre_terminate and terminate of ordered observers
         """
@@ -305,8 +572,8 @@ class ProcessManager(object):
                 component._processed_files = self._processed_files
                 component._processed_time = self._processed_time
 
-                if component.pre_terminate(_processed_files=self._processed_files,
-                                           _processed_time=self._processed_time) != bci.RET_VAL_OK:
+                if self._call(component, "pre_terminate", _processed_files=self._processed_files,
+                              _processed_time=self._processed_time) != bci.RET_VAL_OK:
                     self._logger.error("Class '%s' returned with error from PreTerminate() method."
                                        % component.__class__.__name__)
                     return bci.RET_VAL_ERROR
@@ -321,7 +588,7 @@ class ProcessManager(object):
         for component in self._component_list:
             # noinspection PyBroadException
             try:
-                if component.terminate() != bci.RET_VAL_OK:
+                if self._call(component, "terminate") != bci.RET_VAL_OK:
                     self._logger.exception("Class '%s' returned with error from Terminate() method."
                                            % component.__class__.__name__)
                     return bci.RET_VAL_ERROR
@@ -418,20 +685,18 @@ class ProcessManager(object):
             if type(connect_bus_list) not in (list, tuple):
                 connect_bus_list = [connect_bus_list]
 
-            if class_name in self._plugin_map:
+            plugin = self._plugins.load(class_name)
+            if plugin is not None:
                 # Observer can be loaded -> Everything fine.
                 # self._logger.debug("Loading plug-in: '%s'." % componentname)
                 if len(arguments) > 0 and len(key_words) > 0:
-                    cls_obj = self._plugin_map[class_name](self._data_manager, componentname, connect_bus_list,
-                                                           *arguments, **key_words)
+                    cls_obj = plugin(self._data_manager, componentname, connect_bus_list, *arguments, **key_words)
                 elif len(key_words) > 0:
-                    cls_obj = self._plugin_map[class_name](self._data_manager, componentname, connect_bus_list,
-                                                           **key_words)
+                    cls_obj = plugin(self._data_manager, componentname, connect_bus_list, **key_words)
                 elif len(arguments) > 0:
-                    cls_obj = self._plugin_map[class_name](self._data_manager, componentname, connect_bus_list,
-                                                           *arguments)
+                    cls_obj = plugin(self._data_manager, componentname, connect_bus_list, *arguments)
                 else:
-                    cls_obj = self._plugin_map[class_name](self._data_manager, componentname, connect_bus_list)
+                    cls_obj = plugin(self._data_manager, componentname, connect_bus_list)
             elif componentname != "Global":
                 # Observer can NOT be loaded -> Create Log Entry and raise Exception !
                 err_trace = self._get_err_trace()
@@ -494,6 +759,7 @@ class ProcessManager(object):
             self._logger.error("No component loaded. Please check config file '%s'." % str(configfile))
             return False
 
+        self._config_list.append(configfile)
         self._config_file_loaded = True
 
         return True
@@ -613,6 +879,30 @@ class ProcessManager(object):
     def run(self):
         """called by Valf to start state machine
         """
+        if self.get_data_port(PROFILE_PORT_NAME):
+            self._profiler = PhaseProfiler()
+            self.set_data_port(PROFILER_PORT_NAME, self._profiler)
+        try:
+            return self._run()
+        finally:
+            if self._profiler is not None:
+                self._save_profile()
+
+    def _save_profile(self):
+        """save profile records and log summary"""
+        # noinspection PyBroadException
+        try:
+            filename = self._profiler.save(self.get_data_port(OUTPUTDIRPATH_PORT_NAME) or ".")
+        except Exception as ex:
+            self._logger.error("couldn't save profile: %s" % ex)
+            return
+        self._logger.info("profile saved to '%s.json/.csv', wall / cpu time per component and phase:\n%s"
+                          % (filename, "\n".join("%s.%s: %.1fs / %.1fs, %d calls" % item
+                                                 for item in self._profiler.summary())))
+
+    def _run(self):
+        """run all states of the components
+        """
         if not self._config_file_loaded:
             self._logger.error("Configuration file was not loaded. Please call 'load_configuration' method.")
             return bci.RET_VAL_ERROR
@@ -620,6 +910,11 @@ class ProcessManager(object):
         comps = [c.get_component_name() for c in self._component_list]
         self._logger.info("components configured: %s" % ", ".join(comps))
 
+        # ports are taken before initialisation as the workers of recording-parallel mode initialise on their own
+        workers = int(self.get_data_port(PARALLEL_RECORDINGS_PORT_NAME) or 0)
+        ports = [(bus, port, value) for bus, port, value in self._port_values()
+                 if port.lower() != PROFILER_PORT_NAME.lower()] if workers > 1 else None
+
         # noinspection PyBroadException
         try:
             if self._initialize() is bci.RET_VAL_ERROR:
@@ -630,15 +925,23 @@ class ProcessManager(object):
                 raise
             return bci.RET_VAL_ERROR
 
+        journal = None
         # noinspection PyBroadException
         try:
-            if self._process_data() is bci.RET_VAL_ERROR:
+            journal = self._open_journal()
+            ret = self._process_data_parallel(workers, ports, journal) if workers > 1 else None
+            if ret is None:
+                ret = self._process_data(journal)
+            if ret is bci.RET_VAL_ERROR:
                 return bci.RET_VAL_ERROR
         except Exception as _:
             self._logger.exception('EXCEPTION during data processing of observers:')
             if self._fail_on_error:
                 raise
             return bci.RET_VAL_ERROR
+        finally:
+            if journal is not None:
+                journal.close()
 
         # noinspection PyBroadException
         try:
@@ -650,9 +953,71 @@ class ProcessManager(object):
                 raise
             return bci.RET_VAL_ERROR
 
+        # finished, no need to resume
+        if journal is not None:
+            journal.remove()
+
         return bci.RET_VAL_OK
 
 
+# - functions ---------------------------------------------------------------------------------------------------------
+def _init_worker(queue):
+    """initialise worker process of recording-parallel mode
+
+    :param queue: queue to pass the results of each recording to the main process
+    :type queue: Queue
+    """
+    global _RESULT_QUEUE  # pylint: disable=W0603
+    _RESULT_QUEUE = queue
+
+
+def _process_recordings(args):
+    """worker process of recording-parallel mode, processes recordings with own component instances
+
+    the results of each recording are put to the result queue as (worker, recordings, results of all components,
+    processed files, processed time) when the next one is loaded, recordings is None after the last one
+
+    :param args: plugin dirs, fail_on_error flag, config files, port values as (bus, port, value),
+                 index of worker, recordings
+    :type args: tuple
+    :return: return value of processing, profile records
+    :rtype: tuple
+    """
+    plugin_dir, fail_on_error, config_list, ports, worker, recordings = args
+
+    pmgr = ProcessManager(list(plugin_dir), fail_on_error)
+    for configfile in config_list:
+        pmgr.load_configuration(configfile)
+    for bus, port, value in ports:
+        pmgr.set_data_port(port, value, bus)
+    pmgr.set_data_port(PARALLEL_RECORDINGS_PORT_NAME, None)
+    pmgr.set_data_port(CHECKPOINT_PORT_NAME, None)
+    if pmgr.get_data_port(PROFILE_PORT_NAME):
+        pmgr._profiler = PhaseProfiler()  # pylint: disable=W0212
+        pmgr.set_data_port(PROFILER_PORT_NAME, pmgr._profiler)  # pylint: disable=W0212
+    pmgr.set_data_port(RECORDING_SELECTION_PORT_NAME, recordings)
+
+    # noinspection PyProtectedMember
+    if pmgr._initialize(progress=False) is bci.RET_VAL_ERROR:  # pylint: disable=W0212
+        raise ValfError("initialisation failed in worker process for recordings %s" % ", ".join(recordings))
+    # noinspection PyProtectedMember
+    ret = pmgr._process_data(_QueueJournal(_RESULT_QUEUE, worker))  # pylint: disable=W0212
+    _RESULT_QUEUE.put((worker, None, None, 0, 0))
+
+    return ret, pmgr._profiler.records if pmgr._profiler is not None else []  # pylint: disable=W0212
+
+
+class _QueueJournal(object):
+    """journal of a worker process, puts the results of each recording to the result queue"""
+    def __init__(self, queue, worker):
+        self._queue = queue
+        self._worker = worker
+
+    def add(self, recordings, results, processed_files, processed_time):
+        """put results of processed recordings to the queue, see `CheckpointJournal.add`"""
+        self._queue.put((self._worker, recordings, results, processed_files, processed_time))
+
+
 """
 $Log: process_manager.py  $
 Revision 1.2 2020/03/31 10:14:11CEST Leidenberger, Ralf (uidq7596) 
@@ -0,0 +1,169 @@
+"""
+framework/valf/profiler
+-------------------
+
+Timing and memory profile of the observer phases
+
+**User-API Interfaces**
+
+  - `PhaseProfiler` (records wall time, cpu time and peak memory of measured calls)
+  - `peak_rss` (peak resident memory of this process)
+
+The `ProcessManager` measures each phase method (initialize, load_data, process_data, ...) of each observer
+for each recording if the port ``Profile`` is set, components can add own measurements (e.g. per testcase)
+using the profiler provided on port ``Profiler``. At the end of the run the records are saved as
+``valf_profile.json`` and ``valf_profile.csv`` in the output folder and a summary is logged.
+
+CPU time is the one of the whole process, measurements running in parallel threads include each other.
+Peak RSS is the highest resident memory of the process so far, an increase shows the measured call
+needed more memory than all calls before.
+
+usage (example)
+
+.. code-block:: python
+
+    from framework.valf.profiler import PhaseProfiler
+
+    profiler = PhaseProfiler()
+    with profiler.measure('EcuSil', 'process_data', 'rec01.rec'):
+        ...
+    profiler.save('out')
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+import csv
+import json
+from collections import OrderedDict
+from contextlib import contextmanager
+from os import path as opath, times
+from sys import platform
+from threading import Lock
+from time import time
+
+try:
+    from resource import getrusage, RUSAGE_SELF
+except ImportError:
+    getrusage = RUSAGE_SELF = None
+
+__all__ = ['PhaseProfiler', 'peak_rss']
+
+
+# - defines ------------------------------------------------------------------------------------------------------------
+PROFILE_FILE = "valf_profile"
+FIELDS = ("recording", "component", "phase", "wall", "cpu", "peak_rss", "rss_increase")
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def peak_rss():
+    """peak resident memory (working set) of this process
+
+    :return: bytes or None if not available
+    :rtype: int | None
+    """
+    if getrusage is not None:
+        # kB on linux, bytes on mac
+        return getrusage(RUSAGE_SELF).ru_maxrss * (1 if platform == "darwin" else 1024)
+
+    if platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):  # pylint: disable=R0903
+            """PROCESS_MEMORY_COUNTERS of psapi"""
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + \
+                [(name, ctypes.c_size_t) for name in ("PeakWorkingSetSize", "WorkingSetSize",
+                                                      "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage",
+                                                      "QuotaPeakNonPagedPoolUsage", "QuotaNonPagedPoolUsage",
+                                                      "PagefileUsage", "PeakPagefileUsage")]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+        if ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                    ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize
+
+    return None
+
+
+def _cpu_time():
+    """user and system time of this process"""
+    tms = times()
+    return tms[0] + tms[1]
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class PhaseProfiler(object):
+    """records of measured calls, thread safe"""
+    def __init__(self):
+        """set default values"""
+        self.records = []
+        self._lock = Lock()
+
+    @contextmanager
+    def measure(self, component, phase, recording=None):
+        """measure wall time, cpu time and peak memory of the enclosed code
+
+        :param component: name of component (or testcase)
+        :param phase: name of phase
+        :param recording: name of recording processed, None if not related to a recording,
+                          or a callable returning it at the end (e.g. when the recording is loaded by the call)
+        """
+        rss = peak_rss()
+        start, cpu = time(), _cpu_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time() - start, _cpu_time() - cpu
+            peak = peak_rss()
+            if callable(recording):
+                recording = recording()
+            with self._lock:
+                self.records.append(OrderedDict(zip(FIELDS, (recording, component, phase, wall, cpu, peak,
+                                                             None if peak is None else peak - rss))))
+
+    def extend(self, records):
+        """add records of another profiler, e.g. of a worker process
+
+        :param records: list of records
+        """
+        with self._lock:
+            self.records.extend(records)
+
+    def summary(self):
+        """wall time, cpu time and call count summed up per component and phase, longest first
+
+        :return: list of (component, phase, wall, cpu, count)
+        :rtype: list
+        """
+        totals = OrderedDict()
+        for rec in self.records:
+            total = totals.setdefault((rec["component"], rec["phase"]), [0., 0., 0])
+            total[0] += rec["wall"]
+            total[1] += rec["cpu"]
+            total[2] += 1
+        return sorted([key + tuple(val) for key, val in totals.items()], key=lambda item: item[2], reverse=True)
+
+    def save(self, folder):
+        """save records as json and csv files
+
+        :param folder: output folder
+        :return: path/to/file of both files without extension
+        """
+        filename = opath.join(folder, PROFILE_FILE)
+        with open(filename + ".json", "w") as fpt:
+            json.dump(self.records, fpt, indent=1)
+        with open(filename + ".csv", "wb") as fpt:
+            writer = csv.writer(fpt)
+            writer.writerow(FIELDS)
+            writer.writerows([rec.values() for rec in self.records])
+        return filename
+
+
+"""
+CHANGE LOG:
+-----------
+"""
@@ -59,16 +59,23 @@ All signal are exported into a single dataframe per signal block item.
 
 Are more complex option is the shown in the second block. The additional
 ListSize item is used to iterated over signal arrays starting from 0 and ending
-with ListSize - 1.
+with ListSize - 1. With the additional item "AsArray": True the block is not
+published as dataframe with ListSize x Mapping columns, but as dict with the
+timestamps ("TimeStamp"), the paths of the mapping ("names") and the values
+as one float array of shape time x ListSize x Mapping ("values").
+
+All signals of a block are read together and the dataframe is created at once.
 
 For object list extracting the ObjectList block can be configured.
 """
 from __future__ import print_function
 
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
 
-from framework.io.signalreader import SignalReader
+from framework.io.prefetch import open_signal_reader
 from framework.valf.base_component_ifc import BaseComponentInterface
 
 MIN_LIFE_TIME = "MinLifeTime"
@@ -83,6 +90,9 @@ SYNC_TIMESTAMP = "SyncTimestamp"
 DTYPE = "dtype"
 MAPPING = "Mapping"
 LIST_SIZE = "ListSize"
+AS_ARRAY = "AsArray"
+ARRAY_NAMES = "names"
+ARRAY_VALUES = "values"
 MTS_TIME_STAMP = "MTS.Package.TimeStamp"
 OBJECT_LIST = "ObjectList"
 OOI_LIST = "OOIList"
@@ -103,6 +113,8 @@ class PdSignalExtractor(BaseComponentInterface):
         BSIG file. The extracted signals and object list can be configured
         in the ValF configuration.
     """
+    PARALLEL_RECORDINGS = True
+
     def __init__(self, data_manager, component_name, bus_name):
         """ Initialized the observer.
             :param data_manager: Datamanager to access the bus.
@@ -135,7 +147,7 @@ class PdSignalExtractor(BaseComponentInterface):
         if bsig_file is None:
             raise Exception("Configuration must be wrong, received no bsig")
         # self.bsig_reader.open(bsig_file)
-        self.bsig_reader = SignalReader(bsig_file, delim=",")
+        self.bsig_reader = open_signal_reader(bsig_file, delim=",")
 
         # All other blocks, one data frame per block
         for key in self._config:
@@ -155,48 +167,41 @@ class PdSignalExtractor(BaseComponentInterface):
         mts_ts_dtype = np.long
         # raw_ts_signal = self.bsig_reader.get_signal_by_name(mts_ts_name)
         raw_ts_signal = self.bsig_reader[mts_ts_name]
-        ts_signal = np.fromiter(raw_ts_signal, mts_ts_dtype)
+        ts_signal = np.asarray(raw_ts_signal, mts_ts_dtype)
 
         if LIST_SIZE in cfg:
             self._logger.debug("Loading signal list for block {0:}".format(key))
 
-            signals = pd.DataFrame(index=ts_signal)
-            for k in range(cfg[LIST_SIZE]):
-                for desc in cfg[MAPPING]:
-                    full_path = (cfg[PREFIX] + desc[PATH]).format(k)
-                    column_name = desc[SIG_NAME].format(k)
-                    self._logger.debug("Loading: {0:} as {1:}"
-                                       .format(full_path, column_name))
-
-                    # raw_signal = self.bsig_reader.get_signal_by_name(full_path)
-                    raw_signal = self.bsig_reader[full_path]
-                    signal = np.fromiter(raw_signal, np.float64)
-                    signals[column_name] = pd.Series(signal, signals.index)
+            # all signals of the list read at once, filled into one array: time x list index x mapping
+            paths = [(cfg[PREFIX] + desc[PATH]).format(k) for k in range(cfg[LIST_SIZE]) for desc in cfg[MAPPING]]
+            raw_signals = self.bsig_reader.signals(paths)
+            values = np.empty((len(ts_signal), cfg[LIST_SIZE], len(cfg[MAPPING])), np.float64)
+            for idx, full_path in enumerate(paths):
+                values[:, idx // len(cfg[MAPPING]), idx % len(cfg[MAPPING])] = raw_signals[full_path]
+            self._logger.debug("Loaded {0:} signals of {1:}".format(len(paths), key))
+
+            if cfg.get(AS_ARRAY):
+                signals = {TIME_STAMP: ts_signal, ARRAY_NAMES: [desc[PATH] for desc in cfg[MAPPING]],
+                           ARRAY_VALUES: values}
+            else:
+                columns = [desc[SIG_NAME].format(k) for k in range(cfg[LIST_SIZE]) for desc in cfg[MAPPING]]
+                signals = pd.DataFrame(values.reshape(len(ts_signal), len(columns)), index=ts_signal,
+                                       columns=columns)
 
             self._data_manager.set_data_port(key, signals, self._bus_name)
 
         else:
             self._logger.debug("Loading signals for block {0:}".format(key))
 
-            signals = pd.DataFrame(index=ts_signal)
-            for desc in cfg[MAPPING]:
-                full_path = cfg[PREFIX] + desc[PATH]
-                column_name = desc[SIG_NAME]
-                self._logger.debug("Loading: {0:} as {1:}"
-                                   .format(full_path, column_name))
-
-                # raw_signal = self.bsig_reader.get_signal_by_name(full_path)
-                raw_signal = self.bsig_reader[full_path]
-
-                if DTYPE in desc.keys():
-                    value = desc[DTYPE]
-                    type_ = getattr(np, value)
-                    dtype = type_
-                else:
-                    dtype = np.float
-
-                signal = np.fromiter(raw_signal, dtype)
-                signals[column_name] = pd.Series(signal, signals.index)
+            paths = [cfg[PREFIX] + desc[PATH] for desc in cfg[MAPPING]]
+            raw_signals = self.bsig_reader.signals(paths)
+            columns = []
+            for desc, full_path in zip(cfg[MAPPING], paths):
+                dtype = getattr(np, desc[DTYPE]) if DTYPE in desc else np.float
+                columns.append((desc[SIG_NAME], np.asarray(raw_signals[full_path], dtype)))
+            self._logger.debug("Loaded {0:} signals of {1:}".format(len(paths), key))
+
+            signals = pd.DataFrame(OrderedDict(columns), index=ts_signal)
 
             self._data_manager.set_data_port(key, signals, self._bus_name)
 
@@ -13,9 +13,11 @@ from os import SEEK_END, SEEK_CUR
 from os.path import splitext
 from struct import unpack
 from zlib import decompress
-from csv import Error, reader
+from csv import reader
 from re import match
-from numpy import inf, array, int64
+from numpy import inf, array, empty, frombuffer, dtype, int64, float64, isfinite, char
+from pandas import read_csv
+from pandas.errors import EmptyDataError
 from six import PY2, PY3
 
 if PY2:
@@ -30,7 +32,8 @@ class CsvReader(object):  # pylint: disable=R0902
     """
     **Delimited reader class**
 
-    internal class used by SignalReader in case of reading csv type files
+    internal class used by SignalReader in case of reading csv type files,
+    all columns are parsed in one pass by pandas' C parser on first request and kept in memory
 
     use class `SignalReader` to read csv files
     """
@@ -38,8 +41,8 @@ class CsvReader(object):  # pylint: disable=R0902
     def __init__(self, filepath, **kwargs):  # pragma: no cover # pylint: disable=R0912,R1260
         """open / init cvs file"""
         self._signal_names = []
-        self._signal_values = {}
-        self._signal_type = {}
+        self._signal_idx = {}
+        self._signal_values = None
         self._all_types = {int64: 0, float: 1, str: 2}
 
         self._delimiter = kwargs.pop('delim', ';')
@@ -78,6 +81,7 @@ class CsvReader(object):  # pylint: disable=R0902
 
         # read file header
         try:
+            self._csv_kwargs = kwargs
             self._csv = reader(self._fp, delimiter=self._delimiter, **kwargs)
 
             for _ in range(self._skip_lines):
@@ -100,7 +104,8 @@ class CsvReader(object):  # pylint: disable=R0902
 
             if self._signal_names.count('') > 0:
                 self._signal_names.remove('')
-            self._signal_values = {i: [] for i in range(len(self._signal_names))}
+            for idx, name in enumerate(self._signal_names):
+                self._signal_idx.setdefault(name, idx)
 
             if self._scan_type == 'prefetch':
                 self._read_signals_values()
@@ -116,6 +121,7 @@ class CsvReader(object):  # pylint: disable=R0902
             self._fp = None
 
             self._signal_names = None
+            self._signal_idx = None
             self._signal_values = None
 
     def __len__(self):  # pragma: no cover
@@ -139,8 +145,7 @@ class CsvReader(object):  # pylint: disable=R0902
         :return: length of signal in file
         :rtype: int
         """
-        if len(self._signal_values[0]) == 0:
-            self._read_signals_values(self._signal_names[0])
+        self._read_signals_values()
         return len(self._signal_values[0])
 
     @property
@@ -168,110 +173,106 @@ class CsvReader(object):  # pylint: disable=R0902
         if isinstance(signal, (tuple, list,)):
             return [self.signal(s) for s in signal]
 
-        self._read_signals_values(self._signal_names[signal] if isinstance(signal, int) else signal)
+        self._read_signals_values()
 
         if isinstance(signal, StringTypes):
-            idx = self._signal_names.index(signal)
+            idx = self._signal_idx[signal]
         else:
             idx = signal
 
-        try:
-            vals = array(self._signal_values[idx], dtype=[tt for tt, it in list(self._all_types.items())
-                                                          if it == self._signal_type[idx]][0])
-        except KeyError:
-            vals = array(self._signal_values[idx], dtype=float)
+        # copy as caller might change values, columns are kept for the lifetime of the reader
+        vals = self._signal_values[idx].copy()
 
         if offset + count == 0:
             return vals
         return vals[offset:offset + count]
 
-    def _read_signals_values(self, signals_list=None):  # pragma: no cover # pylint: disable=R0912,R0915,R1260
+    def _read_signals_values(self):  # pragma: no cover
         """
         Read signal values from a simulation file - csv format.
-        This function reads a list of signal given as input.
-        When signals_list is 'None' all signal will be read
 
-        :param list signals_list:   the list of the signals
+        All columns are parsed in one pass using pandas' C parser, the type of each column is determined once
+        with the rules of the former row by row parsing: with `scan_auto` integer columns become int64 (float if a
+        value has a sign like -5 or +5), float columns float and all others are converted value by value as being
+        mixed or special (e.g. 1.#INF). Texts of integer and non-finite float columns are checked in a second pass.
+        Nothing is done if values are already read.
         """
-        if signals_list is None:
-            signals_list = self._signal_names
-
-        if isinstance(signals_list, StringTypes):
-            signals_list = [signals_list]
-
-        # prevent loading already loaded ones
-        removes = [sig for sig in signals_list if len(self._signal_values[self._signal_names.index(sig)]) > 0]
-        for rem in removes:
-            signals_list.remove(rem)
-
-        if len(signals_list) == 0:
+        if self._signal_values is not None:
             return
 
-        for signal in signals_list:
-            if signal not in self._signal_type:
-                if self._scan_opt == 'scan_raw':
-                    self._signal_type[self._signal_names.index(signal)] = max(self._all_types.values())
-                else:
-                    self._signal_type[self._signal_names.index(signal)] = 0
+        kwargs = dict(self._csv_kwargs, sep=self._delimiter, header=None, na_filter=False, engine='c',
+                      skiprows=self._skip_lines + 1 + self._skip_data_lines, usecols=list(range(len(self._signal_names))))
+        if self._scan_opt == 'scan_raw':
+            kwargs['dtype'] = str
+        else:
+            kwargs['float_precision'] = 'round_trip'
+            if self._scan_opt != 'scan_auto':
+                kwargs['dtype'] = self._scan_opt
 
-        self._fp.seek(0)
-        # if skip_lines constructor parameter is not specified
-        for _ in range(self._skip_lines + 1 + self._skip_data_lines):
-            if PY2:
-                self._csv.next()
+        try:
+            self._fp.seek(0)
+            data = read_csv(self._fp, **kwargs)
+        except EmptyDataError:
+            data = {}
+        except Exception as ex:
+            raise self._exc('file {}: {!s}'.format(self._file_path, ex))
+
+        values = {}
+        texts = []
+        for idx in range(len(self._signal_names)):
+            col = data[idx].values if idx in data else array([], dtype=int64)
+            if self._scan_opt == 'scan_raw':
+                values[idx] = array(col, dtype=str)
+            elif self._scan_opt != 'scan_auto':
+                values[idx] = col
+            elif col.dtype == int64 and (col < 0).any():
+                values[idx] = col.astype(float64)
+            elif col.dtype in (int64, float64):
+                values[idx] = col
+                if len(col) and (col.dtype == int64 or not isfinite(col).all()):
+                    texts.append(idx)
             else:
-                next(self._csv)
+                values[idx] = self._convert_auto(col)
+
+        # signs (+5, -0), trailing blanks and texts like nan or inf can't be told from the parsed values
+        if texts:
+            kwargs.update(usecols=texts, dtype=str)
+            kwargs.pop('float_precision')
+            self._fp.seek(0)
+            data = read_csv(self._fp, **kwargs)
+            for idx in texts:
+                col = data[idx].values
+                if values[idx].dtype != int64:
+                    values[idx] = self._convert_auto(col)
+                elif not char.isdigit(char.strip(col.astype(str))).all():
+                    values[idx] = values[idx].astype(float64)
+        self._signal_values = values
+
+    def _convert_auto(self, col):  # pragma: no cover
+        """
+        convert column values one by one to int64, float or str
 
-        if self._scan_opt == 'scan_raw':
-            try:
-                for row in self._csv:
-                    for signal in signals_list:
-                        try:
-                            idx = self._signal_names.index(signal)
-                            self._signal_values[idx].append(str(row[idx]))
-                        except IndexError:
-                            pass
-                    # del row
-            except Error as ex:
-                raise self._exc('file %s, line %d: %s' % (self._file_path, self._csv.line_num, ex))
-
-        elif self._scan_opt == 'scan_auto':  # pylint: disable=R1702
-            try:
-                for _, row in enumerate(self._csv):
-                    for signal in signals_list:
-                        idx = self._signal_names.index(signal)
-                        try:
-                            data = str(row[idx])
-                            if match(r"^(\d+)$", data.strip()) is not None:
-                                val = int64(row[idx])
-                            elif match(r"[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*\Z", data.strip()) is not None:
-                                val = float(row[idx])
-                            else:
-                                val = data
-
-                            if isinstance(val, StringTypes):
-                                if match(r"[+]?1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
-                                    val = inf
-                                elif match(r"-1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
-                                    val = -inf
-                            self._signal_values[idx].append(val)
-                            self._signal_type[idx] = max(self._all_types[type(val)], self._signal_type[idx])
-                        except Exception as _:
-                            self._signal_type[idx] = type(float)
-                    # del row
-            except Error as ex:
-                raise self._exc('file %s, line %d: %s' % (self._file_path, self._csv.line_num, ex))
-        else:
-            try:
-                for row in self._csv:
-                    for signal in signals_list:
-                        idx = self._signal_names.index(signal)
-                        self._signal_values[idx].append(self._scan_opt(row[idx]))
-                for signal in signals_list:
-                    idx = self._signal_names.index(signal)
-                    self._signal_type[idx] = self._all_types[type(self._scan_opt(self._signal_values[idx][0]))]
-            except Error as ex:
-                raise self._exc('file %s, line %d: %s' % (self._file_path, self._csv.line_num, ex))
+        :param numpy.array col: column values
+        :return: values converted to the widest type needed
+        :rtype: numpy.array
+        """
+        vals, styp = [], 0
+        for data in col:
+            data = str(data)
+            if match(r"^(\d+)$", data.strip()) is not None:
+                val = int64(data)
+            elif match(r"[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*\Z", data.strip()) is not None:
+                val = float(data)
+            elif match(r"[+]?1(\.)[#][Ii][Nn]", data.lstrip()) is not None:
+                val = inf
+            elif match(r"-1(\.)[#][Ii][Nn]", data.lstrip()) is not None:
+                val = -inf
+            else:
+                val = data
+            vals.append(val)
+            styp = max(self._all_types[type(val)], styp)
+
+        return array(vals, dtype=[tt for tt, it in list(self._all_types.items()) if it == styp][0])
 
 
 class BsigReader(object):  # pylint: disable=R0902
@@ -290,8 +291,9 @@ class BsigReader(object):  # pylint: disable=R0902
         :param str fp: file to use, can be a file pointer to an already open file or a name of file
         :param dict kwargs: see *SignalReader* class doc
         """
-        self._arr_frmt = {0x0008: 'B', 0x8008: 'b', 0x0010: 'H', 0x8010: 'h', 0x0020: 'L', 0x8020: 'l', 0x0040: 'Q',
-                          0x8040: 'q', 0x9010: 'f', 0x9020: 'd'}
+        # fixed size, little endian types to decode data blocks as numpy buffer views
+        self._arr_frmt = {0x0008: '<u1', 0x8008: '<i1', 0x0010: '<u2', 0x8010: '<i2', 0x0020: '<u4', 0x8020: '<i4',
+                          0x0040: '<u8', 0x8040: '<i8', 0x9010: '<f4', 0x9020: '<f8'}
         self._sig_frmt = {'c': 1, 'b': 1, 'B': 1, 'h': 2, 'H': 2, 'I': 4, 'l': 4, 'L': 4, 'q': 8, 'Q': 8,
                           'f': 4, 'd': 8}
         file_header = 24
@@ -433,11 +435,10 @@ class BsigReader(object):  # pylint: disable=R0902
         else:
             count += offset
 
-        frmt = self._arr_frmt[sigdet[SIG_TYPE]]  # data format
-        dlen = self._sig_frmt[frmt]  # length of one data point
+        frmt = dtype(self._arr_frmt[sigdet[SIG_TYPE]])  # data format
+        dlen = frmt.itemsize  # length of one data point
         blkl = self._block_size // dlen  # real block length
         alen = sigdet[SIG_ARRAYLEN]  # array length of signal
-        sig = []  # extracted signal
 
         # increment with array length
         offset *= alen
@@ -456,7 +457,9 @@ class BsigReader(object):  # pylint: disable=R0902
         # without compression we could even cut down more reading,
         # but I'll leave it for now as it makes more if then else
 
-        # read data blocks
+        # read data blocks directly into preallocated signal array
+        sig = empty(len(sigoffs) * blkl, dtype=frmt)  # extracted signal
+        pos = 0
         for offs in sigoffs:
             self._fp.seek(offs)
             if self._compression:
@@ -465,17 +468,15 @@ class BsigReader(object):  # pylint: disable=R0902
             else:
                 data = self._fp.read(self._block_size)
 
-            data = unpack(frmt * (len(data) // dlen), data)
-            sig.extend(data)
+            data = frombuffer(data, dtype=frmt, count=len(data) // dlen)
+            sig[pos:pos + data.size] = data
+            pos += data.size
 
-        if self._npusage:
-            if alen == 1:
-                return array(sig[offset:count], dtype=frmt)
-            return array(sig[offset:count], dtype=frmt).reshape(((count - offset) // alen, alen))
+        sig = sig[:pos][offset:count]
+        if alen > 1:
+            sig = sig.reshape((sig.size // alen, alen))
 
-        if alen == 1:
-            return sig[offset:count]
-        return [sig[i:i + alen] for i in range(offset, count, alen)]
+        return sig if self._npusage else sig.tolist()
 
     @property
     def signal_names(self):
@@ -20,6 +20,8 @@ from csv import Error, reader
 from logging import debug, warning
 from re import match
 import numpy as np
+from pandas import read_csv
+from pandas.errors import EmptyDataError
 
 from stk.util.helper import deprecation
 
@@ -290,7 +292,7 @@ class Reader(object):
                 if self.__scan_opt == 'scan_raw':
                     self.__read_signals_raw(csv_reader)
                 elif self.__scan_opt == 'scan_auto':
-                    self.__read_signals_auto(csv_reader)
+                    self.__read_signals_auto()
                 else:
                     self.__read_signals_forced_type(csv_reader, self.__desired_type)
             else:
@@ -333,49 +335,55 @@ class Reader(object):
         # print timer.GetDuration()
         return self.__sigValDict
 
-    def __read_signals_auto(self, csv_obj):
+    def __read_signals_auto(self):
+        """
+        Reads values of all requested signals column by column:
+        the file is split up in one pass by pandas' C parser, each column is converted to the type of its first value,
+        only columns with mixed or special values (e.g. 1.#INF) are converted value by value.
+        """
         try:
-            # go through signal value list
-            signal_type_retrived = False
-            signal_flag = False
-#            i = 0
-            for row in csv_obj:
-                for signal in self.__signal_names:
-                    if not signal_type_retrived:
-                        try:
-                            self.__sigTypDict[signal] = self.__getSigValType(row[self.__sigIdxDict[signal]])
-                            signal_flag = True
-                        except IndexError:
-                            signal_flag = False
-                            self.__sigTypDict[signal] = type(float)
-                    try:
-                        self.__sigValDict[signal].append(self.__sigTypDict[signal](row[self.__sigIdxDict[signal]]))
-                    except IndexError:
-                        signal_flag = False
-                        self.__sigValDict[signal].append(None)
-                    except ValueError:
-                        if len(row[self.__sigIdxDict[signal]]) != 0:
-                            if self.__match_special_value(row[self.__sigIdxDict[signal]]) is not None:
-                                (self.__sigValDict[signal].append(self.__sigTypDict[signal]
-                                 (self.__match_special_value(row[self.__sigIdxDict[signal]]))))
-                            else:
-                                # the type of the signal must have been determined wrong
-                                # at the first pass through the row
-                                self.__sigTypDict[signal] = self.__getSigValType(row[self.__sigIdxDict[signal]])
-                                (self.__sigValDict[signal].append(self.__sigTypDict[signal]
-                                 (row[self.__sigIdxDict[signal]])))
-                        else:
-                            self.__sigValDict[signal].append(None)
-                signal_type_retrived = signal_flag
-        except Error, e:
-            print 'file %s, line %d: %s' % (self.__file_path, csv_obj.line_num, e)
-#             del csv_reader
-#             csv_file.close()
+            data = read_csv(self.__file_path, sep=self.__delimiter, header=None, dtype=str, na_filter=False,
+                            skiprows=self.__skip_lines + 1 + self.__skip_data_lines, engine='c',
+                            usecols=sorted(set(self.__sigIdxDict.values())))
+        except EmptyDataError:
+            return self.__sigValDict
+        except Exception, e:
+            print 'file %s: %s' % (self.__file_path, e)
             self.__sigValDict = {}
             return None
 
+        for signal in self.__sigIdxDict:
+            column = data[self.__sigIdxDict[signal]].tolist()
+            if len(column) == 0:
+                continue
+            self.__sigTypDict[signal] = self.__getSigValType(column[0]) if isinstance(column[0], str) else float
+            try:
+                self.__sigValDict[signal] = map(self.__sigTypDict[signal], column)
+            except (TypeError, ValueError):
+                self.__sigValDict[signal] = [self.__convert_value(signal, value) for value in column]
+
         return self.__sigValDict
 
+    def __convert_value(self, signal, value):
+        """
+        Converts a single value to the type of the signal, taking care of missing and special values,
+        the type of the signal is adapted if it must have been determined wrong at the first value
+
+        :param signal: name of the signal
+        :param value:  the value as read from file, not being a string if it is missing in the row
+        """
+        if not isinstance(value, str):
+            return None
+        try:
+            return self.__sigTypDict[signal](value)
+        except ValueError:
+            if len(value) == 0:
+                return None
+            if self.__match_special_value(value) is not None:
+                return self.__sigTypDict[signal](self.__match_special_value(value))
+            self.__sigTypDict[signal] = self.__getSigValType(value)
+            return self.__sigTypDict[signal](value)
+
     def __read_signals_forced_type(self, csv_obj, desired_type):
         try:
             for row in csv_obj:
@@ -20,11 +20,13 @@ Binary Signal Read Class
 __all__ = ['SignalReader', 'SignalReaderException']
 
 # - import Python modules ----------------------------------------------------------------------------------------------
-from numpy import inf, array
+from numpy import inf, array, empty, frombuffer, dtype, int64, float64, isfinite, char
+from pandas import read_csv
+from pandas.errors import EmptyDataError
 from os import path as opath, SEEK_END, SEEK_CUR
 from struct import unpack
 from zlib import decompress
-from csv import Error, reader
+from csv import reader
 from re import match, escape, IGNORECASE
 
 # - import STK modules ------------------------------------------------------------------------------------------------
@@ -53,7 +55,8 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
     """
     **Delimited reader class**
 
-    internal class used by SignalReader in case of reading csv type files
+    internal class used by SignalReader in case of reading csv type files,
+    all columns are parsed in one pass by pandas' C parser on first request and kept in memory
 
     use class `SignalReader` to read csv files
     """
@@ -61,8 +64,8 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
         """open / init cvs file
         """
         self._signal_names = []
-        self._signal_values = {}
-        self._signal_type = {}
+        self._signal_idx = {}
+        self._signal_values = None
 
         self._all_types = {long: 0, float: 1, str: 2}
 
@@ -110,7 +113,7 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
                 self._signal_names.remove('')
             for idx in xrange(len(self._signal_names)):
                 self._signal_names[idx] = self._signal_names[idx].strip()
-                self._signal_values[idx] = []
+                self._signal_idx.setdefault(self._signal_names[idx], idx)
 
             if self._scan_type == 'prefetch':
                 self._read_signals_values()
@@ -127,6 +130,7 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
             self._fp = None
 
             self._signal_names = None
+            self._signal_idx = None
             self._signal_values = None
 
     def __len__(self):
@@ -147,8 +151,7 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
         :return: length of signal in file
         :rtype:  int
         """
-        if len(self._signal_values[0]) == 0:
-            self._read_signals_values(self._signal_names[0])
+        self._read_signals_values()
         return len(self._signal_values[0])
 
     @property
@@ -173,105 +176,99 @@ class CsvReader(object):  # pylint: disable=R0924,R0902
         if type(signal) in (tuple, list):
             return [self.signal(s) for s in signal]
 
-        self._read_signals_values(self._signal_names[signal] if type(signal) == int else signal)
+        self._read_signals_values()
 
         if type(signal) == str:
-            signal = self._signal_names.index(signal)
+            signal = self._signal_idx[signal]
 
-        # todo: maybe we should convert already when reading...
-        try:
-            vals = array(self._signal_values[signal], dtype=[tt for tt, it in self._all_types.items()
-                                                             if it == self._signal_type[signal]][0])
-        except KeyError:
-            vals = array(self._signal_values[signal], dtype=float)
+        # copy as caller might change values, columns are kept for the lifetime of the reader
+        vals = self._signal_values[signal].copy()
 
         if offset + count == 0:
             return vals
         else:
             return vals[offset:offset + count]
 
-    def _read_signals_values(self, signals_list=None):  # pylint: disable=R0912,R0915
+    def _read_signals_values(self):
         """
         Reads signal values from a simulation file - csv format.
-        This function reads a list of signal given as input.
-        When signals_list is 'None' all signal will be read
-
-        :param signals_list:   the list of the signals
-        :return: dictionary with extracted signals, empty {} in case of errors
+        All columns are parsed in one pass using pandas' C parser, the type of each column is determined once
+        with the rules of the former row by row parsing: with 'scan_auto' integer columns become long (float if a
+        value has a sign like -5 or +5), float columns float and all others are converted value by value as being
+        mixed or special (e.g. 1.#INF). Texts of integer and non-finite float columns are checked in a second pass.
+        With 'scan_opt' set to 'long' or 'float' the values are of that type.
+        Nothing is done if values are already read.
         """
-        if signals_list is None:
-            signals_list = self._signal_names
-
-        if type(signals_list) == str:
-            signals_list = [signals_list]
-
-        # prevent loading already loaded ones
-        removes = [sig for sig in signals_list if len(self._signal_values[self._signal_names.index(sig)]) > 0]
-        for rem in removes:
-            signals_list.remove(rem)
-
-        if len(signals_list) == 0:
+        if self._signal_values is not None:
             return
 
-        for signal in signals_list:
-            if signal not in self._signal_type:
-                if self._scan_opt == 'scan_raw':
-                    self._signal_type[self._signal_names.index(signal)] = 2
-                else:
-                    self._signal_type[self._signal_names.index(signal)] = 0
-
-        self._fp.seek(0)
-        # if skip_lines constructor parameter is not specified
-        for _ in xrange(self._skip_lines + 1 + self._skip_data_lines):
-            self._csv.next()
-
+        kwargs = {'sep': self._delimiter, 'header': None, 'skiprows': self._skip_lines + 1 + self._skip_data_lines,
+                  'usecols': range(len(self._signal_names)), 'na_filter': False, 'engine': 'c'}
         if self._scan_opt == 'scan_raw':
-            try:
-                for row in self._csv:
-                    for signal in signals_list:
-                        try:
-                            idx = self._signal_names.index(signal)
-                            self._signal_values[idx].append(str(row[idx]))
-                        except IndexError:
-                            pass
-                    # del row
-            except Error as ex:
-                raise SignalReaderException('file %s, line %d: %s' % (self._file_path, self._csv.line_num, ex))
-
+            kwargs['dtype'] = str
         elif self._scan_opt == 'scan_auto':
-            try:
-                for row in self._csv:
-                    for signal in signals_list:
-                        idx = self._signal_names.index(signal)
-                        try:
-                            if match(r"^(\d+)$", row[idx].lstrip()) is not None:
-                                val = long(row[idx])
-                            elif(match(r"[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*\Z",
-                                       row[idx].lstrip()) is not None):
-                                val = float(row[idx])
-                            else:
-                                val = str(row[idx])
-
-                            if type(val) == str:
-                                if match(r"[+]?1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
-                                    val = inf
-                                elif match(r"-1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
-                                    val = -inf
-                            self._signal_values[idx].append(val)
-                            self._signal_type[idx] = max(self._all_types[type(val)], self._signal_type[idx])
-                        except:
-                            self._signal_type[idx] = type(float)
-                    # del row
-            except Error as ex:
-                raise SignalReaderException('file %s, line %d: %s' % (self._file_path, self._csv.line_num, ex))
+            kwargs['float_precision'] = 'round_trip'
         else:
-            try:
-                for row in self._csv:
-                    for signal in signals_list:
-                        idx = self._signal_names.index(signal)
-                        self._signal_values[idx].append(self._scan_opt(row[idx]))
-            except Error as ex:
-                raise SignalReaderException('file %s, line %d: %s' % (self._file_path, self._csv.line_num, ex))
+            kwargs['dtype'] = {long: int64, float: float64}.get(self._scan_opt, self._scan_opt)
+            kwargs['float_precision'] = 'round_trip'
+
+        try:
+            self._fp.seek(0)
+            data = read_csv(self._fp, **kwargs)
+        except EmptyDataError:
+            data = {}
+        except Exception as ex:
+            raise SignalReaderException('file %s: %s' % (self._file_path, ex))
+
+        values = {}
+        texts = []
+        for idx in xrange(len(self._signal_names)):
+            col = data[idx].values if idx in data else array([], dtype=int64)
+            if self._scan_opt == 'scan_raw':
+                values[idx] = array(col, dtype=str)
+            elif self._scan_opt != 'scan_auto':
+                values[idx] = col
+            elif col.dtype == int64 and (col < 0).any():
+                values[idx] = col.astype(float64)
+            elif col.dtype in (int64, float64):
+                values[idx] = col
+                if len(col) and (col.dtype == int64 or not isfinite(col).all()):
+                    texts.append(idx)
+            else:
+                values[idx] = self._convert_auto(col)
+
+        # signs (+5, -0), trailing blanks and texts like nan or inf can't be told from the parsed values
+        if texts:
+            kwargs.update(usecols=texts, dtype=str)
+            kwargs.pop('float_precision')
+            self._fp.seek(0)
+            data = read_csv(self._fp, **kwargs)
+            for idx in texts:
+                col = data[idx].values
+                if values[idx].dtype != int64:
+                    values[idx] = self._convert_auto(col)
+                elif not char.isdigit(char.lstrip(col.astype(str))).all():
+                    values[idx] = values[idx].astype(float64)
+        self._signal_values = values
+
+    def _convert_auto(self, col):
+        """convert column values one by one to long, float or str and return an array of the widest type
+        """
+        vals, styp = [], 0
+        for val in col:
+            val = str(val)
+            if match(r"^(\d+)$", val.lstrip()) is not None:
+                val = long(val)
+            elif match(r"[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*\Z", val.lstrip()) is not None:
+                val = float(val)
+            elif match(r"[+]?1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
+                val = inf
+            elif match(r"-1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
+                val = -inf
+            vals.append(val)
+            styp = max(self._all_types[type(val)], styp)
+
+        return array(vals, dtype=[tt for tt, it in self._all_types.items() if it == styp][0])
 
 
 class BsigReader(object):  # pylint: disable=R0902,R0924
@@ -287,8 +284,9 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
         :param fp: file to use, can be a file pointer to an already open file or a name of file
         :keyword use_numpy: use numpy for signal values, default: True
         """
-        self._arr_frmt = {0x0008: 'B', 0x8008: 'b', 0x0010: 'H', 0x8010: 'h', 0x0020: 'L', 0x8020: 'l', 0x0040: 'Q',
-                          0x8040: 'q', 0x9010: 'f', 0x9020: 'd'}
+        # fixed size, little endian types to decode data blocks as numpy buffer views
+        self._arr_frmt = {0x0008: '<u1', 0x8008: '<i1', 0x0010: '<u2', 0x8010: '<i2', 0x0020: '<u4', 0x8020: '<i4',
+                          0x0040: '<u8', 0x8040: '<i8', 0x9010: '<f4', 0x9020: '<f8'}
         self._sig_frmt = {'c': 1, 'b': 1, 'B': 1, 'h': 2, 'H': 2, 'I': 4, 'l': 4, 'L': 4, 'q': 8, 'Q': 8,
                           'f': 4, 'd': 8}
         file_header = 24
@@ -427,11 +425,10 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
         else:
             count += offset
 
-        frmt = self._arr_frmt[sigdet[SIG_TYPE]]  # data format
-        dlen = self._sig_frmt[frmt]  # length of one data point
+        frmt = dtype(self._arr_frmt[sigdet[SIG_TYPE]])  # data format
+        dlen = frmt.itemsize  # length of one data point
         blkl = self._block_size / dlen  # real block length
         alen = sigdet[SIG_ARRAYLEN]  # array length of signal
-        sig = []  # extracted signal
 
         # increment with array length
         offset *= alen
@@ -450,7 +447,9 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
         # without compression we could even cut down more reading,
         # but I'll leave it for now as it makes more if then else
 
-        # read data blocks
+        # read data blocks directly into preallocated signal array
+        sig = empty(len(sigoffs) * blkl, dtype=frmt)  # extracted signal
+        pos = 0
         for offs in sigoffs:
             self._fp.seek(offs)
             if self._compression:
@@ -459,19 +458,15 @@ class BsigReader(object):  # pylint: disable=R0902,R0924
             else:
                 data = self._fp.read(self._block_size)
 
-            data = unpack(frmt * (len(data) / dlen), data)
-            sig.extend(data)
+            data = frombuffer(data, dtype=frmt, count=len(data) / dlen)
+            sig[pos:pos + data.size] = data
+            pos += data.size
 
-        if self._npusage:
-            if alen == 0:
-                return array(sig[offset:count], dtype=frmt)
-            elif alen == 1:
-                return array(sig[offset:count], dtype=frmt)
-            return array(sig[offset:count], dtype=frmt).reshape(((count - offset) / alen, alen))
-        else:
-            if alen == 1:
-                return sig[offset:count]
-            return [sig[i:i + alen] for i in xrange(offset, count, alen)]
+        sig = sig[:pos][offset:count]
+        if alen > 1:
+            sig = sig.reshape((sig.size / alen, alen))
+
+        return sig if self._npusage else sig.tolist()
 
     @property
     def signal_names(self):
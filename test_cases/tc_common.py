@@ -10,9 +10,13 @@ from __future__ import print_function
 import datetime
 import logging
 import os
+import re
 import string
 
-from framework.img.viz import PlotFactory
+import numpy as np
+
+from framework.img.viz import AlgoSignal, PlotFactory
+from framework.io.alignment import dedup_indices, LAST
 from framework.val.results import ValAssessment, ValAssessmentWorkFlows
 
 
@@ -23,6 +27,18 @@ __version__ = "$Revision: 1.2 $"
 __maintainer__ = "$Author: Leidenberger, Ralf (uidq7596) $"
 __date__ = "$Date: 2020/03/31 08:42:58CEST $"
 
+MTS_PACKAGE_TIME_STAMP = "MTS.Package.TimeStamp"
+DEVICE_PREFIX = "device_prefix"
+SIL_PREFIX = "sil_prefix"
+SIGNAL_BASE_PATH = "signal_base_path"
+INDEX_SIGNAL_PATH = "index_signal_path"
+SIGNAL_LIST = "signal_list"
+SIGNAL_LIST_SIZE = "signal_list_size"
+SIGNAL_LIST_OFFSET = "signal_list_offset"
+SIGNAL = "signal"
+# index placeholder of signal lists, e.g. "ObjList[{0:}].fDistX"
+INDEX_PLACEHOLDER = re.compile(r"\{0?(?::[^}]*)?\}")
+
 
 def iso_datetime_str(date_time=datetime.datetime.now()):
     """ Returns the given datetime in iso format
@@ -32,8 +48,29 @@ def iso_datetime_str(date_time=datetime.datetime.now()):
     return date_time.strftime("%Y-%m-%d %H:%M:%S")
 
 
+def shrink_signal(signal, keep=LAST):
+    """ Shrink the signal in the case, that there are multiply identical timestamps.
+    :param signal: AlgoSignal
+    :param keep: value to keep of identical timestamps, LAST or FIRST
+    :return: signal itself if all timestamps are unique, signal of the sorted unique timestamps otherwise
+    """
+    index = signal.series.index.values
+    timestamps = np.unique(index)
+    if len(timestamps) == len(index):
+        return signal
+
+    # noinspection PyProtectedMember
+    return AlgoSignal(signal._name, signal.series.values[dedup_indices(index, keep)], timestamps, signal._unit)
+
+
 class BaseTest(object):
     """ Base class for all ECU-SIL test cases. """
+    # Recording-parallel mode of the ProcessManager: test cases supporting it
+    # name their attributes collected over all recordings (lists, extended in
+    # order of the recordings) and those only keeping the last recording's result.
+    PARALLEL_RECORDINGS = False
+    EXTENDED_RESULTS = ()
+    LAST_RESULTS = ()
     def __init__(self, data_manager, testcase, config):
         """ Initializes the object.
             :param data_manager: ValF data manager facility
@@ -99,6 +136,76 @@ class BaseTest(object):
                                    issue)
         return assessment
 
+    def result_marks(self):
+        """ Returns the current sizes of the EXTENDED_RESULTS, to get the
+            results of following recordings only.
+            :return: dict of attribute name and size
+        """
+        return dict((name, len(getattr(self, name)))
+                    for name in self.EXTENDED_RESULTS)
+
+    def get_recording_results(self, marks=None):
+        """ Returns the results of the processed recordings for the
+            recording-parallel mode.
+            :param marks: Sizes as returned by result_marks, to return the
+                          results added since then only
+            :return: dict of the attributes named in EXTENDED_RESULTS and
+                     LAST_RESULTS
+        """
+        marks = marks or {}
+        results = dict((name, getattr(self, name)[marks.get(name, 0):])
+                       for name in self.EXTENDED_RESULTS)
+        results.update((name, getattr(self, name)) for name in self.LAST_RESULTS)
+        return results
+
+    def merge_recording_results(self, results):
+        """ Adds the results of a worker process of the recording-parallel
+            mode, called in order of the recordings.
+            :param results: Results as returned by get_recording_results
+        """
+        for name in self.EXTENDED_RESULTS:
+            getattr(self, name).extend(results[name])
+        for name in self.LAST_RESULTS:
+            setattr(self, name, results[name])
+
+    def signal_manifest(self):
+        """ Returns the signals this test reads from the ECU and SIL signal
+            files, derived from the configuration (prefixes, index signal,
+            signal list and list size).
+            Signal lists with unknown size are given as regular expression
+            matching all indices, e.g. for "SIM VFB.ObjList[{0:}].fDistX".
+            :return: dict with "ecu" and "sil" entries, each a dict of
+                     "required" (index signals), "signals" (names) and
+                     "patterns" (regular expressions) lists
+        """
+        manifest = {}
+        for side, prefix_key in (("ecu", DEVICE_PREFIX), ("sil", SIL_PREFIX)):
+            prefix = self._config.get(prefix_key, "")
+            if INDEX_SIGNAL_PATH in self._config:
+                required = [prefix + self._config[INDEX_SIGNAL_PATH]]
+            else:
+                required = [MTS_PACKAGE_TIME_STAMP]
+
+            signals = []
+            patterns = []
+            base = prefix + self._config.get(SIGNAL_BASE_PATH, "")
+            for entry in self._config.get(SIGNAL_LIST, []):
+                name = base + entry[SIGNAL]
+                if not INDEX_PLACEHOLDER.search(name):
+                    signals.append(name)
+                elif SIGNAL_LIST_SIZE in self._config:
+                    offset = int(self._config.get(SIGNAL_LIST_OFFSET, 0))
+                    signals.extend(name.format(k) for k in
+                                   range(offset, offset + self._config[SIGNAL_LIST_SIZE]))
+                else:
+                    patterns.append("^" + r"\d+".join(re.escape(part) for part in
+                                                       INDEX_PLACEHOLDER.split(name)) + "$")
+
+            manifest[side] = {"required": required, "signals": signals,
+                              "patterns": patterns}
+
+        return manifest
+
     def execute(self, story):
         """ Abstract method. Needs to be implemented by subclasses. """
         raise(NotImplementedError())
@@ -25,7 +25,7 @@ from framework.util.gbl_defs import GblUnits
 from framework.img.viz import AlgoSignal
 from framework.io.signalreader import SignalReaderException
 from framework.val.results import ValTestStep, ValAssessmentStates
-from tc_common import BaseTest
+from tc_common import BaseTest, shrink_signal
 
 
 __author__ = "Leidenberger, Ralf"
@@ -519,23 +519,7 @@ class FctComparisonTests(BaseTest):
         :param signal:
         :return:
         """
-        timestamp_1 = sorted(set(signal.series.index))
-
-        if len(timestamp_1) == len(signal):
-            return signal
-        else:
-            timestamp_2 = np.diff(np.array(signal.series.index))
-            timestamp_3 = np.where(timestamp_2 != 0)
-            values_1 = [signal.series.values[0:timestamp_3[0][0]+1]]
-            for ij in range(len(timestamp_3[0])-1):
-                values_1.append(signal.series.values[timestamp_3[0][ij]+1: timestamp_3[0][ij+1]+1])
-            values_1.append(signal.series.values[timestamp_3[0][-1]+1:])
-            values_2 = []
-            for ij in range(len(values_1)):
-                values_2.append(values_1[ij][-1])
-
-            # noinspection PyProtectedMember
-            return AlgoSignal(signal._name, values_2, timestamp_1, signal._unit)
+        return shrink_signal(signal)
 
     def _compare_signal_list(self, ecu_signal, sil_signal, story, entry, m, k=None):
         ecu_raising_edges, ecu_falling_edges = self._find_edges(ecu_signal)
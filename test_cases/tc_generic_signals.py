@@ -15,9 +15,10 @@ import pandas as pd
 
 from framework.util.gbl_defs import GblUnits
 from framework.img.viz import AlgoSignal
+from framework.io.alignment import alignment, dedup_indices, unwrap, FIRST
 from framework.io.signalreader import SignalReaderException
 from framework.val.results import ValTestStep, ValAssessmentStates
-from tc_common import BaseTest
+from tc_common import BaseTest, shrink_signal
 
 DEBUG = 0
 LIST_LIMIT_VALUE = 200
@@ -40,6 +41,8 @@ INDEX_SIGNAL_PATH = "index_signal_path"
 SIGNAL_INDEX = "signal_index"
 DEFAULT = "default"
 EXP_RES = "exp_res"
+# compare the indexed signals of a signal list together as matrix (index x time)
+SIGNAL_LIST_MATRIX = "signal_list_matrix"
 # SPEED = "speed_signal"
 
 __author__ = "Leidenberger, Ralf"
@@ -50,6 +53,10 @@ __date__ = "$Date: 2020/03/25 20:56:44CET $"
 
 
 class GenericSignalComparison(BaseTest):
+    PARALLEL_RECORDINGS = True
+    EXTENDED_RESULTS = ("test_events", "test_passed_events")
+    LAST_RESULTS = ("measured_results",)
+
     def __init__(self, data_manager, testcase, config):
         super(GenericSignalComparison, self).__init__(data_manager, testcase,
                                                       config)
@@ -73,48 +80,7 @@ class GenericSignalComparison(BaseTest):
         self.ecu_index = None
         self.ecu_list_limit = None
         self.ecu_offset = None
-
-    def _reindex(self, ecu, sil):
-        """ Method to resample sil data to the ecu timestamp if available. """
-        # make a series containing itself
-        ecu_series = pd.Series(ecu, index=ecu)
-        sil_series = pd.Series(sil, index=sil)
-        missing_ts = ecu_series - sil_series
-        # print("ecu_series,sil_series,missing_ts",ecu_series,sil_series,missing_ts)
-        if True in pd.isnull(missing_ts).values:
-            self._logger.warning("Some timestamps do not exists in SIL.")
-
-            # Look in the subtraction of ecu and sil for the timestamps
-            # which belong to sil and are NaN because there was no equal
-            # index in the ecu series
-            # noinspection PyBroadException
-            try:
-                # Terrible hack: In some rare cases, with stuck indexes
-                # this operation fails, to prevent test abortion we return
-                # the original index
-                mm = missing_ts[sil_series]
-            except Exception:
-                self._logger.warning("Index error, returning raw signal")
-                return sil
-
-            # Work through the timestamps (worse case all) and try to find
-            # a nearest right neighbor
-            idx = None
-            for idx in mm.index:
-                if pd.isnull(mm[idx]):
-                    loc = missing_ts.index.get_loc(idx)
-
-                    if len(missing_ts) > loc + 1:
-                        val = missing_ts.index.values[loc + 1]
-                        if val in ecu_series.index:
-                            mm[idx] = val
-                else:
-                    mm[idx] = idx
-
-            mm[mm.index.values[-1]] = idx
-
-            return mm.values
-        return sil
+        self._prefetched = {}
 
     def post_initialize(self):
         # Add teststeps here instead in execute
@@ -172,11 +138,13 @@ class GenericSignalComparison(BaseTest):
             sil_index_name = (self._config[SIL_PREFIX] + self._config[INDEX_SIGNAL_PATH])
             sil_index0 = np.fromiter(self._sil_bsig_reader[sil_index_name], np.int64)
         else:
-            data = self._ecu_bsig_reader[MTS_PACKAGE_TIME_STAMP]
-            ecu_index0 = np.fromiter(data, np.long)
-            data = self._sil_bsig_reader[MTS_PACKAGE_TIME_STAMP]
-            self.sil_orig_index = np.fromiter(data, np.long)
-            sil_index0 = self._reindex(ecu_index0, self.sil_orig_index)
+            # aligned once per recording, shared with the other test cases
+            sync = alignment(self._ecu_bsig_reader, self._sil_bsig_reader, MTS_PACKAGE_TIME_STAMP)
+            ecu_index0 = sync.ref.copy()
+            self.sil_orig_index = sync.target
+            if not sync.complete:
+                self._logger.warning("Some timestamps do not exists in SIL.")
+            sil_index0 = sync.reindexed.copy()
             ecu_index_name = ""
             sil_index_name = ""
 
@@ -210,9 +178,8 @@ class GenericSignalComparison(BaseTest):
                                     "<font size='8'> The reason should be analysed.</font>")
                 story.add_paragraph("<font size='8'>**) SIL signal is considered as reference.</font>")
 
-        for ii in ecu_index_jump[0]:
-            # add the jump value to other timestamps from the jump point
-            ecu_index0[(ii + 1):] = ecu_index0[(ii + 1):] + ecu_index0[ii]
+        # add the jump value to other timestamps from the jump point
+        ecu_index0 = unwrap(ecu_index0)
         #for iii in sil_index_jump[0]:
             #sil_index0[(iii + 1):] = sil_index0[(iii + 1):] + sil_index0[iii]
         self.ecu_index = ecu_index0
@@ -286,9 +253,17 @@ class GenericSignalComparison(BaseTest):
                     offset = int(self._config[SIGNAL_LIST_OFFSET])
                 else:
                     offset = 0
-                for k in range(self._config[SIGNAL_LIST_SIZE]):
-                    executed = self._compare_signal_list(story=story, entry=entry, k=k + offset,
-                                                         only_rel_obj=only_rel_obj, list_limit=list_limit)
+                ks = range(offset, self._config[SIGNAL_LIST_SIZE] + offset)
+                if not only_rel_obj:
+                    self._prefetch_signals(entry, ks)
+                if self._config.get(SIGNAL_LIST_MATRIX) and not only_rel_obj and not list_limit and \
+                        self._compare_signal_matrix(story, entry, ks):
+                    executed = True
+                else:
+                    for k in ks:
+                        executed = self._compare_signal_list(story=story, entry=entry, k=k,
+                                                             only_rel_obj=only_rel_obj, list_limit=list_limit)
+                self._prefetched = {}
             else:
                 # Single signals
                 executed = self._compare_signal_list(story=story, entry=entry,
@@ -347,31 +322,33 @@ class GenericSignalComparison(BaseTest):
         :param signal:
         :return:
         """
-        timestamp_1 = sorted(set(signal.series.index))
-
-        if len(timestamp_1) == len(signal):
+        # noinspection PyBroadException
+        try:
+            return shrink_signal(signal)
+        except:
             return signal
-        else:
-            timestamp_2 = np.diff(np.array(signal.series.index))
-            timestamp_3 = np.where(timestamp_2 != 0)
-            values_1 = [signal.series.values[0:timestamp_3[0][0] + 1]]
-            for ij in range(len(timestamp_3[0]) - 1):
-                values_1.append(signal.series.values[timestamp_3[0][ij] + 1: timestamp_3[0][ij + 1] + 1])
-            values_1.append(signal.series.values[timestamp_3[0][-1] + 1:])
-            values_2 = []
-            for ij in range(len(values_1)):
-                values_2.append(values_1[ij][-1])
-            # noinspection PyBroadException
+
+    def _prefetch_signals(self, entry, ks, sources=None):
+        """ Reads the indexed signals of a signal list entry in one sweep through each signal file,
+            _read_signal takes them (once) from here instead of reading them one by one.
+            :param sources: (reader, prefix) pairs to read from, default: ECU and SIL
+        """
+        self._prefetched = {}
+        if sources is None:
+            sources = ((self._ecu_bsig_reader, DEVICE_PREFIX), (self._sil_bsig_reader, SIL_PREFIX))
+        for reader, prefix in sources:
+            names = [self._get_signal_full_name(prefix, entry).format(k) for k in ks]
             try:
-                # noinspection PyProtectedMember
-                return AlgoSignal(signal._name, values_2, timestamp_1, signal._unit)
-            except:
-                return signal
+                self._prefetched[id(reader)] = reader.signals([n for n in names if n in reader])
+            except SignalReaderException:
+                continue
 
     def _read_signal(self, reader, signal, name, unit, index, index_offset=None, signal_index=None, entry=None,
                      source=None):
         try:
-            raw_data = reader[signal]
+            raw_data = self._prefetched.get(id(reader), {}).pop(signal, None)
+            if raw_data is None:
+                raw_data = reader[signal]
             if signal_index is not None:
                 raw_data = list(zip(*raw_data)[signal_index])
                 if hasattr(self, "ecu_rel_obj_id"):
@@ -418,9 +395,140 @@ class GenericSignalComparison(BaseTest):
         else:
             return AlgoSignal(name, raw_data, index, unit)
 
+    def _rel_obj_signal(self, reader, prefix, rel_obj_id, index, offset, entry, source):
+        """ Signal of the relevant object: at each sample the value of the object the relevant object id
+            points to, 0 where no object is relevant (id -1 or 255).
+            The segments of equal ids are found by run-length encoding, the signals of all relevant objects
+            are read in one sweep and stacked (object x time), the values are taken by one gather.
+            Samples an object signal doesn't cover (too short or empty) are NaN.
+            :return: None if the signal of a relevant object is not available
+        """
+        sig_index = index[offset:]
+        values = np.zeros(len(sig_index))
+        if rel_obj_id is not None and len(sig_index) and len(rel_obj_id):
+            ids = rel_obj_id.series.values[:len(sig_index)]
+            if ids.dtype == object:
+                ids = np.array([i[0] if hasattr(i, "__len__") and len(i) > 1 else i for i in ids])
+            # the last segment continues till the end of the signal
+            starts = dedup_indices(ids, FIRST)
+            ends = np.append(starts[1:], len(sig_index))
+            seg_ids = ids[starts]
+            relevant = ~np.in1d(seg_ids, (-1, 255))
+            objects = np.unique(seg_ids[relevant])
+
+            self._prefetch_signals(entry, objects, ((reader, prefix),))
+            stacked = np.full((len(objects), len(sig_index)), np.nan)
+            for row, obj in enumerate(objects):
+                signal = self._read_signal(reader, self._get_signal_full_name(prefix, entry).format(obj),
+                                           entry[NAME], entry[UNIT], index, index_offset=offset,
+                                           signal_index=entry.get(SIGNAL_INDEX), entry=entry, source=source)
+                if signal is None:
+                    self._prefetched = {}
+                    return None
+                obj_values = signal.values[:len(sig_index)]
+                stacked[row, :len(obj_values)] = obj_values
+            self._prefetched = {}
+
+            seg_rows = np.where(relevant, np.searchsorted(objects, seg_ids), -1)
+            obj_rows = np.repeat(seg_rows, ends - starts)
+            pos = np.flatnonzero(obj_rows >= 0)
+            values[pos] = stacked[obj_rows[pos], pos]
+
+        return AlgoSignal(entry[NAME], values, sig_index, entry[UNIT])
+
     def _get_signal_full_name(self, prefix, entry):
         return self._config[prefix] + self._config[SIGNAL_BASE_PATH] + entry[SIGNAL]
 
+    def _matrix_columns(self, index, offset):
+        """ Samples _read_signal keeps of a signal over index (multiple timestamps shrunk, index offset).
+            :return: positions of the kept samples and their timestamps
+        """
+        kept = self._shrink_signal(AlgoSignal("", np.arange(len(index)), index))
+        return kept.values[offset:], kept.index[offset:]
+
+    def _compare_signal_matrix(self, story, entry, ks):
+        """ Compares all indexed signals of a signal list entry at once: the prefetched signals of each bus
+            are stacked to a matrix (index x time), aligned and checked against the tolerance together.
+            Results, events and plots per index are the same as of _compare_signal_list.
+            :return: False if the entry needs the comparison signal by signal (structs, default or
+                     percentage tolerance, signals of different length), nothing is changed then
+        """
+        if SIGNAL_INDEX in entry or DEFAULT in entry or entry.get(PERCENTAGE, 0) != 0:
+            return False
+        busses = []
+        for reader, prefix, index, offset in ((self._ecu_bsig_reader, DEVICE_PREFIX, self.ecu_index, self.ecu_offset),
+                                              (self._sil_bsig_reader, SIL_PREFIX, self.sil_index, self.sil_offset)):
+            if id(reader) not in self._prefetched:
+                return False
+            names = [self._get_signal_full_name(prefix, entry).format(k) for k in ks]
+            rows = [self._prefetched[id(reader)].get(name) for name in names]
+            rows = [None if row is None or len(row) == 0 else np.asarray(row) for row in rows]
+            if any(row is not None and (row.ndim != 1 or len(row) != len(index)) for row in rows):
+                return False
+            positions, sig_index = self._matrix_columns(index, offset)
+            present = [row is not None and len(positions) > 0 for row in rows]
+            if any(present):
+                matrix = np.vstack([row for row, avail in zip(rows, present) if avail])[:, positions]
+            else:
+                matrix = np.zeros((0, len(positions)))
+            busses.append((names, present, np.cumsum(present) - 1, matrix, sig_index))
+        self._prefetched = {}
+
+        (ecu_names, ecu_present, ecu_rows, ecu_matrix, ecu_index), \
+            (sil_names, sil_present, sil_rows, sil_matrix, sil_index) = busses
+        if ecu_index.equals(sil_index):
+            events = len(ecu_index)
+            diff = ecu_matrix[ecu_rows[np.array(ecu_present) & sil_present]] - \
+                sil_matrix[sil_rows[np.array(ecu_present) & sil_present]]
+        else:
+            # samples of both as the difference of the series, others are NaN (no deviation)
+            ecu_cols, sil_cols = pd.Series(np.arange(len(ecu_index), dtype=float), ecu_index).align(
+                pd.Series(np.arange(len(sil_index), dtype=float), sil_index))
+            events = len(ecu_cols)
+            common = ecu_cols.notnull().values & sil_cols.notnull().values
+            ecu_cols = ecu_cols.values[common].astype(np.int64)
+            sil_cols = sil_cols.values[common].astype(np.int64)
+            diff = ecu_matrix[ecu_rows[np.array(ecu_present) & sil_present]][:, ecu_cols].astype(np.float64) - \
+                sil_matrix[sil_rows[np.array(ecu_present) & sil_present]][:, sil_cols].astype(np.float64)
+        with np.errstate(invalid="ignore"):
+            deviancies = (diff < entry[TOLERANCE][0]).sum(axis=1) + (diff > entry[TOLERANCE][1]).sum(axis=1)
+
+        row = 0
+        for i, k in enumerate(ks):
+            if not ecu_present[i] or not sil_present[i]:
+                for names, present in ((ecu_names, ecu_present), (sil_names, sil_present)):
+                    if not present[i]:
+                        self._logger.warn("Signal %s is not present in .bsig file, skipping" % names[i])
+                self.results.append(-1)
+                self.events.append(-1)
+                self.passed_events.append(-1)
+                continue
+
+            error_percentage = (deviancies[row] / float(events)) * 100.0
+            self.events.append(events)
+            self.passed_events.append(events - deviancies[row])
+            self.results.append(error_percentage)
+
+            ecu_signal = AlgoSignal(entry[NAME], ecu_matrix[ecu_rows[i]], ecu_index, entry[UNIT])
+            sil_signal = AlgoSignal(entry[NAME], sil_matrix[sil_rows[i]], sil_index, entry[UNIT])
+            row += 1
+            fh = None
+            # noinspection PyBroadException
+            try:
+                fh = self.plot_factory.histogram_plot(ecu_signal, sil_signal, tolerance=entry[TOLERANCE])
+            except:
+                pass
+            if fh is not None:
+                signal_name = (entry[SIGNAL] + " [{0:}]").format(k)
+                caption = "ECU and SIL plots for {}".format(signal_name)
+                tolerance = entry[TOLERANCE]
+                if len(tolerance) == 2:
+                    if tolerance[0] == tolerance[1]:
+                        caption = "Bit exactness: ECU and SIL plots for {}".format(signal_name)
+                caption += " (pass rate: {0:3.2f} %)".format(100 - error_percentage)
+                story.add_image(caption, os.path.join(self.out_directory, fh))
+        return True
+
     def _compare_signal_list(self, story, entry, k=None, only_rel_obj=False, list_limit=False):
         self.messages = []
         fh = None
@@ -430,100 +538,15 @@ class GenericSignalComparison(BaseTest):
             if self.ecu_rel_obj_id is not None or self.sil_rel_obj_id is not None:
                 self._logger.info("Comparing the relevant object for '{0:}'".format(entry[NAME]))
 
-                ecu_signal = AlgoSignal(entry[NAME], len(self.ecu_index[self.ecu_offset:]) * [0.],
-                                        self.ecu_index[self.ecu_offset:], entry[UNIT])
-                sil_signal = AlgoSignal(entry[NAME], len(self.sil_index[self.sil_offset:]) * [0.],
-                                        self.sil_index[self.sil_offset:], entry[UNIT])
-
-                j = 0
-                while j < len(ecu_signal) and j < len(self.ecu_rel_obj_id):
-                    try:
-                        if len(self.ecu_rel_obj_id[j]) > 1:
-                            rel_ob_id = self.ecu_rel_obj_id[j][0]
-                        else:
-                            rel_ob_id = self.ecu_rel_obj_id[j]
-                    except:
-                        rel_ob_id = self.ecu_rel_obj_id[j]
-                    if rel_ob_id == -1 or rel_ob_id == 255:
-                        j += 1
-                        continue
-                    else:
-                        ecu_signal_name = self._get_signal_full_name(DEVICE_PREFIX, entry).format(rel_ob_id)
-
-                        if SIGNAL_INDEX in entry:
-                            ecu_signal_temp = self._read_signal(self._ecu_bsig_reader, ecu_signal_name, entry[NAME],
-                                                                entry[UNIT], self.ecu_index,
-                                                                signal_index=entry[SIGNAL_INDEX],
-                                                                index_offset=self.ecu_offset, entry=entry, source='ECU')
-                        else:
-                            ecu_signal_temp = self._read_signal(self._ecu_bsig_reader, ecu_signal_name, entry[NAME],
-                                                                entry[UNIT], self.ecu_index,
-                                                                index_offset=self.ecu_offset, entry=entry, source='ECU')
-
-                        jj = j + 1
-                        while True:
-                            try:
-                                if len(self.ecu_rel_obj_id[jj]) > 1:
-                                    rel_ob_id_jj = self.ecu_rel_obj_id[jj][0]
-                                else:
-                                    rel_ob_id_jj = self.ecu_rel_obj_id[jj]
-                            except:
-                                if jj < len(self.ecu_rel_obj_id):
-                                    rel_ob_id_jj = self.ecu_rel_obj_id[jj]
-                            if jj == len(ecu_signal):
-                                break
-                            elif rel_ob_id == rel_ob_id_jj:
-                                jj += 1
-                            else:
-                                break
-
-                        ecu_signal.values[j:jj] = ecu_signal_temp.values[j:jj]
-                        j = jj
-
-                j = 0
-                while j < len(sil_signal) and j < len(self.sil_rel_obj_id):
-                    try:
-                        if len(self.sil_rel_obj_id[j]) > 1:
-                            rel_ob_id = self.sil_rel_obj_id[j][0]
-                        else:
-                            rel_ob_id = self.sil_rel_obj_id[j]
-                    except:
-                        rel_ob_id = self.sil_rel_obj_id[j]
-                    if rel_ob_id == -1 or rel_ob_id == 255:
-                        j += 1
-                        continue
-                    else:
-                        sil_signal_name = self._get_signal_full_name(SIL_PREFIX, entry).format(rel_ob_id)
-
-                        if SIGNAL_INDEX in entry:
-                            sil_signal_temp = self._read_signal(self._sil_bsig_reader, sil_signal_name, entry[NAME],
-                                                                entry[UNIT], self.sil_index,
-                                                                signal_index=entry[SIGNAL_INDEX],
-                                                                index_offset=self.sil_offset, entry=entry, source='SIL')
-                        else:
-                            sil_signal_temp = self._read_signal(self._sil_bsig_reader, sil_signal_name, entry[NAME],
-                                                                entry[UNIT], self.sil_index,
-                                                                index_offset=self.sil_offset, entry=entry, source='SIL')
-
-                        jj = j + 1
-                        while True:
-                            try:
-                                if len(self.sil_rel_obj_id[jj]) > 1:
-                                    rel_ob_id_jj = self.sil_rel_obj_id[jj][0]
-                                else:
-                                    rel_ob_id_jj = self.sil_rel_obj_id[jj]
-                            except:
-                                if jj < len(self.sil_rel_obj_id):
-                                    rel_ob_id_jj = self.sil_rel_obj_id[jj]
-                            if jj == len(sil_signal):
-                                break
-                            elif rel_ob_id == rel_ob_id_jj:
-                                jj += 1
-                            else:
-                                break
-
-                        sil_signal.values[j:jj] = sil_signal_temp.values[j:jj]
-                        j = jj
+                ecu_signal = self._rel_obj_signal(self._ecu_bsig_reader, DEVICE_PREFIX, self.ecu_rel_obj_id,
+                                                  self.ecu_index, self.ecu_offset, entry, 'ECU')
+                sil_signal = self._rel_obj_signal(self._sil_bsig_reader, SIL_PREFIX, self.sil_rel_obj_id,
+                                                  self.sil_index, self.sil_offset, entry, 'SIL')
+                if ecu_signal is None or sil_signal is None:
+                    self.results.append(-1)
+                    self.events.append(-1)
+                    self.passed_events.append(-1)
+                    return True
 
                 diff = ecu_signal - sil_signal
 
@@ -537,8 +560,10 @@ class GenericSignalComparison(BaseTest):
                 fh = self.plot_factory.histogram_plot(ecu_signal, sil_signal,
                                                       tolerance=entry[TOLERANCE])
 
+                # samples not covered by the object signal (NaN) are deviations as well
                 deviancies = (len(diff[diff.values < entry[TOLERANCE][0]]) +
-                              len(diff[diff.values > entry[TOLERANCE][1]]))
+                              len(diff[diff.values > entry[TOLERANCE][1]]) +
+                              int(np.isnan(diff.values).sum()))
                 error_percentage = (deviancies / float(len(diff))) * 100.0
                 self.events.append(len(diff))
                 self.passed_events.append(len(diff) - deviancies)
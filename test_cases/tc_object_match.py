@@ -5,18 +5,20 @@ Module to compare arbitrary signals and assess their equality as a deviance in p
 """
 from __future__ import print_function
 
-import copy
 import os
 from time import *
 
 import numpy as np
-from matplotlib import pylab as plt
 
 from framework.util.gbl_defs import GblUnits
-from framework.img.viz import AlgoSignal
+from framework.util.helper import LazyModule
+from framework.img.viz import AlgoSignal, serialized
+from framework.io.alignment import sync_offsets
 from framework.val.results import ValTestStep, ValAssessmentStates
 from tc_common import BaseTest
 
+plt = LazyModule("matplotlib.pylab")
+
 DEBUG = 0
 TOLERANCE = "tolerance"
 UNIT = "unit"
@@ -204,7 +206,7 @@ class ObjectMatchTest(BaseTest):
             if sil_signal_name.find("[{0:}]") >= 0:
                 obj_list_size = 0
                 while obj_list_size >= 0:
-                    if sil_signal_name.format(obj_list_size) in self._sil_bsig_reader.signal_names:
+                    if sil_signal_name.format(obj_list_size) in self._sil_bsig_reader:
                         obj_list_size += 1
                     else:
                         break
@@ -225,7 +227,7 @@ class ObjectMatchTest(BaseTest):
             if ecu_signal_name.find("[{0:}]") >= 0:
                 obj_list_size = 0
                 while obj_list_size >= 0:
-                    if ecu_signal_name.format(obj_list_size) in self._ecu_bsig_reader.signal_names:
+                    if ecu_signal_name.format(obj_list_size) in self._ecu_bsig_reader:
                         obj_list_size += 1
                     else:
                         break
@@ -250,211 +252,62 @@ class ObjectMatchTest(BaseTest):
         # _len = np.min([len(self.ecu[DIS_X]), len(self.sil[DIS_X])])
         # self._sync_len =  np.min([len(self.ecu[DIS_X]), len(self.sil[DIS_X])])
 
-        # create & prepare index sets
-        ids_sil = set(range(0, len(self.sil[DIS_X]), 1))
+        # object data of the synchronized cycles as arrays (object x cycle)
+        ecu_objs, ecu_data_error = self._object_arrays(self.ecu, self._sync_offset_ecu, _len, True)
+        sil_objs, _ = self._object_arrays(self.sil, self._sync_offset_sil, _len, False)
+        dif_type = np.result_type(ecu_objs[DIS_X], sil_objs[DIS_X])
+        for key, dtype in ((DIF_POS_X, dif_type), (DIF_POS_Y, dif_type), (DIF_VEL_X, dif_type),
+                           (DIF_VEL_Y, dif_type), (M_DIS_X, sil_objs[DIS_X].dtype), (M_DIS_Y, sil_objs[DIS_Y].dtype),
+                           (M_VEL_X, sil_objs[VEL_X].dtype), (M_VEL_Y, sil_objs[VEL_Y].dtype)):
+            ecu_objs[key] = np.zeros(ecu_objs[DIS_X].shape, dtype)
+            sil_objs[key] = np.zeros(sil_objs[DIS_X].shape, dtype)
         ids_ecu = set(range(0, len(self.ecu[DIS_X]), 1))
-        ids_sil_list = []
-        ids_ecu_list = []
-        tmp_sil_id_set = set(range(0, len(self.sil[DIS_X]), 1))
-        tmp_ecu_id_set = set(range(0, len(self.ecu[DIS_X]), 1))
-
-        # create Data fields and template for the data fiels
-        sil_objs = []
-        ecu_objs = []
-        template = {EXIST: ([False] * _len), DIS_X: ([INVALID_DIST] * _len), DIS_Y: ([0.] * _len), VEL_X: ([0.] * _len),
-                    VEL_Y: ([0.] * _len), MATCH: ([-1] * _len), M_DIS_X: ([0.] * _len), M_DIS_Y: ([0.] * _len),
-                    M_VEL_X: ([0.] * _len), M_VEL_Y: ([0.] * _len), DIF_POS_X: ([0.] * _len), DIF_POS_Y: ([0.] * _len),
-                    DIF_VEL_X: ([0.] * _len), DIF_VEL_Y: ([0.] * _len), ID: ([0] * _len), DYN_PROP: ([-1] * _len)}
-        while len(sil_objs) < len(ids_sil):
-            sil_objs.append(copy.deepcopy(template))
-        while len(ecu_objs) < len(ids_ecu):
-            ecu_objs.append(copy.deepcopy(template))
-
-        # initialize the data fields
-        time_stamp = []
-        ecu_data_error = []
-        miss_match_list = []
-        for k in range(0, len(self.ecu[DIS_X]), 1):
-            ecu_data_error.append([])
-            miss_match_list.append([])
-        for i in range(0, self._sync_len, 1):
-            ids_sil_list.append(copy.deepcopy(tmp_sil_id_set))
-            ids_ecu_list.append(copy.deepcopy(tmp_ecu_id_set))
+        ids_sil = set(range(0, len(self.sil[DIS_X]), 1))
+        miss_match_list = [[] for _ in ids_sil]
 
-            i_sil_time = i + self._sync_offset_sil
-            i_ecu_time = i + self._sync_offset_ecu
-            if self.ecu[TIMESTAMP][0][i_ecu_time] == self.sil[TIMESTAMP][0][i_sil_time]:
-                time_stamp.append(self.ecu[TIMESTAMP][0][i_ecu_time])
-            else:
-                time_stamp.append(-1)
-            for k in range(0, len(self.sil[DIS_X]), 1):
-                if self._config['dynamic_properties'] != -1 and len(self.sil[DYN_PROP]) > 0:
-                    if (self._config['dynamic_properties'] == 0 and self.sil[DYN_PROP][k][i_sil_time] == 1) or\
-                       (self._config['dynamic_properties'] == 1 and self.sil[DYN_PROP][k][i_sil_time] != 1):
-                        sil_objs[k][DIS_X][i] = self.sil[DIS_X][k][i_sil_time]
-                        sil_objs[k][DIS_Y][i] = self.sil[DIS_Y][k][i_sil_time]
-                        sil_objs[k][VEL_X][i] = self.sil[VEL_X][k][i_sil_time]
-                        sil_objs[k][VEL_Y][i] = self.sil[VEL_Y][k][i_sil_time]
-                        sil_objs[k][ID][i] = self.sil[ID][k][i_sil_time]
-                        sil_objs[k][EXIST][i] = True
-                else:
-                    sil_objs[k][DIS_X][i] = self.sil[DIS_X][k][i_sil_time]
-                    sil_objs[k][DIS_Y][i] = self.sil[DIS_Y][k][i_sil_time]
-                    sil_objs[k][VEL_X][i] = self.sil[VEL_X][k][i_sil_time]
-                    sil_objs[k][VEL_Y][i] = self.sil[VEL_Y][k][i_sil_time]
-                    sil_objs[k][ID][i] = self.sil[ID][k][i_sil_time]
-                    sil_objs[k][EXIST][i] = True
-            for k in range(0, len(self.ecu[DIS_X]), 1):
-                if self._config['dynamic_properties'] != -1 and len(self.sil[DYN_PROP]) > 0:
-                    if (self._config['dynamic_properties'] == 0 and self.ecu[DYN_PROP][k][i_ecu_time] == 1) or\
-                       (self._config['dynamic_properties'] == 1 and self.ecu[DYN_PROP][k][i_ecu_time] != 1):
-                        ecu_objs[k][DIS_X][i] = self.ecu[DIS_X][k][i_ecu_time]
-                        ecu_objs[k][DIS_Y][i] = self.ecu[DIS_Y][k][i_ecu_time]
-                        ecu_objs[k][VEL_X][i] = self.ecu[VEL_X][k][i_ecu_time]
-                        ecu_objs[k][VEL_Y][i] = self.ecu[VEL_Y][k][i_ecu_time]
-                        ecu_objs[k][ID][i] = self.ecu[ID][k][i_ecu_time]
-                        if self.ecu[DIS_X][k][i_ecu_time] != INVALID_DIST:
-                            ecu_objs[k][EXIST][i] = True
-                        else:
-                            ecu_data_error[k].append(i)
-                else:
-                    ecu_objs[k][DIS_X][i] = self.ecu[DIS_X][k][i_ecu_time]
-                    ecu_objs[k][DIS_Y][i] = self.ecu[DIS_Y][k][i_ecu_time]
-                    ecu_objs[k][VEL_X][i] = self.ecu[VEL_X][k][i_ecu_time]
-                    ecu_objs[k][VEL_Y][i] = self.ecu[VEL_Y][k][i_ecu_time]
-                    ecu_objs[k][ID][i] = self.ecu[ID][k][i_ecu_time]
-                    if self.ecu[DIS_X][k][i_ecu_time] != INVALID_DIST:
-                        ecu_objs[k][EXIST][i] = True
-                    else:
-                        ecu_data_error[k].append(i)
+        ecu_ts = self.ecu[TIMESTAMP][0].values[self._sync_offset_ecu:self._sync_offset_ecu + _len]
+        sil_ts = self.sil[TIMESTAMP][0].values[self._sync_offset_sil:self._sync_offset_sil + _len]
+        time_stamp = [ts if valid else -1 for ts, valid in zip(ecu_ts, ecu_ts == sil_ts)]
 
-        tmp_set1 = set()
-        tmp_set3 = set()
-        _before = 0
+        # ecu objects existing less than self.limit_lc don't take part in the matching
+        short_living = self._life_cycles(ecu_objs[ID], self.limit_lc) < self.limit_lc
+        # expanding search area of the matching, we start with a very small area to reduce wrong matches
+        expanding = [np.cumsum([tol * EXPAND_FACTOR] * self.expand_loops)
+                     for tol in (self.tol_dis_x, self.tol_dis_y, self.tol_vel_x, self.tol_vel_y)]
 
+        _before = 0
         # global match loop
         for i in range(0, self._sync_len, 1):
             # ignore invalid time stamps but but don't forget active matches
             if time_stamp[i] == -1:
-                for k in ids_ecu_list[i]:
-                    ecu_objs[k][EXIST][i] = False
-                    ecu_objs[k][DIS_X][i] = INVALID_DIST
-                    if ecu_objs[k][MATCH][_before] > 0:
-                        ecu_objs[k][MATCH][i] = -ecu_objs[k][MATCH][_before] - 2
-                    else:
-                        ecu_objs[k][MATCH][i] = ecu_objs[k][MATCH][_before]
+                ecu_objs[EXIST][:, i] = False
+                ecu_objs[DIS_X][:, i] = INVALID_DIST
+                match = ecu_objs[MATCH][:, _before]
+                ecu_objs[MATCH][:, i] = np.where(match > 0, -match - 2, match)
                 _before = i
                 continue
 
-            for k in ids_ecu_list[i]:
-                # if exist an previous match check if this is possible
-                if ecu_objs[k][MATCH][_before] != -1 and ecu_objs[k][ID][i] == ecu_objs[k][ID][_before]:
-                    match = ecu_objs[k][MATCH][_before]
-                    if match < -1:
-                        index = (match + 2) * -1
-                    else:
-                        index = match
-                    factor = FACTOR_GATING
-                    dif_pos_x = abs(sil_objs[index][DIS_X][i] - ecu_objs[k][DIS_X][i])
-                    dif_pos_y = abs(sil_objs[index][DIS_Y][i] - ecu_objs[k][DIS_Y][i])
-                    dif_vel_x = abs(sil_objs[index][VEL_X][i] - ecu_objs[k][VEL_X][i])
-                    dif_vel_y = abs(sil_objs[index][VEL_Y][i] - ecu_objs[k][VEL_Y][i])
-
-                    if (dif_pos_x < self.tol_dis_x*factor and dif_pos_y < self.tol_dis_y*factor and
-                       dif_vel_x < self.tol_vel_x*factor and dif_vel_y < self.tol_vel_x*factor and
-                       sil_objs[index][ID][i] == sil_objs[index][ID][_before]):
-                        ecu_objs[k][MATCH][i] = index
-                        ecu_objs[k][DIF_POS_X][i] = dif_pos_x
-                        ecu_objs[k][DIF_POS_Y][i] = dif_pos_y
-                        ecu_objs[k][DIF_VEL_X][i] = dif_vel_x
-                        ecu_objs[k][DIF_VEL_Y][i] = dif_vel_y
-                        ecu_objs[k][M_DIS_X][i] = sil_objs[index][DIS_X][i]
-                        ecu_objs[k][M_DIS_Y][i] = sil_objs[index][DIS_Y][i]
-                        ecu_objs[k][M_VEL_X][i] = sil_objs[index][VEL_X][i]
-                        ecu_objs[k][M_VEL_Y][i] = sil_objs[index][VEL_Y][i]
-                        tmp_set1.add(k)
-                        tmp_set3.add(index)
-                    elif (ecu_objs[k][DIS_X][i] == INVALID_DIST and
-                          ecu_objs[k][ID][i] == ecu_objs[k][ID][_before] and
-                          sil_objs[index][ID][i] == sil_objs[index][ID][_before]):
-                        ecu_objs[k][MATCH][i] = index
-                        ecu_objs[k][M_DIS_X][i] = sil_objs[index][DIS_X][i]
-                        ecu_objs[k][M_DIS_Y][i] = sil_objs[index][DIS_Y][i]
-                        ecu_objs[k][M_VEL_X][i] = sil_objs[index][VEL_X][i]
-                        ecu_objs[k][M_VEL_Y][i] = sil_objs[index][VEL_Y][i]
-                        tmp_set1.add(k)
-                        tmp_set3.add(index)
-            ids_ecu_list[i] = ids_ecu_list[i].difference(tmp_set1)
-            ids_sil_list[i] = ids_sil_list[i].difference(tmp_set3)
-            tmp_set1.clear()
-            tmp_set3.clear()
+            ids_ecu_i, ids_sil_i = self._continue_matches(ecu_objs, sil_objs, ids_ecu, ids_sil, i, _before)
 
             # remove all ecu objects which are not exist from the search set
-            for k in ids_ecu_list[i]:
-                if not ecu_objs[k][EXIST][i]:
-                    ecu_objs[k][DIS_X][i] = INVALID_DIST
-                    tmp_set1.add(k)
-            ids_ecu_list[i] = ids_ecu_list[i].difference(tmp_set1)
-            tmp_set1.clear()
-
+            ids_ecu_i = self._remove(ids_ecu_i, ~ecu_objs[EXIST][:, i], ecu_objs, i)
             # remove all ecu object which exist less than self.limit_lc
-            for k in ids_ecu_list[i]:
-                counter = 1
-                id_tmp = ecu_objs[k][ID][i]
-                for l in range(i + 1, min(self._sync_len, i + 1*self.limit_lc), 1):
-                    if ecu_objs[k][ID][l] == id_tmp:
-                        counter += 1
-                    else:
-                        break
-                for l in range(max(i-1, 0), max(0, i - 1*self.limit_lc), -1):
-                    if ecu_objs[k][ID][l] == id_tmp:
-                        counter += 1
-                    else:
-                        break
-                if counter < self.limit_lc:
-                    tmp_set1.add(k)
-                    ecu_objs[k][EXIST][i] = False
-                    ecu_objs[k][DIS_X][i] = INVALID_DIST
-            ids_ecu_list[i] = ids_ecu_list[i].difference(tmp_set1)
-            tmp_set1.clear()
-
+            ids_ecu_i = self._remove(ids_ecu_i, short_living[:, i], ecu_objs, i, exist=False)
             # remove all ecu objects which have no distance because this is an error in the datas
-            for k in ids_ecu_list[i]:
-                if ecu_objs[k][DIS_X][i] == INVALID_DIST:
-                    tmp_set1.add(k)
-            ids_ecu_list[i] = ids_ecu_list[i].difference(tmp_set1)
-            tmp_set1.clear()
+            ids_ecu_i = self._remove(ids_ecu_i, ecu_objs[DIS_X][:, i] == INVALID_DIST)
 
             # search for each unmatch ecu object an sil object
+            self.match(ecu_objs, sil_objs, ids_ecu_i, ids_sil_i, i, expanding)
 
-            tol_x = self.tol_dis_x * EXPAND_FACTOR
-            tol_y = self.tol_dis_y * EXPAND_FACTOR
-            v_tol_x = self.tol_vel_x * EXPAND_FACTOR
-            v_tol_y = self.tol_vel_y * EXPAND_FACTOR
-            # loop to expand the search area for each point, we start with a very small area to reduce wrong matches
-            for j in range(0, self.expand_loops, 1):
-                # loop about all ecu objects in the actual time step
-                for k in ids_ecu_list[i]:
-                    [ecu_objs[k][MATCH][i], ecu_objs[k][DIF_POS_X][i],  ecu_objs[k][DIF_POS_Y][i],
-                     ecu_objs[k][DIF_VEL_X][i], ecu_objs[k][DIF_VEL_Y][i], ecu_objs[k][M_DIS_X][i],
-                     ecu_objs[k][M_DIS_Y][i], ecu_objs[k][M_VEL_X][i], ecu_objs[k][M_VEL_Y][i]] = \
-                        self.match(ecu_objs[k], sil_objs, ids_sil_list[i], i, tol_x, tol_y, v_tol_x, v_tol_y)
-                    if ecu_objs[k][MATCH][i] != -1:
-                        tmp_set1.add(k)
-                        sil_objs[ecu_objs[k][MATCH][i]][MATCH][i] = 1
-                        ids_sil_list[i].discard(ecu_objs[k][MATCH][i])
-                # expand the tolerance
-                tol_x += self.tol_dis_x * EXPAND_FACTOR
-                tol_y += self.tol_dis_y * EXPAND_FACTOR
-                v_tol_x += self.tol_vel_x * EXPAND_FACTOR
-                v_tol_y += self.tol_vel_y * EXPAND_FACTOR
-                ids_ecu_list[i] = ids_ecu_list[i].difference(tmp_set1)
-                tmp_set1.clear()
             # collect all unmatched sil objects
-            for k in ids_sil_list[i]:
+            for k in ids_sil_i:
                 miss_match_list[k].append(i)
             _before = i
 
+        # per object views of the arrays for the evaluation
+        ecu_objs = [dict((key, values[k]) for key, values in ecu_objs.items()) for k in ids_ecu]
+        sil_objs = [dict((key, values[k]) for key, values in sil_objs.items()) for k in ids_sil]
+
         # no start the evaluation of the match
         rate_list = []
         match_list = []
@@ -582,23 +435,8 @@ class ObjectMatchTest(BaseTest):
 
     @staticmethod
     def _sync(ecu, sil):
-        sync_state = False
-        sync_len = 0
-        i = 0
-        k = 0
-        if sil is not None and ecu is not None:
-
-            while not sync_state and i < len(ecu) and k < len(sil):
-                if ecu[i] < sil[k]:
-                    i += 1
-                    continue
-                if ecu[i] > sil[k]:
-                    k += 1
-                    continue
-                if ecu[i] == sil[k]:
-                    sync_state = True
-            sync_len = np.min([len(ecu)-i, len(sil)-k])
-        return sync_state, i, k, sync_len
+        """ First common timestamp of ECU and SIL, see `framework.io.alignment.sync_offsets`. """
+        return sync_offsets(getattr(ecu, "values", ecu), getattr(sil, "values", sil))
 
     # function to read the signals selected signals
     def _read_signal(self, reader, signal, name, unit, index, index_offset=None, signal_index=None, entry=None):
@@ -627,37 +465,155 @@ class ObjectMatchTest(BaseTest):
         else:
             return AlgoSignal(name, raw_data, index, unit)
 
-    # function to find an object match
+    def _object_arrays(self, signals, start, length, ecu):
+        """ Object signals of the synchronized cycles as arrays (object x cycle), objects not passing the
+            dynamic properties filter keep the default values in a cycle.
+            :param signals: read signals (self.ecu or self.sil)
+            :param start: index of first synchronized cycle
+            :param length: number of synchronized cycles
+            :param ecu: ecu objects only exist with a valid distance
+            :return: dict of arrays, list of cycles with invalid distance per (ecu) object
+        """
+        def stack(key):
+            return np.array([sig.values[start:start + length] for sig in signals[key]]).reshape(len(signals[key]),
+                                                                                                length)
+
+        values = dict((key, stack(key)) for key in (DIS_X, DIS_Y, VEL_X, VEL_Y, ID))
+        selected = np.ones(values[DIS_X].shape, bool)
+        dyn_prop = self._config['dynamic_properties']
+        if dyn_prop != -1 and len(self.sil[DYN_PROP]) > 0:
+            dyn = stack(DYN_PROP)
+            selected = ((dyn_prop == 0) & (dyn == 1)) | ((dyn_prop == 1) & (dyn != 1))
+
+        objs = {MATCH: np.full(selected.shape, -1, np.int64), DYN_PROP: np.full(selected.shape, -1, np.int64)}
+        for key, default in ((DIS_X, INVALID_DIST), (DIS_Y, 0.), (VEL_X, 0.), (VEL_Y, 0.), (ID, 0)):
+            dtype = values[key].dtype
+            if key != ID and dtype.kind != 'f':
+                dtype = np.float64
+            objs[key] = np.where(selected, values[key], default).astype(dtype)
+
+        data_error = []
+        if ecu:
+            objs[EXIST] = selected & (values[DIS_X] != INVALID_DIST)
+            data_error = [list(np.flatnonzero(error)) for error in selected & (values[DIS_X] == INVALID_DIST)]
+        else:
+            objs[EXIST] = selected
+        return objs, data_error
+
     @staticmethod
-    def match(element, ref, ref_set, index, tol_x, tol_y, v_tol_x, v_tol_y):
-        candidates = []
-        candidate = []
-        # pre match loop match only possition
-        for i in ref_set:
-            norm_p_x = abs(element[DIS_X][index] - ref[i][DIS_X][index])
-            norm_p_y = abs(element[DIS_Y][index] - ref[i][DIS_Y][index])
-            if norm_p_x < tol_x and norm_p_y < tol_y:
-                candidates.append({ID: i, 'norm_p_x': norm_p_x, 'norm_p_y': norm_p_y, 'norm_v_x': 0,
-                                   'norm_v_y': 0,
-                                   'norm': 0, DIS_X: ref[i][DIS_X][index], DIS_Y: ref[i][DIS_Y][index],
-                                   VEL_X: ref[i][VEL_X][index], VEL_Y: ref[i][VEL_Y][index]})
-        # match also with velocity (and position)
-        if len(candidates) > 0:
-            for e in candidates:
-                norm_v_x = abs(e[VEL_X] - element[VEL_X][index])
-                norm_v_y = abs(e[VEL_Y] - element[VEL_Y][index])
-                if norm_v_x < v_tol_x and norm_v_y < v_tol_y:
-                    e['norm'] = e['norm_p_x'] + e['norm_p_y'] + norm_v_x + norm_v_y
-                    e['norm_v_x'] = norm_v_x
-                    e['norm_v_y'] = norm_v_y
-                    candidate.append(e)
-            if len(candidate) > 0:
-                match_object = sorted(candidate, key=lambda dist: dist["norm"])[0]
-                # return the best match
-                return [match_object[ID], match_object['norm_p_x'], match_object['norm_p_y'], match_object['norm_v_x'],
-                        match_object['norm_v_y'], match_object[DIS_X], match_object[DIS_Y], match_object[VEL_X],
-                        match_object[VEL_Y]]
-        return [-1, -0.25, -0.25, -0.125, -0.125, 0, 0, 0, 0]
+    def _life_cycles(ids, limit_lc):
+        """ Number of cycles each object keeps its id around each cycle, counted up to limit_lc cycles
+            before and after the cycle (like the search of the former object loop, which excluded cycle 0).
+            :param ids: object ids (object x cycle)
+            :param limit_lc: life cycles limit
+            :return: array of life cycles (object x cycle)
+        """
+        length = ids.shape[1]
+        pos = np.arange(length)
+        first = np.ones(ids.shape, bool)
+        first[:, 1:] = ids[:, 1:] != ids[:, :-1]
+        last = np.ones(ids.shape, bool)
+        last[:, :-1] = first[:, 1:]
+        run_start = np.maximum.accumulate(np.where(first, pos, 0), axis=1)
+        run_end = np.minimum.accumulate(np.where(last, pos, length)[:, ::-1], axis=1)[:, ::-1]
+        after = np.maximum(np.minimum(length, pos + limit_lc) - pos - 1, 0)
+        before = np.maximum(pos - 1 - np.maximum(pos - limit_lc, 0), 0)
+        return 1 + np.minimum(run_end - pos, after) + np.minimum(pos - run_start, before)
+
+    def _continue_matches(self, ecu_objs, sil_objs, ids_ecu, ids_sil, index, before):
+        """ Keeps the matches of the previous cycle which are still possible.
+            :return: ecu and sil objects left to match
+        """
+        match = ecu_objs[MATCH][:, before]
+        objs = np.flatnonzero((match != -1) & (ecu_objs[ID][:, index] == ecu_objs[ID][:, before]))
+        match = np.where(match[objs] < -1, (match[objs] + 2) * -1, match[objs])
+        factor = FACTOR_GATING
+        dif = [abs(sil_objs[key][match, index] - ecu_objs[key][objs, index]) for key in (DIS_X, DIS_Y, VEL_X, VEL_Y)]
+        same_id = sil_objs[ID][match, index] == sil_objs[ID][match, before]
+        # compared as double like the former scalars, not in the precision of the signals
+        dif64 = [value.astype(np.float64) for value in dif]
+        passed = ((dif64[0] < self.tol_dis_x*factor) & (dif64[1] < self.tol_dis_y*factor) &
+                  (dif64[2] < self.tol_vel_x*factor) & (dif64[3] < self.tol_vel_x*factor) & same_id)
+        invalid = ~passed & (ecu_objs[DIS_X][objs, index] == INVALID_DIST) & same_id
+
+        for key, value in zip((DIF_POS_X, DIF_POS_Y, DIF_VEL_X, DIF_VEL_Y), dif):
+            ecu_objs[key][objs[passed], index] = value[passed]
+        kept = passed | invalid
+        objs, match = objs[kept], match[kept]
+        ecu_objs[MATCH][objs, index] = match
+        for key, m_key in ((DIS_X, M_DIS_X), (DIS_Y, M_DIS_Y), (VEL_X, M_VEL_X), (VEL_Y, M_VEL_Y)):
+            ecu_objs[m_key][objs, index] = sil_objs[key][match, index]
+        return ids_ecu.difference(set(objs.tolist())), ids_sil.difference(set(match.tolist()))
+
+    @staticmethod
+    def _remove(ids, remove, ecu_objs=None, index=None, exist=None):
+        """ Removes objects from the search set, their distance is invalidated if ecu_objs are given.
+            :param ids: set of object indices
+            :param remove: mask of objects to remove
+            :param exist: new exist state of the removed objects
+            :return: new set without removed objects
+        """
+        objs = [k for k in ids if remove[k]]
+        if ecu_objs is not None:
+            ecu_objs[DIS_X][objs, index] = INVALID_DIST
+            if exist is not None:
+                ecu_objs[EXIST][objs, index] = exist
+        return ids.difference(set(objs))
+
+    @staticmethod
+    def match(ecu_objs, sil_objs, ids_ecu, ids_sil, index, expanding):
+        """ Greedy matching of the ecu objects to the sil objects of a cycle with an expanding search area:
+            for each area the ecu objects (in order of the set) take the nearest sil object left inside
+            of it. The distances of all pairs are computed at once, each pair gets the first area it is in.
+            :param ecu_objs: ecu object arrays, match results are stored in
+            :param sil_objs: sil object arrays
+            :param ids_ecu: ecu objects to match
+            :param ids_sil: sil objects to match, matched ones are removed
+            :param index: cycle
+            :param expanding: tolerances of the expanding area for dist x, dist y, vel x and vel y
+        """
+        if not len(expanding[0]) or not ids_ecu:
+            return
+        ecu = np.array(list(ids_ecu))
+        sil = np.array(list(ids_sil), np.int64)
+        for key, value in ((MATCH, -1), (DIF_POS_X, -0.25), (DIF_POS_Y, -0.25), (DIF_VEL_X, -0.125),
+                           (DIF_VEL_Y, -0.125), (M_DIS_X, 0), (M_DIS_Y, 0), (M_VEL_X, 0), (M_VEL_Y, 0)):
+            ecu_objs[key][ecu, index] = value
+
+        # distances (ecu x sil) and the first area of each pair
+        norm = [abs(ecu_objs[key][ecu, index][:, None] - sil_objs[key][sil, index][None, :])
+                for key in (DIS_X, DIS_Y, VEL_X, VEL_Y)]
+        area = np.max([np.searchsorted(tol, dist.astype(np.float64), "right")
+                       for tol, dist in zip(expanding, norm)], axis=0)
+        inside = area < len(expanding[0])
+        if not inside.any():
+            return
+        total = norm[0] + norm[1] + norm[2] + norm[3]
+        first_area = dict(zip(ecu.tolist(), np.where(inside.any(axis=1), area.min(axis=1), len(expanding[0]))))
+        rows = dict(zip(ecu.tolist(), range(len(ecu))))
+        free = np.ones(len(sil), bool)
+
+        for step in range(area[inside].max() + 1):
+            matched = set()
+            for k in ids_ecu:
+                if first_area[k] > step:
+                    continue
+                row = rows[k]
+                candidates = np.flatnonzero((area[row] <= step) & free)
+                if not len(candidates):
+                    continue
+                dist = total[row, candidates]
+                col = candidates[dist == dist.min()][0]
+                free[col] = False
+                matched.add(k)
+                ids_sil.discard(sil[col])
+                sil_objs[MATCH][sil[col], index] = 1
+                ecu_objs[MATCH][k, index] = sil[col]
+                for key, dist in zip((DIF_POS_X, DIF_POS_Y, DIF_VEL_X, DIF_VEL_Y), norm):
+                    ecu_objs[key][k, index] = dist[row, col]
+                for key, m_key in ((DIS_X, M_DIS_X), (DIS_Y, M_DIS_Y), (VEL_X, M_VEL_X), (VEL_Y, M_VEL_Y)):
+                    ecu_objs[m_key][k, index] = sil_objs[key][sil[col], index]
+            ids_ecu = ids_ecu.difference(matched)
 
     def check(self, elements):
         return self.rate(elements, 0, len(elements[EXIST]) - 1)
@@ -748,6 +704,7 @@ class ObjectMatchTest(BaseTest):
         return [range_min, range_max]
 
     # function to plot the displacement
+    @serialized
     def plot_displacement(self, x_values, y_values, x_label, y_label):
         # Plot with 2 subplots
         plt.figure(num=2, figsize=(9, 9), dpi=120, facecolor='w', edgecolor='k')
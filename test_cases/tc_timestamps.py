@@ -13,6 +13,7 @@ import pandas as pd
 
 from framework.util.gbl_defs import GblUnits
 from framework.img.viz import AlgoSignal
+from framework.io.alignment import alignment
 from framework.val.asmt import ValAssessmentStates
 from framework.val.results import ValTestStep
 from tc_common import BaseTest
@@ -29,6 +30,8 @@ __date__ = "$Date: 2020/03/25 20:56:45CET $"
 
 class TimestampTestcase(BaseTest):
     """ Test of timestamp availability. """
+    PARALLEL_RECORDINGS = True
+    LAST_RESULTS = ("results_60",)
 
     def __init__(self, data_manager, testcase, config):
         """ Initializes the object. """
@@ -115,58 +118,18 @@ class TimestampTestcase(BaseTest):
                 "Number of samples in ECU": len(ecu_ts[idx_ecu:]),
                 "Number of samples in SIL": len(sil_ts[idx_sil:]), }
 
-    def _reindex(self, ref, target):
-        """ Constructs a synchronized timestamp index. The ref timestamp is required to be later than the target
-        timestamp. In case an index is missing in ref or target it is omited.
-        :param ref: Timestamp data to sync to
-        :param target: Original timestamp
-        :return: a synchronized timestamp
-        """
-        # make a series containing itself
-        ecu_series = pd.Series(ref, index=ref)
-        sil_series = pd.Series(target, index=target)
-
-        missing_ts = ecu_series - sil_series
-
-        if True in pd.isnull(missing_ts).values:
-            self._logger.warning("Some timestamps do not exists in SIL.")
-
-            # Look in the subtraction of ecu and sil for the timestamps which belong to
-            # sil and are NaN because there was no equal index in the ecu series
-            mm = missing_ts[sil_series]
-
-            # Work through the timestamps (worse case all) and try to find a nearest right neighbor
-            for idx in mm.index:
-                if pd.isnull(mm[idx]):
-                    loc = missing_ts.index.get_loc(idx)
-
-                    if len(missing_ts) > loc + 1:
-                        # val = missing_ts.iloc[loc + 1]
-                        val = missing_ts.index.values[loc + 1]
-
-                        if val in ecu_series.index:
-                            mm[idx] = val
-                else:
-                    mm[idx] = idx
-
-            mm.iloc[-1] = sil_series.index.values[-1]
-            return mm.values.astype(np.long)
-
-        return target
-
     def execute(self, story):
         """ Build the timestamp delta signals,
             calculates mean and sigma,
             and the differences between ECU and SIL timestamps.
         """
 
-        # indexes
-        data = self._ecu_bsig_reader.get_signal_by_name(MTS_PACKAGE_TIME_STAMP)
-        ecu_index = np.fromiter(data, np.long)
+        # indexes, aligned once per recording and shared with the other test cases
+        sync = alignment(self._ecu_bsig_reader, self._sil_bsig_reader, MTS_PACKAGE_TIME_STAMP)
+        ecu_index = sync.ref.copy()
         ecu_ts_60 = pd.Series(ecu_index, ecu_index)
 
-        data = self._sil_bsig_reader.get_signal_by_name(MTS_PACKAGE_TIME_STAMP)
-        sil_index = np.fromiter(data, np.long)
+        sil_index = sync.target.copy()
         sil_ts_60 = pd.Series(sil_index, sil_index)
 
         self.results_60 = self.calc_nan_values(ecu_ts_60, sil_ts_60)
@@ -196,7 +159,11 @@ class TimestampTestcase(BaseTest):
         # self._scale_drawing(nan_plot, 0.55)
         ecu_sig = AlgoSignal("ECU", ecu_ts_60, unit="us")
 
-        reindexed = self._reindex(ecu_ts_60.index.values, sil_ts_60.index.values)
+        if sync.complete:
+            reindexed = sil_ts_60.index.values
+        else:
+            self._logger.warning("Some timestamps do not exists in SIL.")
+            reindexed = sync.reindexed.astype(np.long)
         missing = AlgoSignal("Missing", self.results_60["Vec"] * max(reindexed))
         sil_sig = AlgoSignal("SIL", sil_ts_60.values, reindexed, unit="us")
         nan_plot = self.plot_factory.histogram_plot(ecu_sig, sil_sig, [missing],
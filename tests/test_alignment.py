@@ -0,0 +1,219 @@
+"""
+tests/test_alignment
+--------------------
+
+timestamp alignment of `framework.io.alignment` compared with the former loops of the test cases
+(`_reindex` of generic signals and timestamps, `_sync` of object match, the jump loop of generic signals)
+and with ``pandas.merge_asof``
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from os import path as opath
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# - import framework modules -------------------------------------------------------------------------------------------
+sys.path.insert(0, opath.dirname(opath.dirname(opath.abspath(__file__))))
+from framework.io.alignment import align, reindex, sync_offsets, unwrap, \
+    PREVIOUS, NEXT, NEAREST  # noqa: E402
+
+# - defines ------------------------------------------------------------------------------------------------------------
+CYCLE = 60000
+WRAP = 2 ** 32
+TRIALS = 400
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def _former_reindex(ref, target):
+    """former `_reindex` of the test cases: target timestamps missing in ref are replaced by the following one
+
+    :return: target itself if nothing is missing
+    """
+    ecu_series = pd.Series(ref, index=ref)
+    sil_series = pd.Series(target, index=target)
+    missing_ts = ecu_series - sil_series
+    if True in pd.isnull(missing_ts).values:
+        mm = missing_ts[sil_series]
+        idx = None
+        for idx in mm.index:
+            if pd.isnull(mm[idx]):
+                loc = missing_ts.index.get_loc(idx)
+                if len(missing_ts) > loc + 1:
+                    val = missing_ts.index.values[loc + 1]
+                    if val in ecu_series.index:
+                        mm[idx] = val
+            else:
+                mm[idx] = idx
+        mm[mm.index.values[-1]] = idx
+        return mm.values
+    return target
+
+
+def _former_sync(ecu, sil):
+    """former `_sync` of the object match: walk to the first common timestamp"""
+    sync_state = False
+    sync_len = 0
+    i = 0
+    k = 0
+    if sil is not None and ecu is not None:
+        while not sync_state and i < len(ecu) and k < len(sil):
+            if ecu[i] < sil[k]:
+                i += 1
+                continue
+            if ecu[i] > sil[k]:
+                k += 1
+                continue
+            if ecu[i] == sil[k]:
+                sync_state = True
+        sync_len = np.min([len(ecu) - i, len(sil) - k])
+    return sync_state, i, k, sync_len
+
+
+def _former_unwrap(timestamps):
+    """former jump loop of the generic signals"""
+    timestamps = np.array(timestamps, np.int64)
+    for ii in np.where(np.diff(timestamps) < 0)[0]:
+        timestamps[(ii + 1):] = timestamps[(ii + 1):] + timestamps[ii]
+    return timestamps
+
+
+def _recording_pair(rnd, start=0, wrap=None):
+    """timestamps of an ecu and a sil recording, both missing some cycles of the other
+
+    :param rnd: random state
+    :param start: first timestamp
+    :param wrap: counter overflow
+    :return: ecu and sil timestamps
+    """
+    count = rnd.randint(5, 40)
+    stamps = start + np.cumsum(rnd.randint(1, 3, count)) * CYCLE
+    if wrap:
+        stamps %= wrap
+    return stamps[rnd.rand(count) < 0.85], stamps[rnd.rand(count) < 0.85]
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class TestFormerLoops(unittest.TestCase):
+    """reindex, sync_offsets and unwrap give the results of the removed loops"""
+
+    def _check(self, ref, target):
+        """compare reindex and sync_offsets with the former loops
+
+        :return: False if the former `_reindex` failed
+        """
+        self.assertEqual(sync_offsets(ref, target), _former_sync(ref, target))
+        try:
+            expected = _former_reindex(ref, target)
+        except ValueError:  # former loop failed on duplicated timestamps in both
+            return False
+        result = reindex(ref, target)
+        if expected is target:
+            self.assertIs(result, target)
+        else:
+            self.assertTrue(np.allclose(np.asarray(expected, np.float64), result, equal_nan=True),
+                            "%s %s: %s instead of %s" % (ref, target, result, expected))
+        return True
+
+    def test_missing(self):
+        """timestamps missing in sil, also at the end"""
+        stamps = np.arange(1, 41) * CYCLE
+        self._check(stamps, np.delete(stamps, [3, 4, 10]))
+        self._check(stamps, stamps[:30])
+        self._check(stamps, stamps[5:])
+
+    def test_extra(self):
+        """timestamps only in sil, also at the end"""
+        stamps = np.arange(1, 41) * CYCLE
+        self._check(np.delete(stamps, [3, 4, 10]), stamps)
+        self._check(stamps[:30], stamps)
+        self._check(np.delete(stamps, [2, 20]), np.delete(stamps, [7, 8, 9]))
+        self._check(stamps, stamps + CYCLE // 3)
+
+    def test_duplicates(self):
+        """repeated timestamps"""
+        stamps = np.arange(1, 41) * CYCLE
+        self._check(stamps, np.insert(stamps, 5, stamps[5]))
+        self._check(np.insert(stamps, [5, 9], stamps[[5, 9]]), np.insert(stamps, 5, stamps[5]))
+        self._check(np.insert(stamps, 5, stamps[5]), stamps)
+
+    def test_random(self):
+        """random timestamps with missing, extra and duplicate ones"""
+        rnd = np.random.RandomState(0)
+        compared = 0
+        for _ in xrange(TRIALS):
+            ref, target = _recording_pair(rnd)
+            if rnd.rand() < 0.4 and len(target):
+                target = np.sort(np.append(target, rnd.choice(target, rnd.randint(1, 3))))
+            if rnd.rand() < 0.3 and len(ref):
+                ref = np.sort(np.append(ref, rnd.choice(ref, 1)))
+            if len(ref) and len(target):
+                compared += self._check(ref, target)
+        self.assertGreater(compared, TRIALS // 3)
+
+    def test_wrap(self):
+        """32bit timestamps overflowing in the recording"""
+        rnd = np.random.RandomState(1)
+        for _ in xrange(TRIALS):
+            ref, target = _recording_pair(rnd, WRAP - rnd.randint(1, 30) * CYCLE, WRAP)
+            if len(ref) and len(target):
+                self.assertTrue(self._check(ref, target))
+
+    def test_unwrap(self):
+        """one counter overflow like the former loop, several ones keep increasing"""
+        rnd = np.random.RandomState(2)
+        for _ in xrange(100):
+            stamps, _ = _recording_pair(rnd, WRAP - rnd.randint(1, 30) * CYCLE, WRAP)
+            self.assertTrue(np.array_equal(unwrap(stamps), _former_unwrap(stamps)))
+
+        stamps = np.concatenate([np.arange(1, 5), np.arange(1, 5), np.arange(1, 5)]) * CYCLE
+        self.assertTrue((np.diff(unwrap(stamps)) > 0).all())
+
+
+class TestMergeAsof(unittest.TestCase):
+    """align gives the rows of ``pandas.merge_asof``"""
+
+    def _check(self, ref, target, method, direction, tolerance):
+        """compare with merge_asof on the timestamps"""
+        merged = pd.merge_asof(pd.DataFrame({"ts": target}), pd.DataFrame({"ts": ref, "row": np.arange(len(ref))}),
+                               on="ts", direction=direction, tolerance=tolerance)
+        expected = merged["row"].fillna(-1).values.astype(np.int64)
+        result = align(ref, target, method, tolerance)
+        self.assertTrue(np.array_equal(result, expected), "%s, %s, tolerance %s: %s instead of %s"
+                        % (ref, target, tolerance, result, expected))
+
+    def _check_all(self, ref, target):
+        """all methods with and without tolerance"""
+        for method, direction in ((PREVIOUS, "backward"), (NEXT, "forward"), (NEAREST, "nearest")):
+            for tolerance in (None, 0, 3, 10):
+                self._check(ref, target, method, direction, tolerance)
+
+    def test_random(self):
+        """random timestamps including duplicates, equally near ones and targets outside of ref"""
+        rnd = np.random.RandomState(3)
+        for _ in xrange(TRIALS // 3):
+            ref = np.sort(rnd.randint(0, 200, rnd.randint(0, 30))).astype(np.int64)
+            target = np.sort(rnd.randint(-10, 210, rnd.randint(1, 30))).astype(np.int64)
+            self._check_all(ref, target)
+
+    def test_recordings(self):
+        """timestamps of recordings"""
+        rnd = np.random.RandomState(4)
+        for _ in xrange(50):
+            ref, target = _recording_pair(rnd)
+            self._check_all(ref, target + rnd.randint(-CYCLE, CYCLE, len(target)) // 1000)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+"""
+CHANGE LOG:
+-----------
+"""
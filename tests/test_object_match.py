@@ -0,0 +1,329 @@
+"""
+tests/test_object_match
+-----------------------
+
+matching of ecu to sil objects in `tc_object_match` compared with the former loops over objects,
+cycles and search areas on synthetic object lists
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from os import path as opath
+from shutil import rmtree
+from tempfile import mkdtemp
+import logging
+import sys
+import unittest
+
+import numpy as np
+
+# - import framework modules -------------------------------------------------------------------------------------------
+PACKAGE_DIR = opath.dirname(opath.dirname(opath.abspath(__file__)))
+sys.path[:0] = [PACKAGE_DIR, opath.join(PACKAGE_DIR, "test_cases")]
+try:
+    import tc_object_match as om  # noqa: E402
+except ImportError:  # dependencies of the validation package not installed
+    om = None
+
+# - defines ------------------------------------------------------------------------------------------------------------
+CYCLE = 60000
+ECU_OBJECTS = 8
+CYCLES = 90
+SIGNALS = (("x", 50.), ("y", 5.), ("vx", 3.), ("vy", 1.))
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def _recordings(rnd, float_type, ties=False, ts_errors=0., run_length=10):
+    """synthetic ecu and sil object lists: sil objects are noisy copies of ecu objects in random order,
+    some sil objects are not related at all
+
+    :param rnd: random state
+    :param float_type: type of the object signals
+    :param ties: add a second sil object with the same values for some ecu objects
+    :param ts_errors: probability of a sil time stamp not matching the ecu one
+    :param run_length: maximum number of cycles an object keeps its id
+    :return: ecu and sil signals by name
+    """
+    count = CYCLES + 5
+    stamps = np.arange(count, dtype=np.int64) * CYCLE
+    ecu = {"E.ts": stamps.copy(), "MTS.Package.TimeStamp": stamps.copy()}
+    sil = {"S.ts": stamps.copy(), "MTS.Package.TimeStamp": stamps.copy()}
+    sil["S.ts"][rnd.rand(count) < ts_errors] += 7
+
+    def runs(values):
+        """values constant for runs of random length"""
+        lengths = rnd.randint(1, run_length + 1, count)
+        return np.repeat(values[:count], lengths)[:count]
+
+    base = {}
+    for k in xrange(ECU_OBJECTS):
+        for name, scale in SIGNALS:
+            base[name, k] = runs(rnd.rand(count) * scale)
+        base["id", k] = runs(rnd.randint(0, 6, count)).astype(np.uint8)
+        for name, _ in SIGNALS:
+            ecu["E.o[%d].%s" % (k, name)] = base[name, k].astype(float_type)
+        ecu["E.o[%d].x" % k][rnd.rand(count) < 0.05] = om.INVALID_DIST
+        ecu["E.o[%d].id" % k] = base["id", k]
+        ecu["E.o[%d].dp" % k] = rnd.randint(0, 3, count)
+
+    related = list(xrange(ECU_OBJECTS)) + [-1, -1]
+    if ties:
+        related += list(rnd.choice(ECU_OBJECTS, 3, replace=False))
+    rnd.shuffle(related)
+    for j, k in enumerate(related):
+        for name, scale in SIGNALS:
+            if k < 0:
+                values = rnd.rand(count) * scale
+            elif ties and related.count(k) > 1:
+                values = base[name, k] + 0.0002
+            else:
+                values = base[name, k] + (rnd.rand(count) < 0.3) * rnd.randn(count) * rnd.choice([0.0003, 0.002, 0.05])
+            sil["S.o[%d].%s" % (j, name)] = values.astype(float_type)
+        sil["S.o[%d].id" % j] = base["id", k] if k >= 0 else rnd.randint(0, 5, count).astype(np.uint8)
+        sil["S.o[%d].dp" % j] = rnd.randint(0, 3, count)
+    return ecu, sil
+
+
+def _config(dynamic_properties, limit_lc):
+    """test case configuration of the synthetic object lists"""
+    signals = [("cyc", "ts", None), ("ts", "ts", None), ("DistX", "o[{0:}].x", 0.001), ("DistY", "o[{0:}].y", 0.001),
+               ("VrelX", "o[{0:}].vx", 0.001), ("VrelY", "o[{0:}].vy", 0.002), ("id", "o[{0:}].id", None),
+               ("dp", "o[{0:}].dp", None)]
+    return {"name": "object_match", "device_prefix": "E.", "sil_prefix": "S.", "signal_base_path": "",
+            "signal_list": [dict({"name": name, "signal": signal, "unit": ""},
+                                 **({"tolerance": [tol]} if tol else {})) for name, signal, tol in signals],
+            "dynamic_properties": dynamic_properties, "limit_life_cycles": limit_lc,
+            "test_steps": [{"type": typ, "res_exp_value": 1., "name": "step"} for typ in (1, 2, 3, 4)]}
+
+
+def _former_match(test):
+    """matching of the former object loops, on the signals read by a test executed before
+
+    :param test: executed `ObjectMatchTest`
+    :return: list of ecu objects as dicts of lists
+    """
+    ecu, sil, length = test.ecu, test.sil, test._sync_len  # pylint: disable=W0212
+    off_ecu, off_sil = test._sync_offset_ecu, test._sync_offset_sil  # pylint: disable=W0212
+    dyn_prop = test._config['dynamic_properties']  # pylint: disable=W0212
+
+    def template():
+        return {om.EXIST: [False] * length, om.DIS_X: [om.INVALID_DIST] * length, om.DIS_Y: [0.] * length,
+                om.VEL_X: [0.] * length, om.VEL_Y: [0.] * length, om.MATCH: [-1] * length, om.M_DIS_X: [0.] * length,
+                om.M_DIS_Y: [0.] * length, om.M_VEL_X: [0.] * length, om.M_VEL_Y: [0.] * length,
+                om.DIF_POS_X: [0.] * length, om.DIF_POS_Y: [0.] * length, om.DIF_VEL_X: [0.] * length,
+                om.DIF_VEL_Y: [0.] * length, om.ID: [0] * length, om.DYN_PROP: [-1] * length}
+
+    ecu_objs = [template() for _ in ecu[om.DIS_X]]
+    sil_objs = [template() for _ in sil[om.DIS_X]]
+    ids_ecu_list, ids_sil_list, time_stamp = [], [], []
+    for i in xrange(length):
+        ids_ecu_list.append(set(xrange(len(ecu_objs))))
+        ids_sil_list.append(set(xrange(len(sil_objs))))
+        ecu_ts, sil_ts = ecu[om.TIMESTAMP][0][i + off_ecu], sil[om.TIMESTAMP][0][i + off_sil]
+        time_stamp.append(ecu_ts if ecu_ts == sil_ts else -1)
+        for objs, sigs, offset, is_ecu in ((sil_objs, sil, off_sil, False), (ecu_objs, ecu, off_ecu, True)):
+            for k, obj in enumerate(objs):
+                if dyn_prop != -1 and len(sil[om.DYN_PROP]) > 0:
+                    dyn = sigs[om.DYN_PROP][k][i + offset]
+                    if not ((dyn_prop == 0 and dyn == 1) or (dyn_prop == 1 and dyn != 1)):
+                        continue
+                for key in (om.DIS_X, om.DIS_Y, om.VEL_X, om.VEL_Y, om.ID):
+                    obj[key][i] = sigs[key][k][i + offset]
+                obj[om.EXIST][i] = not is_ecu or obj[om.DIS_X][i] != om.INVALID_DIST
+
+    def match(element, ref_set, index, tol_x, tol_y, v_tol_x, v_tol_y):
+        candidates = []
+        for k in ref_set:
+            norm_p_x = abs(element[om.DIS_X][index] - sil_objs[k][om.DIS_X][index])
+            norm_p_y = abs(element[om.DIS_Y][index] - sil_objs[k][om.DIS_Y][index])
+            if norm_p_x < tol_x and norm_p_y < tol_y:
+                norm_v_x = abs(sil_objs[k][om.VEL_X][index] - element[om.VEL_X][index])
+                norm_v_y = abs(sil_objs[k][om.VEL_Y][index] - element[om.VEL_Y][index])
+                if norm_v_x < v_tol_x and norm_v_y < v_tol_y:
+                    candidates.append((norm_p_x + norm_p_y + norm_v_x + norm_v_y, k, norm_p_x, norm_p_y, norm_v_x,
+                                       norm_v_y))
+        if candidates:
+            _, k, norm_p_x, norm_p_y, norm_v_x, norm_v_y = sorted(candidates, key=lambda cand: cand[0])[0]
+            return [k, norm_p_x, norm_p_y, norm_v_x, norm_v_y, sil_objs[k][om.DIS_X][index],
+                    sil_objs[k][om.DIS_Y][index], sil_objs[k][om.VEL_X][index], sil_objs[k][om.VEL_Y][index]]
+        return [-1, -0.25, -0.25, -0.125, -0.125, 0, 0, 0, 0]
+
+    before = 0
+    for i in xrange(length):
+        if time_stamp[i] == -1:
+            for k in ids_ecu_list[i]:
+                ecu_objs[k][om.EXIST][i] = False
+                ecu_objs[k][om.DIS_X][i] = om.INVALID_DIST
+                prev = ecu_objs[k][om.MATCH][before]
+                ecu_objs[k][om.MATCH][i] = -prev - 2 if prev > 0 else prev
+            before = i
+            continue
+
+        # continue matches of the cycle before
+        kept_ecu, kept_sil = set(), set()
+        for k in ids_ecu_list[i]:
+            obj = ecu_objs[k]
+            if obj[om.MATCH][before] != -1 and obj[om.ID][i] == obj[om.ID][before]:
+                index = obj[om.MATCH][before]
+                index = (index + 2) * -1 if index < -1 else index
+                ref = sil_objs[index]
+                difs = [abs(ref[key][i] - obj[key][i]) for key in (om.DIS_X, om.DIS_Y, om.VEL_X, om.VEL_Y)]
+                same_id = ref[om.ID][i] == ref[om.ID][before]
+                if (difs[0] < test.tol_dis_x and difs[1] < test.tol_dis_y and difs[2] < test.tol_vel_x and
+                        difs[3] < test.tol_vel_x and same_id):
+                    for key, dif in zip((om.DIF_POS_X, om.DIF_POS_Y, om.DIF_VEL_X, om.DIF_VEL_Y), difs):
+                        obj[key][i] = dif
+                elif not (obj[om.DIS_X][i] == om.INVALID_DIST and same_id):
+                    continue
+                obj[om.MATCH][i] = index
+                for key, m_key in ((om.DIS_X, om.M_DIS_X), (om.DIS_Y, om.M_DIS_Y), (om.VEL_X, om.M_VEL_X),
+                                   (om.VEL_Y, om.M_VEL_Y)):
+                    obj[m_key][i] = ref[key][i]
+                kept_ecu.add(k)
+                kept_sil.add(index)
+        ids_ecu_list[i] -= kept_ecu
+        ids_sil_list[i] -= kept_sil
+
+        # not existing, short living and invalid ecu objects
+        removed = set(k for k in ids_ecu_list[i] if not ecu_objs[k][om.EXIST][i])
+        for k in removed:
+            ecu_objs[k][om.DIS_X][i] = om.INVALID_DIST
+        ids_ecu_list[i] -= removed
+        removed = set()
+        for k in ids_ecu_list[i]:
+            ids = ecu_objs[k][om.ID]
+            counter = 1
+            for l in xrange(i + 1, min(length, i + test.limit_lc)):
+                if ids[l] != ids[i]:
+                    break
+                counter += 1
+            for l in xrange(max(i - 1, 0), max(0, i - test.limit_lc), -1):
+                if ids[l] != ids[i]:
+                    break
+                counter += 1
+            if counter < test.limit_lc:
+                removed.add(k)
+                ecu_objs[k][om.EXIST][i] = False
+                ecu_objs[k][om.DIS_X][i] = om.INVALID_DIST
+        ids_ecu_list[i] -= removed
+        ids_ecu_list[i] -= set(k for k in ids_ecu_list[i] if ecu_objs[k][om.DIS_X][i] == om.INVALID_DIST)
+
+        # expanding search area
+        tols = [tol * om.EXPAND_FACTOR for tol in (test.tol_dis_x, test.tol_dis_y, test.tol_vel_x, test.tol_vel_y)]
+        for _ in xrange(test.expand_loops):
+            matched = set()
+            for k in ids_ecu_list[i]:
+                obj = ecu_objs[k]
+                [obj[om.MATCH][i], obj[om.DIF_POS_X][i], obj[om.DIF_POS_Y][i], obj[om.DIF_VEL_X][i],
+                 obj[om.DIF_VEL_Y][i], obj[om.M_DIS_X][i], obj[om.M_DIS_Y][i], obj[om.M_VEL_X][i],
+                 obj[om.M_VEL_Y][i]] = match(obj, ids_sil_list[i], i, *tols)
+                if obj[om.MATCH][i] != -1:
+                    matched.add(k)
+                    sil_objs[obj[om.MATCH][i]][om.MATCH][i] = 1
+                    ids_sil_list[i].discard(obj[om.MATCH][i])
+            tols = [tol + base * om.EXPAND_FACTOR
+                    for tol, base in zip(tols, (test.tol_dis_x, test.tol_dis_y, test.tol_vel_x, test.tol_vel_y))]
+            ids_ecu_list[i] -= matched
+        before = i
+    return ecu_objs
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class _DataManager(object):
+    """data ports needed by the test case"""
+
+    def __init__(self, outdir):
+        self._ports = {"OutputDirPath": outdir, "currentfile": "synthetic.rrec"}
+
+    def get_data_port(self, name):
+        return self._ports[name]
+
+
+class _Story(object):
+    """report story, all content dropped"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class _Reader(dict):
+    """signals by name like the bsig readers"""
+
+
+@unittest.skipIf(om is None, "validation package not importable")
+class TestObjectMatch(unittest.TestCase):
+    """array matching of `ObjectMatchTest` gives the same results as the former object loops"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = mkdtemp()
+        logging.getLogger("ObjectMatchTest").setLevel(logging.ERROR)
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.tmpdir)
+
+    def _check(self, seeds, dynamic_properties=-1, limit_lc=1, **kwargs):
+        """execute the test case on synthetic object lists and compare its objects with the former matching
+
+        :param seeds: random seeds of the object lists
+        :param dynamic_properties: filter of objects by dynamic property
+        :param limit_lc: minimum life cycles of ecu objects
+        :param kwargs: options of the object lists
+        """
+        for seed in seeds:
+            for float_type in (np.float32, np.float64):
+                ecu, sil = _recordings(np.random.RandomState(seed), float_type, **kwargs)
+                test = om.ObjectMatchTest(_DataManager(self.tmpdir), None, _config(dynamic_properties, limit_lc))
+                test.set_bsig_reader(_Reader(ecu), _Reader(sil), None, None)
+                result = {}
+                test.report_test_criteria = lambda story: None
+                test.check_test_steps = lambda story, *args: None
+                test.report_object_list = lambda story, match_result, ecu_objs: result.update(objs=ecu_objs)
+                test.execute(_Story())
+
+                expected = _former_match(test)
+                self.assertEqual(len(result["objs"]), len(expected))
+                matched = 0
+                for k, (res, exp) in enumerate(zip(result["objs"], expected)):
+                    for key in (om.MATCH, om.EXIST, om.DIS_X, om.DIF_POS_X, om.DIF_POS_Y, om.DIF_VEL_X, om.DIF_VEL_Y,
+                                om.M_DIS_X, om.M_DIS_Y, om.M_VEL_X, om.M_VEL_Y):
+                        self.assertTrue(np.array_equal(np.asarray(res[key], np.float64),
+                                                       np.asarray(exp[key], np.float64)),
+                                        "seed %d, %s: %s of object %d differs" % (seed, float_type.__name__, key, k))
+                    matched += (np.asarray(exp[om.MATCH]) >= 0).sum()
+                self.assertGreater(matched, 0, "nothing matched, seed %d" % seed)
+
+    def test_noisy(self):
+        """noisy copies, unrelated sil objects and invalid distances"""
+        self._check(xrange(3))
+
+    def test_ties(self):
+        """sil objects with equal distance to an ecu object, the first one is taken"""
+        self._check(xrange(3, 6), ties=True)
+
+    def test_invalid_timestamps(self):
+        """cycles with different time stamps keep the matches as negative values"""
+        self._check(xrange(6, 9), ts_errors=0.1)
+
+    def test_dynamic_properties(self):
+        """objects filtered by their dynamic property"""
+        self._check(xrange(9, 11), dynamic_properties=0)
+        self._check(xrange(11, 13), dynamic_properties=1)
+
+    def test_short_living(self):
+        """ecu objects keeping their id less than limit_life_cycles are not matched"""
+        self._check(xrange(13, 16), limit_lc=4, run_length=6)
+        self._check(xrange(16, 18), limit_lc=8, ts_errors=0.05, ties=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+"""
+CHANGE LOG:
+-----------
+"""
@@ -0,0 +1,236 @@
+"""
+tests/test_process_manager
+--------------------------
+
+checkpoints of the `ProcessManager`: a run killed mid-way and resumed has to end up with the same
+merged results as an uninterrupted run, sequential and in recording-parallel mode
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from json import load
+from os import path as opath, environ, killpg, setsid, makedirs, remove
+from shutil import rmtree
+from signal import SIGKILL
+from subprocess import Popen, STDOUT
+from tempfile import mkdtemp
+from time import sleep, time
+import sqlite3
+import sys
+import unittest
+
+# - defines ------------------------------------------------------------------------------------------------------------
+PACKAGE_DIR = opath.dirname(opath.dirname(opath.abspath(__file__)))
+RECORDINGS = 12
+DELAY = 0.3  # processing time of a recording in the run that is killed
+KILL_AFTER = 4  # journaled recordings
+TIMEOUT = 120
+
+PLUGIN = '''
+import json, os, time
+from framework.valf import BaseComponentInterface
+from framework.util.defines import CURRENT_FILE_PORT_NAME, OUTPUTDIRPATH_PORT_NAME, RECORDING_DURATION_PORT_NAME, \\
+    GLOBAL_BUS_NAME
+
+
+class RecordingResults(BaseComponentInterface):
+    PARALLEL_RECORDINGS = True
+
+    def __init__(self, data_manager, component_name, bus_name, *args, **kwargs):
+        BaseComponentInterface.__init__(self, data_manager, component_name, bus_name, "$Revision: 1.0 $")
+        self.results = []
+
+    def _output(self, name):
+        return os.path.join(self._get_data(OUTPUTDIRPATH_PORT_NAME, GLOBAL_BUS_NAME), name)
+
+    def process_data(self):
+        recording = self._get_data(CURRENT_FILE_PORT_NAME, GLOBAL_BUS_NAME)
+        time.sleep(float(os.environ.get("RECORDING_DELAY", "0")))
+        with open(self._output("processed.log"), "a") as fp:
+            fp.write(recording + "\\n")
+        self.results.append([os.path.basename(recording), sum(map(ord, recording))])
+        self._set_data(RECORDING_DURATION_PORT_NAME, 2.5, GLOBAL_BUS_NAME)
+        return self.RET_VAL_OK
+
+    def get_recording_mark(self):
+        return len(self.results)
+
+    def get_recording_results(self, mark=None):
+        return self.results[mark or 0:]
+
+    def merge_recording_results(self, results):
+        self.results.extend(results)
+        return self.RET_VAL_OK
+
+    def pre_terminate(self, _processed_files="-", _processed_time=0):
+        with open(self._output("results.json"), "w") as fp:
+            json.dump([self.results, _processed_files, _processed_time], fp)
+        return self.RET_VAL_OK
+'''
+
+CONFIG = '''
+[Global]
+PortOut=["ProjectName"]
+InputData=[("ProjectName", "checkpoint_test")]
+ConnectBus=["Global"]
+
+[Recordings]
+ClassName="CollectionReader"
+InputData=[("CollectionName", %r), ("SimCheck", False)]
+PortOut=["CurrentFile"]
+ConnectBus=["Bus#1"]
+Order=1
+
+[Results]
+ClassName="RecordingResults"
+PortOut=[]
+ConnectBus=["Bus#1"]
+Order=2
+'''
+
+RUNNER = '''
+import sys
+sys.path.insert(0, %r)
+from framework.valf.process_manager import ProcessManager
+pmgr = ProcessManager([%r])
+pmgr.load_configuration(%r)
+pmgr.set_data_port("OutputDirPath", sys.argv[1])
+pmgr.set_data_port("ParallelRecordings", int(sys.argv[2]))
+pmgr.set_data_port("Checkpoint", True)
+sys.exit(pmgr.run())
+'''
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class TestCheckpoints(unittest.TestCase):
+    """kill a run when some recordings are journaled, resume it and compare with an uninterrupted run"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = mkdtemp()
+        plugins = opath.join(cls.tmpdir, "plugins")
+        makedirs(plugins)
+        with open(opath.join(plugins, "recording_results.py"), "w") as fp:
+            fp.write(PLUGIN)
+
+        collection = opath.join(cls.tmpdir, "recordings.bpl")
+        with open(collection, "w") as fp:
+            fp.write('<?xml version="1.0" encoding="UTF-8"?>\n<BatchList>\n')
+            for i in xrange(RECORDINGS):
+                fp.write('<BatchEntry fileName="/data/rec_%02d.rrec"><SectionList/></BatchEntry>\n' % i)
+            fp.write('</BatchList>\n')
+
+        config = opath.join(cls.tmpdir, "checkpoint.cfg")
+        with open(config, "w") as fp:
+            fp.write(CONFIG % collection)
+
+        cls.runner = opath.join(cls.tmpdir, "run.py")
+        with open(cls.runner, "w") as fp:
+            fp.write(RUNNER % (PACKAGE_DIR, plugins, config))
+
+        cls.expected = cls._results(cls._run("uninterrupted", 0))
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.tmpdir)
+
+    @classmethod
+    def _start(cls, name, workers, delay=0):
+        """start a run in an own process group, so it can be killed with its worker processes
+
+        :return: output folder and process
+        """
+        outdir = opath.join(cls.tmpdir, name)
+        if not opath.exists(outdir):
+            makedirs(outdir)
+        env = dict(environ, RECORDING_DELAY=str(delay), COMPUTERNAME=environ.get("COMPUTERNAME", "test"))
+        with open(opath.join(outdir, "valf.out"), "a") as log:
+            return outdir, Popen([sys.executable, cls.runner, outdir, str(workers)], env=env, stdout=log,
+                                 stderr=STDOUT, preexec_fn=setsid)
+
+    @classmethod
+    def _run(cls, name, workers):
+        """run till the end
+
+        :return: output folder
+        """
+        outdir, proc = cls._start(name, workers)
+        assert proc.wait() == 0, "run '%s' failed, see %s" % (name, opath.join(outdir, "valf.out"))
+        return outdir
+
+    @staticmethod
+    def _results(outdir):
+        with open(opath.join(outdir, "results.json")) as fp:
+            return load(fp)
+
+    @staticmethod
+    def _processed(outdir):
+        with open(opath.join(outdir, "processed.log")) as fp:
+            return fp.read().split()
+
+    @staticmethod
+    def _journaled(journal):
+        """names of the journaled recordings, in order of the journal"""
+        try:
+            conn = sqlite3.connect(journal)
+            try:
+                return [name for names, in conn.execute("SELECT names FROM recordings ORDER BY idx")
+                        for name in names.split("\n")]
+            finally:
+                conn.close()
+        except sqlite3.Error:  # not created yet
+            return []
+
+    def _check_resume(self, name, workers):
+        """kill a run after some recordings are journaled, resume it and compare results"""
+        outdir, proc = self._start(name, workers, DELAY)
+        journal = opath.join(outdir, "valf_checkpoint.sqlite")
+        journaled = []
+        start = time()
+        while proc.poll() is None and len(journaled) < KILL_AFTER and time() - start < TIMEOUT:
+            sleep(0.05)
+            journaled = self._journaled(journal) if opath.exists(journal) else []
+        self.assertIsNone(proc.poll(), "run finished before %d recordings were journaled" % KILL_AFTER)
+        killpg(proc.pid, SIGKILL)
+        proc.wait()
+
+        journaled = self._journaled(journal)
+        self.assertGreaterEqual(len(journaled), KILL_AFTER)
+        self.assertFalse(opath.exists(opath.join(outdir, "results.json")))
+        # journal holds the first recordings in order of processing
+        self.assertEqual(journaled, ["/data/rec_%02d.rrec" % i for i in xrange(len(journaled))])
+
+        remove(opath.join(outdir, "processed.log"))
+        _, proc = self._start(name, workers)
+        self.assertEqual(proc.wait(), 0)
+
+        # journaled recordings are not processed again, results and counters are the same as of a run in one go
+        resumed = self._processed(outdir)
+        self.assertFalse(set(resumed) & set(journaled))
+        self.assertEqual(len(resumed) + len(journaled), RECORDINGS)
+        self.assertEqual(self._results(outdir), self.expected)
+        self.assertFalse(opath.exists(journal))
+
+    def test_parallel(self):
+        """recording-parallel mode gives same results as a sequential run"""
+        self.assertEqual(self._results(self._run("parallel", 3)), self.expected)
+
+    def test_resume_sequential(self):
+        """killed sequential run resumed sequentially"""
+        self._check_resume("resume_sequential", 0)
+
+    def test_resume_parallel(self):
+        """killed recording-parallel run resumed in recording-parallel mode"""
+        self._check_resume("resume_parallel", 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+"""
+CHANGE LOG:
+-----------
+"""
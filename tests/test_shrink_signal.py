@@ -0,0 +1,135 @@
+"""
+tests/test_shrink_signal
+------------------------
+
+one sample of repeated timestamps: `dedup_indices`, `PlotFactory._shrink_signal` and `tc_common.shrink_signal`
+compared with the former loops over the runs of equal timestamps
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from os import path as opath
+import sys
+import unittest
+
+import numpy as np
+
+# - import framework modules -------------------------------------------------------------------------------------------
+PACKAGE_DIR = opath.dirname(opath.dirname(opath.abspath(__file__)))
+sys.path[:0] = [PACKAGE_DIR, opath.join(PACKAGE_DIR, "test_cases")]
+from framework.img.viz import AlgoSignal, PlotFactory  # noqa: E402
+from framework.io.alignment import dedup_indices, FIRST, LAST  # noqa: E402
+try:
+    from tc_common import shrink_signal  # noqa: E402
+except ImportError:  # dependencies of the validation package not installed
+    shrink_signal = None
+
+# - defines ------------------------------------------------------------------------------------------------------------
+CASES = {"empty": [],
+         "single": [20000],
+         "all_equal": [20000, 20000, 20000, 20000],
+         "unique": [20000, 40000, 60000],
+         "runs": [20000, 20000, 40000, 60000, 60000, 60000, 80000, 100000, 100000],
+         "alternating_runs": [20000, 20000, 40000, 40000, 20000, 20000, 40000]}
+POSITION = {FIRST: 0, LAST: -1}
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def _former_shrink(values, timestamps, keep=LAST):
+    """former loop of the test cases and the plot factory, taking the last (or first) value of each run
+
+    :return: values and sorted unique timestamps, the input if timestamps are unique
+    """
+    timestamp_1 = sorted(set(timestamps))
+    if len(timestamp_1) == len(timestamps):
+        return values, timestamps
+
+    timestamp_3 = np.where(np.diff(timestamps) != 0)
+    values_1 = [values[0:timestamp_3[0][0] + 1]]
+    for ij in range(len(timestamp_3[0]) - 1):
+        values_1.append(values[timestamp_3[0][ij] + 1: timestamp_3[0][ij + 1] + 1])
+    values_1.append(values[timestamp_3[0][-1] + 1:])
+    return [run[POSITION[keep]] for run in values_1], timestamp_1
+
+
+def _cases():
+    """fixed cases and random sorted timestamps with runs"""
+    cases = dict((name, np.array(stamps, np.int64)) for name, stamps in CASES.items())
+    rnd = np.random.RandomState(0)
+    for i in xrange(50):
+        cases["random_%d" % i] = np.cumsum(rnd.randint(0, 3, rnd.randint(2, 60))) * 20000
+    return sorted(cases.items())
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class TestDedupIndices(unittest.TestCase):
+    """kept samples of `dedup_indices` are the values of the former loop"""
+
+    def test_keep(self):
+        """first and last sample of each run"""
+        for keep in (FIRST, LAST):
+            for name, stamps in _cases():
+                values = np.arange(len(stamps)) * 10.
+                kept = dedup_indices(stamps, keep)
+                if name == "all_equal":  # former loop failed with an IndexError
+                    self.assertRaises(IndexError, _former_shrink, values, stamps, keep)
+                    self.assertEqual(list(kept), [POSITION[keep] % len(stamps)])
+                    continue
+                exp_values, exp_stamps = _former_shrink(values, stamps, keep)
+                self.assertEqual(list(values[kept]), list(exp_values), "%s, keep %s" % (name, keep))
+                if name != "alternating_runs":
+                    self.assertEqual(list(stamps[kept]), list(exp_stamps), "%s, keep %s" % (name, keep))
+
+    def test_unknown_keep(self):
+        """only FIRST and LAST"""
+        self.assertRaises(ValueError, dedup_indices, [1, 1, 2], "middle")
+
+
+class TestShrinkSignal(unittest.TestCase):
+    """signals shrunk like by the former loops"""
+
+    def test_plot_factory(self):
+        """helper of the plot factory, keeping the last value"""
+        for name, stamps in _cases():
+            values = list(np.arange(len(stamps)) * 10.)
+            if name == "all_equal":
+                self.assertEqual(PlotFactory._shrink_signal(values, list(stamps)),  # pylint: disable=W0212
+                                 ([30.], [20000]))
+                continue
+            self.assertEqual(PlotFactory._shrink_signal(values, list(stamps)),  # pylint: disable=W0212
+                             tuple(list(res) for res in _former_shrink(values, list(stamps))), name)
+
+    @unittest.skipIf(shrink_signal is None, "validation package not importable")
+    def test_algo_signal(self):
+        """signals of the test cases, also failing on unsorted timestamps like before"""
+        for keep in (FIRST, LAST):
+            for name, stamps in _cases():
+                values = np.arange(len(stamps)) * 10.
+                signal = AlgoSignal("sig", values, stamps, "m")
+                if name == "all_equal":
+                    shrunk = shrink_signal(signal, keep)
+                    self.assertEqual(list(shrunk.index), [20000])
+                    continue
+                if name == "alternating_runs":
+                    self.assertRaises(ValueError, AlgoSignal, "sig", *_former_shrink(values, stamps, keep))
+                    self.assertRaises(ValueError, shrink_signal, signal, keep)
+                    continue
+                exp_values, exp_stamps = _former_shrink(values, stamps, keep)
+                shrunk = shrink_signal(signal, keep)
+                if len(exp_stamps) == len(stamps):
+                    self.assertIs(shrunk, signal)
+                self.assertEqual(list(shrunk.values), list(exp_values), "%s, keep %s" % (name, keep))
+                self.assertEqual(list(shrunk.index), list(exp_stamps), "%s, keep %s" % (name, keep))
+                self.assertEqual((shrunk.name, shrunk.unit), ("sig", "m"))
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+"""
+CHANGE LOG:
+-----------
+"""
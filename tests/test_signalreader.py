@@ -0,0 +1,308 @@
+"""
+tests/test_signalreader
+-----------------------
+
+concurrent reads of one `SignalReader` by several threads,
+typing of csv columns compared with the former row by row parsing
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from csv import reader
+from multiprocessing.pool import ThreadPool
+from os import path as opath
+from random import Random
+from re import match
+from shutil import rmtree
+from struct import pack
+from tempfile import mkdtemp
+import sys
+import unittest
+
+from numpy import arange, array, array_equal, ascontiguousarray, float64, int64, inf, uint16
+from numpy.testing import assert_array_equal
+
+# - import framework modules -------------------------------------------------------------------------------------------
+sys.path.insert(0, opath.dirname(opath.dirname(opath.abspath(__file__))))
+from framework.io.signalreader import SignalReader, BsigReader, BsigMmapReader, CsvReader  # noqa: E402
+from framework.io.signalwriter import BsigWriter, CsvWriter  # noqa: E402
+from stk.io.signalreader import CsvReader as StkCsvReader  # noqa: E402
+try:
+    from hpc.mts.signalreader import CsvReader as HpcCsvReader  # noqa: E402
+except ImportError:  # dependencies of hpc package not installed
+    HpcCsvReader = None
+
+# - defines ------------------------------------------------------------------------------------------------------------
+SAMPLES = 3000
+BLOCK_SIZE = 256
+THREADS = 8
+JOBS = 600
+BSIG_TYPES = {'H': 16, 'd': 36896}
+
+# columns as (name, values), covering the typing rules of the former csv parsing
+CSV_COLUMNS = [("unsigned", ["0", "1", "007", "42"]),
+               ("leading_blank", [" 5", "6", " 7", "8"]),
+               ("trailing_blank", ["5 ", "6", "7", "8"]),
+               ("plus_sign", ["+5", "+6", "7", "8"]),
+               ("negative", ["-1", "2", "3", "-4"]),
+               ("negative_zero", ["-0", "1", "2", "3"]),
+               ("float", ["1.5", "-2.25", "1e5", ".5"]),
+               ("float_int", ["1.", "2", "3", "4"]),
+               ("plus_float", ["+1.5", "2.5", "+.5", "1E-3"]),
+               ("special", ["1.#INF", "-1.#INF", "2.0", "1.#INF00"]),
+               ("nan_text", ["nan", "1.5", "2", "3"]),
+               ("inf_text", ["inf", "-inf", "2", "3"]),
+               ("mixed", ["1", "a", "2.5", "b"]),
+               ("some_empty", ["", "1", "2", ""]),
+               ("all_empty", ["", "", "", ""])]
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def _signals():
+    """test signals, long enough to span many blocks
+
+    :rtype: dict
+    """
+    sigs = {"MTS.Package.TimeStamp": arange(SAMPLES, dtype=float64) * 20000.}
+    for i in xrange(6):
+        sigs["Obj[%d].dist" % i] = arange(SAMPLES, dtype=float64) * (i + 1) / 7.
+        sigs["Obj[%d].id" % i] = (arange(SAMPLES) % (i + 5)).astype(uint16)
+    return sigs
+
+
+def _write_raw_bsig(filename, sigs):
+    """write an uncompressed bsig3 file with blocks of all signals interleaved, as BsigWriter always compresses
+
+    :param filename: path of file
+    :param sigs: dict name -> signal
+    """
+    raw = [(name, ascontiguousarray(sig, dtype=sig.dtype.newbyteorder('<')).tostring(), sig)
+           for name, sig in sorted(sigs.items())]
+    offsets = [[] for _ in raw]
+    with open(filename, "wb") as fp:
+        fp.write("BSIG" + pack("BBBB", 3, 0, 0, 0))
+        for pos in xrange(0, max(len(data) for _, data, _ in raw), BLOCK_SIZE):
+            for sig_offs, (_, data, _) in zip(offsets, raw):
+                if pos < len(data):
+                    sig_offs.append(fp.tell())
+                    fp.write(data[pos:pos + BLOCK_SIZE].ljust(BLOCK_SIZE, "\0"))
+
+        offset_size = fp.tell()
+        for sig_offs, (_, _, sig) in zip(offsets, raw):
+            fp.write(pack("II", len(sig_offs), len(sig)) + pack("Q" * len(sig_offs), *sig_offs))
+        offset_size = fp.tell() - offset_size
+
+        header_size = fp.tell()
+        for name, _, sig in raw:
+            fp.write(pack("H", len(name)) + name + pack("II", 1, BSIG_TYPES[sig.dtype.char]))
+        header_size = fp.tell() - header_size
+
+        fp.write(pack("IIII", len(raw), BLOCK_SIZE, header_size, offset_size) + pack("BBBB", 0, 0, 0, 0) + "BIN\0")
+
+
+def _former_scan_auto(filename, delim, strip):
+    """columns of a csv file typed value by value with the rules of the former parsing (scan_auto)
+
+    :param filename: path of csv file
+    :param delim: delimiter
+    :param strip: function to strip values before checking for integers, differs between the reader copies
+    :return: list of columns
+    """
+    all_types = {long: 0, float: 1, str: 2}
+    with open(filename) as fp:
+        rows = list(reader(fp, delimiter=delim))
+    columns = []
+    for idx in xrange(len(rows[0])):
+        vals, styp = [], 0
+        for row in rows[1:]:
+            val = row[idx]
+            if match(r"^(\d+)$", strip(val)) is not None:
+                val = long(val)
+            elif match(r"[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*\Z", strip(val)) is not None:
+                val = float(val)
+            elif match(r"[+]?1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
+                val = inf
+            elif match(r"-1(\.)[#][Ii][Nn]", val.lstrip()) is not None:
+                val = -inf
+            vals.append(val)
+            styp = max(all_types[type(val)], styp)
+        columns.append(array(vals, dtype=[tt for tt, it in all_types.items() if it == styp][0]))
+    return columns
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class TestConcurrentReads(unittest.TestCase):
+    """reads from a thread pool need to return the same as sequential reads, for all reader types"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = mkdtemp()
+        cls.sigs = _signals()
+
+        cls.compressed = opath.join(cls.tmpdir, "compressed.bsig")
+        writer = BsigWriter(cls.compressed, block_size=BLOCK_SIZE)
+        for name, sig in sorted(cls.sigs.items()):
+            writer.append(name, sig)
+        writer.close()
+
+        cls.uncompressed = opath.join(cls.tmpdir, "uncompressed.bsig")
+        _write_raw_bsig(cls.uncompressed, cls.sigs)
+
+        cls.csv = opath.join(cls.tmpdir, "signals.csv")
+        writer = CsvWriter(cls.csv, delim=",")
+        for name, sig in sorted(cls.sigs.items()):
+            writer.append(name, sig)
+        writer.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.tmpdir)
+
+    def _check_concurrent(self, filename, reader_class, **kw):
+        """compare reads of one reader shared by a thread pool with the reads of a reader used sequentially
+
+        :param filename: signal file
+        :param reader_class: expected internal reader class
+        :param kw: SignalReader options
+        """
+        names = sorted(self.sigs)
+        rnd = Random(0)
+        jobs = []
+        for _ in xrange(JOBS):
+            offset = rnd.randint(0, SAMPLES - 1)
+            jobs.append((rnd.choice(("signal", "signals", "slice")), rnd.sample(names, rnd.randint(1, 5)),
+                         offset, rnd.randint(1, SAMPLES - offset)))
+
+        def read(reader, job):
+            kind, sigs, offset, count = job
+            if kind == "signal":
+                return [reader[sigs[0]]]
+            if kind == "slice":
+                return [reader[sigs[0]:offset:count]]
+            values = reader.signals(sigs)
+            return [values[name] for name in sigs]
+
+        with SignalReader(filename, **kw) as reader:
+            self.assertIsInstance(reader._reader, reader_class)  # pylint: disable=W0212
+            expected = [read(reader, job) for job in jobs]
+
+        pool = ThreadPool(THREADS)
+        try:
+            with SignalReader(filename, **kw) as reader:
+                results = pool.map(lambda job: read(reader, job), jobs, chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+
+        for job, exp, res in zip(jobs, expected, results):
+            self.assertEqual(len(exp), len(res))
+            for exp_sig, res_sig in zip(exp, res):
+                self.assertTrue(array_equal(exp_sig, res_sig), "different values for %s" % str(job))
+
+    def test_bsig(self):
+        """compressed blocks, read and decompressed by `BsigReader`"""
+        self._check_concurrent(self.compressed, BsigReader)
+
+    def test_bsig_uncompressed(self):
+        """uncompressed interleaved blocks, read by `BsigReader`"""
+        self._check_concurrent(self.uncompressed, BsigReader)
+
+    def test_bsig_mmap(self):
+        """uncompressed interleaved blocks, mapped by `BsigMmapReader`"""
+        self._check_concurrent(self.uncompressed, BsigMmapReader, mmap=True)
+
+    def test_csv(self):
+        """values resident in `CsvReader`"""
+        self._check_concurrent(self.csv, CsvReader, delim=",")
+
+
+class TestCsvTyping(unittest.TestCase):
+    """columns of csv files typed as by the former row by row parsing, for all copies of the reader"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = mkdtemp()
+        cls.filename = opath.join(cls.tmpdir, "typing.csv")
+        with open(cls.filename, "w") as fp:
+            fp.write(",".join(name for name, _ in CSV_COLUMNS) + "\n")
+            for row in zip(*[values for _, values in CSV_COLUMNS]):
+                fp.write(",".join(row) + "\n")
+        cls.empty = opath.join(cls.tmpdir, "empty.csv")
+        with open(cls.empty, "w") as fp:
+            fp.write(",".join(name for name, _ in CSV_COLUMNS) + "\n")
+        cls.numeric = opath.join(cls.tmpdir, "numeric.csv")
+        with open(cls.numeric, "w") as fp:
+            fp.write("unsigned,negative,float\n0,-1,1.5\n1,2,-2.25\n007,3,1e5\n42,-4,.5\n")
+        cls.integer = opath.join(cls.tmpdir, "integer.csv")
+        with open(cls.integer, "w") as fp:
+            fp.write("unsigned,negative\n0,-1\n1,2\n007,3\n42,-4\n")
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.tmpdir)
+
+    def _check_columns(self, reader_class, strip, **kw):
+        """compare all columns with the former parsing
+
+        :param reader_class: csv reader to check
+        :param strip: stripping of values by the reader
+        :param kw: further reader options
+        """
+        expected = _former_scan_auto(self.filename, ",", strip)
+        csv = reader_class(self.filename, delim=",", **kw)
+        try:
+            for (name, _), exp in zip(CSV_COLUMNS, expected):
+                values = csv.signal(name)
+                self.assertEqual(values.dtype, exp.dtype, "%s: %s instead of %s" % (name, values.dtype, exp.dtype))
+                assert_array_equal(values, exp, name)
+        finally:
+            csv.close()
+
+        csv = reader_class(self.empty, delim=",", **kw)
+        try:
+            for name, _ in CSV_COLUMNS:
+                self.assertEqual(csv.signal(name).dtype, int64)
+                self.assertEqual(len(csv.signal(name)), 0)
+        finally:
+            csv.close()
+
+    def test_framework(self):
+        """framework.io.signalreader"""
+        self._check_columns(CsvReader, str.lstrip)
+
+    def test_stk(self):
+        """stk.io.signalreader"""
+        self._check_columns(StkCsvReader, str.lstrip)
+
+    @unittest.skipIf(HpcCsvReader is None, "hpc package not importable")
+    def test_hpc(self):
+        """hpc.mts.signalreader, integers are checked after stripping blanks on both sides"""
+        self._check_columns(HpcCsvReader, str.strip, exc=ValueError)
+
+    def test_scan_opt(self):
+        """explicit type: values are converted to it, also float values not truncated anymore"""
+        for reader_class in (CsvReader, StkCsvReader):
+            csv = reader_class(self.numeric, delim=",", scan_opt="float")
+            values = csv.signal("unsigned")
+            self.assertEqual(values.dtype, float64)
+            assert_array_equal(values, [0., 1., 7., 42.])
+            assert_array_equal(csv.signal("float"), [1.5, -2.25, 1e5, .5])
+            csv.close()
+
+            csv = reader_class(self.integer, delim=",", scan_opt="long")
+            values = csv.signal("negative")
+            self.assertEqual(values.dtype, int64)
+            assert_array_equal(values, [-1, 2, 3, -4])
+            csv.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+"""
+CHANGE LOG:
+-----------
+"""
@@ -0,0 +1,108 @@
+"""
+tests/test_signalwriter
+-----------------------
+
+bsig files of `BsigWriter` compressing blocks in one or several threads, compared byte by byte with files
+of the former writer packing value by value (data/signalwriter_v3.bsig, data/signalwriter_v2.bsig)
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from os import path as opath
+from shutil import rmtree
+from tempfile import mkdtemp
+import sys
+import unittest
+
+from numpy import arange, array_equal, float32, float64, int8, int16, longlong, uint8, uint16
+
+# - import framework modules -------------------------------------------------------------------------------------------
+sys.path.insert(0, opath.dirname(opath.dirname(opath.abspath(__file__))))
+from framework.io.signalreader import SignalReader  # noqa: E402
+from framework.io.signalwriter import BsigWriter  # noqa: E402
+
+# - defines ------------------------------------------------------------------------------------------------------------
+DATA_DIR = opath.join(opath.dirname(opath.abspath(__file__)), "data")
+SAMPLES = 2000
+FORMATS = {"v3": {"block_size": 1024}, "v2": {"block_size": 512, "v2format": True}}
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def _signals():
+    """signals of all types, spanning several blocks with a partial last one, an array and an empty signal
+
+    :return: list of name and signal
+    """
+    rng = arange(SAMPLES)
+    return [("MTS.Package.TimeStamp", (rng * 60000 + 123456).astype(longlong)),
+            ("Obj.dist", (rng / 7.).astype(float64)),
+            ("Obj.vrel", (rng % 97 / 3. - 10.).astype(float32)),
+            ("Obj.id", (rng % 256).astype(uint8)),
+            ("Obj.class", (rng % 11 - 5).astype(int8)),
+            ("Obj.cycle", (rng * 3).astype(uint16)),
+            ("Obj.angle", (rng % 601 - 300).astype(int16)),
+            ("Obj.pos", (arange(SAMPLES * 3) / 11.).astype(float32).reshape(SAMPLES, 3)),
+            ("Obj.empty", arange(0, dtype=float64))]
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class TestBsigWriter(unittest.TestCase):
+    """files written in one or several threads are identical to the ones of the former writer"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        rmtree(cls.tmpdir)
+
+    def _check(self, fmt, threads):
+        """write signals and compare with the file of the former writer
+
+        :param fmt: bsig format, key of FORMATS
+        :param threads: compressing threads
+        """
+        filename = opath.join(self.tmpdir, "%s_%d.bsig" % (fmt, threads))
+        writer = BsigWriter(filename, threads=threads, **FORMATS[fmt])
+        for name, signal in _signals():
+            writer.append(name, signal)
+        writer.close()
+
+        with open(filename, "rb") as fp:
+            written = fp.read()
+        with open(opath.join(DATA_DIR, "signalwriter_%s.bsig" % fmt), "rb") as fp:
+            self.assertTrue(written == fp.read(), "%s file of %d threads differs" % (fmt, threads))
+
+        if fmt == "v3":
+            with SignalReader(filename) as reader:
+                for name, signal in _signals()[:-1]:
+                    self.assertTrue(array_equal(reader[name], signal), name)
+
+    def test_v3_single(self):
+        """bsig 3, compressed in the calling thread"""
+        self._check("v3", 1)
+
+    def test_v3_threads(self):
+        """bsig 3, compressed by a thread pool"""
+        self._check("v3", 4)
+
+    def test_v2_single(self):
+        """bsig 2, compressed in the calling thread"""
+        self._check("v2", 1)
+
+    def test_v2_threads(self):
+        """bsig 2, compressed by a thread pool"""
+        self._check("v2", 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+"""
+CHANGE LOG:
+-----------
+"""
@@ -0,0 +1,159 @@
+"""
+tests/test_sim_index
+--------------------
+
+sim files of recordings found by `SimFileIndex.match` compared with the former regex search of the
+collection reader, and the cached listing of `sim_file_index`
+
+:org:           Continental AG
+:author:        Leidenberger, Ralf
+"""
+
+# - import Python modules ----------------------------------------------------------------------------------------------
+from os import path as opath, listdir, makedirs, utime, walk
+from random import Random
+from re import search as research
+from shutil import rmtree
+from tempfile import mkdtemp
+import sys
+import unittest
+
+# - import framework modules -------------------------------------------------------------------------------------------
+sys.path.insert(0, opath.dirname(opath.dirname(opath.abspath(__file__))))
+from framework.io.sim_index import sim_file_index, SimFileIndex  # noqa: E402
+
+# - defines ------------------------------------------------------------------------------------------------------------
+RECORDINGS = ["d:/data/Rec01.rrec", "/data/rec02.rec", "REC03.rec", "rec011.rrec", "rec04.rec", "Cont_ARS_05.rrec",
+              "missing.rec"]
+FILES = ["rec01.bsig", "REC01_sil.BSIG", "prefix_rec01_extra.bsig", "rec01_tstp.bsig", "rec01_sil_tstp.bsig",
+         "rec01.csv", "rec01.bsig.bak", "rec011.bsig", "rec02_base.bsig", "rec02.txt", "x.rec02.CSV",
+         "cont_ars_05_sil.csv", "CONT_ARS_05.bsig", "rec03 copy.bsig", "sub/rec03.bsig", "sub/deeper/rec02.bsig",
+         "sub/REC011_sil.bsig"]
+FOLDERS = ["rec04.bsig"]
+NAME_CHARS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-"
+
+
+# - functions ----------------------------------------------------------------------------------------------------------
+def _former_match(folder, recordings, extensions, base_name="", exact_match=False, recurse=False):
+    """former search of the collection reader: regex of each recording searched in all paths
+
+    the former recursive listing joined the folder with a list, it's joined with the file name here
+    """
+    files = []
+    if recurse:
+        for dirname, _, filenames in walk(folder):
+            for fname in filenames:
+                files.append(opath.abspath(opath.join(dirname, fname)))
+    else:
+        for name in listdir(folder):
+            files.append(opath.join(folder, name))
+
+    found = {}
+    for rec in recordings:
+        fname = opath.splitext(opath.basename(rec))[0]
+        pattern = ((r"(?i)%s%s(?<!_tstp)\.(%s)$" if exact_match
+                    else r"(?i)[\.\w\_\-\+]*%s[\.\w\_\-\+]*%s(?<!_tstp)\.(%s)$") %
+                   (fname, base_name, "|".join(extensions)))
+        found[rec] = sorted([file_.lower() for file_ in files
+                             if research(pattern, file_) is not None and opath.isfile(file_)], reverse=True)
+    return found
+
+
+def _create(folder, files, folders=()):
+    """create empty files and folders"""
+    for name in folders:
+        makedirs(opath.join(folder, name))
+    for name in files:
+        path = opath.join(folder, name)
+        if not opath.exists(opath.dirname(path)):
+            makedirs(opath.dirname(path))
+        open(path, "w").close()
+
+
+# - classes ------------------------------------------------------------------------------------------------------------
+class TestMatch(unittest.TestCase):
+    """files found by the index are the ones of the former regex search"""
+
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+
+    def tearDown(self):
+        rmtree(self.tmpdir)
+
+    def _check(self, folder, recordings):
+        """compare all options"""
+        for recurse in (False, True):
+            index = SimFileIndex(folder, recurse)
+            for exact_match in (False, True):
+                for base_name in ("", "_sil", "_base"):
+                    for extensions in (["bsig"], ["bsig", "csv"], ["BSIG", "Csv"]):
+                        expected = _former_match(folder, recordings, extensions, base_name, exact_match, recurse)
+                        self.assertEqual(index.match(recordings, extensions, base_name, exact_match), expected,
+                                         "recurse %s, exact %s, base '%s', extensions %s"
+                                         % (recurse, exact_match, base_name, extensions))
+
+    def test_files(self):
+        """exact and non-exact matching, tstp files, mixed case, sub folders"""
+        _create(self.tmpdir, FILES, FOLDERS)
+        self._check(self.tmpdir, RECORDINGS)
+        found = SimFileIndex(self.tmpdir).match(RECORDINGS, ["bsig"], "_sil")
+        self.assertEqual(found["d:/data/Rec01.rrec"], [opath.join(self.tmpdir, "rec01_sil.bsig").lower()])
+
+    def test_random(self):
+        """random names around the recording names"""
+        rnd = Random(0)
+        recordings = ["".join(rnd.choice(NAME_CHARS) for _ in xrange(rnd.randint(3, 8))) + ".rec"
+                      for _ in xrange(12)]
+        files = set()
+        for _ in xrange(150):
+            rec = opath.splitext(rnd.choice(recordings))[0]
+            rec = "".join(char.upper() if rnd.random() < 0.3 else char.lower() for char in rec)
+            files.add("%s%s%s%s%s.%s" % (rnd.choice(["", "", "x_", "a.b-", "sub/", "sub/y+"]), rec,
+                                          rnd.choice(["", "", "_1", "+z", " ", "_tstp"]),
+                                          rnd.choice(["", "", "_sil", "_SIL"]), rnd.choice(["", "_tstp"]),
+                                          rnd.choice(["bsig", "BSIG", "csv", "txt"])))
+        _create(self.tmpdir, sorted(files))
+        self._check(self.tmpdir, recordings)
+
+
+class TestCache(unittest.TestCase):
+    """listing of a folder is shared as long as it's unchanged"""
+
+    def setUp(self):
+        self.tmpdir = mkdtemp()
+        _create(self.tmpdir, ["rec01.bsig", "sub/rec02.bsig"])
+
+    def tearDown(self):
+        rmtree(self.tmpdir)
+
+    def _touch(self, name):
+        """create a file, the folder's modification time is set later to not depend on its resolution"""
+        _create(self.tmpdir, [name])
+        mtime = opath.getmtime(self.tmpdir) + 10
+        utime(self.tmpdir, (mtime, mtime))
+
+    def test_folder(self):
+        """same index till a file is added"""
+        index = sim_file_index(self.tmpdir)
+        self.assertIs(sim_file_index(self.tmpdir), index)
+        self.assertNotIn("rec03", index)
+
+        self._touch("rec03.bsig")
+        self.assertIn("rec03", sim_file_index(self.tmpdir))
+
+    def test_sub_folders(self):
+        """files added to sub folders are found"""
+        self.assertIn("rec02", sim_file_index(self.tmpdir, True))
+        _create(self.tmpdir, ["sub/rec03.bsig"])
+        self.assertIn("rec03", sim_file_index(self.tmpdir, True))
+        self.assertNotIn("rec03", sim_file_index(self.tmpdir))
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+
+"""
+CHANGE LOG:
+-----------
+"""